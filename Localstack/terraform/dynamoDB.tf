@@ -9,6 +9,21 @@ resource "aws_dynamodb_table" "users_table" {
   }
 }
 
+# Outbox events of the user service, written in the same transaction as the change;
+# the stream is what gets published to the userservice.user topic
+resource "aws_dynamodb_table" "users_outbox_table" {
+  name             = "users_outbox"
+  billing_mode     = "PAY_PER_REQUEST"
+  hash_key         = "id"
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
+  attribute {
+    name = "id"
+    type = "S"
+  }
+}
+
 resource "aws_dynamodb_table" "subscriptions_table" {
   name           = "subscriptions"
   billing_mode   = "PAY_PER_REQUEST"
@@ -18,4 +33,32 @@ resource "aws_dynamodb_table" "subscriptions_table" {
     name = "subscription_id"
     type = "S"
   }
+
+  attribute {
+    name = "email"
+    type = "S"
+  }
+
+  # Lists a user's subscriptions ordered by subscription_id (keyset pagination)
+  global_secondary_index {
+    name            = "email-index"
+    hash_key        = "email"
+    range_key       = "subscription_id"
+    projection_type = "ALL"
+  }
+}
+
+# Outbox events of the subscription service's bulk creation, written in the same transaction
+# as the subscriptions; the stream is what gets published to the subscriptionservice.subscription topic
+resource "aws_dynamodb_table" "subscriptions_outbox_table" {
+  name             = "subscriptions_outbox"
+  billing_mode     = "PAY_PER_REQUEST"
+  hash_key         = "id"
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
+  attribute {
+    name = "id"
+    type = "S"
+  }
 }
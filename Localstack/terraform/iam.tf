@@ -25,7 +25,8 @@ resource "aws_iam_policy" "users_table_access" {
           "dynamodb:BatchWriteItem"
         ],
         Resource = [
-          aws_dynamodb_table.users_table.arn
+          aws_dynamodb_table.users_table.arn,
+          aws_dynamodb_table.users_outbox_table.arn
         ]
       }
     ]
@@ -63,7 +64,8 @@ resource "aws_iam_policy" "subscriptions_table_access" {
           "dynamodb:BatchWriteItem"
         ],
         Resource = [
-          aws_dynamodb_table.subscriptions_table.arn
+          aws_dynamodb_table.subscriptions_table.arn,
+          aws_dynamodb_table.subscriptions_outbox_table.arn
         ]
       }
     ]
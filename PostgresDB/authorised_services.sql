@@ -31,8 +31,12 @@ GRANT CREATE ON SCHEMA auth TO user_service_user;
 GRANT CREATE ON SCHEMA auth TO subscription_service_user;
 
 -- Pre-create publication for Debezium (execute as superuser)
-CREATE PUBLICATION dbz_publication_user FOR TABLE auth.users_outbox;
-CREATE PUBLICATION dbz_publication_subscription FOR TABLE auth.subscriptions_outbox;
+-- Changes to the outbox partitions are published as changes to the outbox table itself;
+-- only inserts are published, deleted rows and dropped partitions are never streamed
+CREATE PUBLICATION dbz_publication_user FOR TABLE auth.users_outbox
+    WITH (publish = 'insert', publish_via_partition_root = true);
+CREATE PUBLICATION dbz_publication_subscription FOR TABLE auth.subscriptions_outbox
+    WITH (publish = 'insert', publish_via_partition_root = true);
 
 -- Grant debezium_user minimal privileges needed for CDC
 GRANT SELECT ON TABLE auth.users_outbox TO debezium_user;
@@ -0,0 +1,108 @@
+-- Outbox retention
+--
+-- auth.users_outbox and auth.subscriptions_outbox are partitioned by day on created_at.
+-- Debezium only reads the WAL, so a row is no longer needed once its INSERT has been
+-- streamed. maintain_outbox_partitions (scheduled in schedules/outbox_maintenance.sql)
+-- creates the partitions for the coming days and drops old ones once the Debezium
+-- replication slot has confirmed everything written to them.
+--
+-- set_outbox_no_storage switches a table to no-storage mode instead: every outbox row is
+-- deleted by the statement that inserted it, so the table stays empty. The INSERT is still
+-- in the WAL, and the publications only publish inserts, so the DELETE is never streamed.
+
+CREATE OR REPLACE FUNCTION auth.maintain_outbox_partitions(
+    outbox_name TEXT,               -- e.g. 'users_outbox', in schema auth
+    replication_slot TEXT,          -- Debezium slot streaming the table, e.g. 'debezium_user'
+    days_ahead INT DEFAULT 7,       -- partitions are created for today and this many days ahead
+    retention_days INT DEFAULT 1    -- partitions are kept at least this long after their day ended
+)
+RETURNS void AS $$
+DECLARE
+    day_ms       CONSTANT BIGINT := 86400000;
+    grace_ms     CONSTANT BIGINT := 3600000; -- transactions still committing rows stamped before the day ended
+    now_ms       BIGINT := (EXTRACT(EPOCH FROM NOW()) * 1000)::BIGINT;
+    today        DATE := (NOW() AT TIME ZONE 'UTC')::DATE;
+    part_day     DATE;
+    range_start  BIGINT;
+    part_name    TEXT;
+    confirmed    PG_LSN;
+    part         RECORD;
+BEGIN
+    -- 1. Create the partitions that will be needed
+    FOR i IN 0..days_ahead LOOP
+        part_day := today + i;
+        part_name := format('%s_p%s', outbox_name, to_char(part_day, 'YYYYMMDD'));
+        range_start := (EXTRACT(EPOCH FROM (part_day::TIMESTAMP AT TIME ZONE 'UTC')) * 1000)::BIGINT;
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS auth.%I PARTITION OF auth.%I FOR VALUES FROM (%s) TO (%s)',
+                part_name, outbox_name, range_start, range_start + day_ms
+            );
+        EXCEPTION WHEN OTHERS THEN
+            -- e.g. the default partition already holds rows for that day
+            RAISE WARNING 'Could not create partition %: %', part_name, SQLERRM;
+        END;
+    END LOOP;
+
+    -- 2. Close ended partitions, and drop closed partitions the slot has streamed
+    SELECT confirmed_flush_lsn INTO confirmed
+    FROM pg_replication_slots
+    WHERE slot_name = replication_slot;
+
+    FOR part IN
+        SELECT c.relname AS name,
+               (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \(''?(-?\d+)''?\)'))[1]::BIGINT AS range_end,
+               p.closed_lsn
+        FROM pg_inherits inh
+        JOIN pg_class c ON c.oid = inh.inhrelid
+        LEFT JOIN auth.outbox_partitions p ON p.partition_name = c.relname
+        WHERE inh.inhparent = format('auth.%I', outbox_name)::regclass
+    LOOP
+        CONTINUE WHEN part.range_end IS NULL;                -- the default partition
+        CONTINUE WHEN part.range_end + grace_ms > now_ms;    -- still receiving rows
+
+        IF part.closed_lsn IS NULL THEN
+            -- Every row of the partition is committed by now, so once the slot has
+            -- confirmed this position all of them have been streamed
+            INSERT INTO auth.outbox_partitions (partition_name, closed_lsn)
+            VALUES (part.name, pg_current_wal_lsn());
+
+        ELSIF confirmed IS NOT NULL
+              AND confirmed >= part.closed_lsn
+              AND part.range_end + retention_days * day_ms <= now_ms THEN
+            EXECUTE format('DROP TABLE auth.%I', part.name);
+            DELETE FROM auth.outbox_partitions WHERE partition_name = part.name;
+            RAISE NOTICE 'Dropped streamed outbox partition %', part.name;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION auth.delete_inserted_outbox_rows()
+RETURNS trigger AS $$
+BEGIN
+    EXECUTE format(
+        'DELETE FROM %I.%I o USING inserted n WHERE o.id = n.id AND o.created_at = n.created_at',
+        TG_TABLE_SCHEMA, TG_TABLE_NAME
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION auth.set_outbox_no_storage(
+    outbox_name TEXT,   -- e.g. 'users_outbox', in schema auth
+    enabled BOOLEAN
+)
+RETURNS void AS $$
+BEGIN
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON auth.%I', outbox_name || '_no_storage', outbox_name);
+    IF enabled THEN
+        -- One DELETE per INSERT statement, however many rows it wrote
+        EXECUTE format(
+            'CREATE TRIGGER %I AFTER INSERT ON auth.%I REFERENCING NEW TABLE AS inserted '
+            'FOR EACH STATEMENT EXECUTE FUNCTION auth.delete_inserted_outbox_rows()',
+            outbox_name || '_no_storage', outbox_name
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
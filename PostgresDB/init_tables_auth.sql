@@ -9,14 +9,21 @@ CREATE TABLE IF NOT EXISTS auth.users (
 );
 
 -- create the users outbox table
+-- Partitioned by day on created_at (epoch milliseconds); partitions are created
+-- ahead and dropped once streamed by functions/outbox_maintenance.sql
 CREATE TABLE IF NOT EXISTS auth.users_outbox (
-    id UUID PRIMARY KEY,
+    id UUID NOT NULL,
     aggregatetype TEXT NOT NULL,
     aggregateid TEXT NOT NULL,
     eventtype TEXT NOT NULL,
     payload JSONB NOT NULL,
-    created_at BIGINT NOT NULL
-);
+    created_at BIGINT NOT NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows no daily partition covers (normally empty)
+CREATE TABLE IF NOT EXISTS auth.users_outbox_default
+    PARTITION OF auth.users_outbox DEFAULT;
 
 -- Create the subscriptions table
 CREATE TABLE IF NOT EXISTS auth.subscriptions (
@@ -26,12 +33,31 @@ CREATE TABLE IF NOT EXISTS auth.subscriptions (
     is_active BOOLEAN NOT NULL
 );
 
+-- Serves listing a user's subscriptions page by page (keyset pagination)
+CREATE INDEX IF NOT EXISTS subscriptions_email_subscription_id_idx
+    ON auth.subscriptions (email, subscription_id);
+
 -- create the subscriptions outbox table
+-- Partitioned by day on created_at (epoch milliseconds); partitions are created
+-- ahead and dropped once streamed by functions/outbox_maintenance.sql
 CREATE TABLE IF NOT EXISTS auth.subscriptions_outbox (
-    id UUID PRIMARY KEY,
+    id UUID NOT NULL,
     aggregatetype TEXT NOT NULL,
     aggregateid TEXT NOT NULL,
     eventtype TEXT NOT NULL,
     payload JSONB NOT NULL,
-    created_at BIGINT NOT NULL
+    created_at BIGINT NOT NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows no daily partition covers (normally empty)
+CREATE TABLE IF NOT EXISTS auth.subscriptions_outbox_default
+    PARTITION OF auth.subscriptions_outbox DEFAULT;
+
+-- WAL position at which each outbox partition stopped receiving rows
+-- (see functions/outbox_maintenance.sql)
+CREATE TABLE IF NOT EXISTS auth.outbox_partitions (
+    partition_name TEXT PRIMARY KEY,
+    closed_lsn PG_LSN NOT NULL,
+    closed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
@@ -0,0 +1,26 @@
+-- Create today's and the coming days' outbox partitions right away
+SELECT auth.maintain_outbox_partitions('users_outbox', 'debezium_user');
+SELECT auth.maintain_outbox_partitions('subscriptions_outbox', 'debezium_subscription');
+
+-- Uncomment to keep the outbox tables empty (no-storage mode, see functions/outbox_maintenance.sql)
+-- SELECT auth.set_outbox_no_storage('users_outbox', TRUE);
+-- SELECT auth.set_outbox_no_storage('subscriptions_outbox', TRUE);
+
+-- First remove old jobs
+SELECT cron.unschedule(jobid)
+FROM cron.job
+WHERE jobname = 'outbox_maintenance';
+
+-- Then schedule the partition maintenance every hour
+SELECT cron.schedule('outbox_maintenance', '0 * * * *',
+$cron$
+SELECT auth.maintain_outbox_partitions('users_outbox', 'debezium_user');
+SELECT auth.maintain_outbox_partitions('subscriptions_outbox', 'debezium_subscription');
+$cron$
+);
+
+-- Log
+DO $$
+BEGIN
+    RAISE NOTICE 'Scheduled hourly outbox partition maintenance.';
+END $$;
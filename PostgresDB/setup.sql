@@ -17,6 +17,10 @@ CREATE EXTENSION IF NOT EXISTS pg_cron;
 -- 4. Setup the cron jobs
 \i /opt/sql/schedules/cron_scheduler.sql
 
+-- 4b. Outbox partition maintenance
+\i /opt/sql/functions/outbox_maintenance.sql
+\i /opt/sql/schedules/outbox_maintenance.sql
+
 -- 5. Initial per-symbol fetch with retries
 DO $$
 DECLARE
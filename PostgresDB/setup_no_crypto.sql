@@ -2,8 +2,14 @@
 
 \connect crypto_db;
 
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
 -- 1. Setup schemas, tables
 \i /opt/sql/init_tables_auth.sql
 
 -- 2. Setup permissions
-\i /opt/sql/authorised_services.sql
\ No newline at end of file
+\i /opt/sql/authorised_services.sql
+
+-- 3. Outbox partition maintenance
+\i /opt/sql/functions/outbox_maintenance.sql
+\i /opt/sql/schedules/outbox_maintenance.sql
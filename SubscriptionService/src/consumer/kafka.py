@@ -1,22 +1,21 @@
 import asyncio
 import json
 import logging
-from src.logging_config import setup_logging
-from typing import Dict, List, Any
-from aiokafka import AIOKafkaConsumer
+from fnmatch import fnmatchcase
+from typing import Dict, List, Any, Optional, Tuple
 from src.service.SubscriptionService import SubscriptionService
 from src.exceptions import ResourceNotFoundException, BaseAppException
 from src.db.db_context import get_db_session_for_background
 from src.db.factory import create_subscription_repository
+from src.db.settings import get_settings
 
 
-# Configure logging
-setup_logging()
 logger = logging.getLogger(__name__)
 
 # Kafka configuration
 KAFKA_BOOTSTRAP_SERVERS = "kafka:29092"
 KAFKA_TOPICS = ["userservice.user"]  # Multiple topics
+KAFKA_OWN_TOPICS = ["subscriptionservice.subscription"]  # Events published by this service's outbox
 KAFKA_CONSUMER_GROUP = "subscription_service_group"
 KAFKA_AUTO_COMMIT = True
 KAFKA_MAX_POLL_INTERVAL_MS = 300000  # 5 minutes
@@ -59,6 +58,17 @@ class UserCreatedSuccessHandler(EventHandler):
     async def handle(self, payload: Dict[str, Any]) -> None:
         logger.info(f"Processing user_created_from_new_subscription_succes: {payload}")
 
+class SubscriptionCacheInvalidationHandler(EventHandler):
+    """Drops a subscription from this pod's read-through cache when its outbox reports a change"""
+
+    async def handle(self, payload: Dict[str, Any]) -> None:
+        from src.repository.implementations.Caching.caching_SubscriptionRepository import get_subscription_cache
+
+        subscription_id = (payload or {}).get("subscription_id")
+        if subscription_id:
+            get_subscription_cache().invalidate(subscription_id)
+            logger.debug(f"Invalidated cached subscription {subscription_id}")
+
 class KafkaEventManager:
     """Manages Kafka event consumption and routing to appropriate handlers"""
     
@@ -66,29 +76,48 @@ class KafkaEventManager:
         self.consumer = None
         self.tasks = []
         self.event_handlers: Dict[str, EventHandler] = {}
+        self.pattern_handlers: List[Tuple[str, EventHandler]] = []
         
     def register_handler(self, event_type: str, handler: EventHandler) -> None:
-        """Register a handler for a specific event type"""
-        self.event_handlers[event_type] = handler
+        """Register a handler for a specific event type, or for a glob pattern such as subscription_*_success"""
+        if any(char in event_type for char in "*?["):
+            self.pattern_handlers = [(pattern, h) for pattern, h in self.pattern_handlers if pattern != event_type]
+            self.pattern_handlers.append((event_type, handler))
+        else:
+            self.event_handlers[event_type] = handler
         logger.info(f"Registered handler for event type: {event_type}")
         
-    async def start(self, topics: List[str], bootstrap_servers: str, group_id: str) -> None:
+    async def start(
+            self,
+            topics: List[str],
+            bootstrap_servers: str,
+            group_id: Optional[str],
+            auto_offset_reset: str = "earliest",
+            workers: int = 3
+        ) -> None:
+        """
+        Start consuming. With group_id=None every pod reads every partition,
+        which is what broadcast-style handlers like cache invalidation need.
+        """
+        # Imported on start so importing the app does not pull in aiokafka
+        from aiokafka import AIOKafkaConsumer
+
         self.consumer = AIOKafkaConsumer(
             *topics,
             bootstrap_servers=bootstrap_servers,
             group_id=group_id,
             value_deserializer=lambda m: json.loads(m.decode('utf-8')),
-            enable_auto_commit=KAFKA_AUTO_COMMIT,
+            enable_auto_commit=KAFKA_AUTO_COMMIT if group_id else False,
             max_poll_interval_ms=KAFKA_MAX_POLL_INTERVAL_MS,
             session_timeout_ms=KAFKA_SESSION_TIMEOUT_MS,
-            auto_offset_reset="earliest"
+            auto_offset_reset=auto_offset_reset
         )
         
         await self.consumer.start()
         logger.info(f"Kafka consumer started for topics: {topics}")
         
         # Start multiple consumer tasks for parallel processing
-        for i in range(3):  # Number of parallel consumers
+        for i in range(workers):  # Number of parallel consumers
             task = asyncio.create_task(self._consume(i))
             self.tasks.append(task)
             
@@ -126,6 +155,11 @@ class KafkaEventManager:
     async def _process_event(self, event_type: str, payload: Dict[str, Any]) -> None:
         """Process an event by routing to the appropriate handler"""
         handler = self.event_handlers.get(event_type)
+        if handler is None and event_type:
+            handler = next(
+                (pattern_handler for pattern, pattern_handler in self.pattern_handlers if fnmatchcase(event_type, pattern)),
+                None
+            )
         
         if handler:
             try:
@@ -160,6 +194,22 @@ class KafkaEventManager:
 # Create event manager instance
 event_manager = KafkaEventManager()
 
+# Broadcast consumer of this service's own outbox events (cache invalidation)
+invalidation_manager = KafkaEventManager()
+
+
+def register_invalidation_handlers() -> None:
+    """Register the handlers for this service's own outbox events"""
+    invalidation_manager.register_handler("subscription_*_success", SubscriptionCacheInvalidationHandler())
+
+async def setup_local_handlers(store) -> None:
+    """
+    For DATABASE_TYPE=memory: deliver outbox events from the in-memory store
+    straight to this service's handlers instead of through Debezium and Kafka.
+    """
+    if get_settings().CACHE_ENABLED:
+        register_invalidation_handlers()
+        store.subscribe(invalidation_manager._process_event)
 
 async def setup_kafka_handlers():
     """Initialize and start Kafka event handlers"""
@@ -174,3 +224,14 @@ async def setup_kafka_handlers():
         bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
         group_id=KAFKA_CONSUMER_GROUP
     )
+
+    if get_settings().CACHE_ENABLED:
+        # Every pod consumes every change from now on; older events are covered by the cache TTL
+        register_invalidation_handlers()
+        await invalidation_manager.start(
+            topics=KAFKA_OWN_TOPICS,
+            bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+            group_id=None,
+            auto_offset_reset="latest",
+            workers=1
+        )
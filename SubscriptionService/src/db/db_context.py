@@ -1,55 +1,103 @@
 # src/db/context.py
-from typing import Callable, AsyncGenerator, Any
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, AsyncGenerator, Any, Optional, TYPE_CHECKING
 from .settings import get_settings, DatabaseType
-from botocore.config import Config
-from types_aiobotocore_dynamodb import DynamoDBClient
 from fastapi import Request
 
+# Backend libraries are only imported for type hints here; the branch for the
+# configured DATABASE_TYPE imports what it needs at runtime.
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from types_aiobotocore_dynamodb import DynamoDBClient
+    from src.repository.implementations.Memory.store import MemoryStore
+
 
 # Type for a dependency that yields a value
 ContextDependency = Callable[..., AsyncGenerator[Any, None]]
 
+class LazySession:
+    """
+    Stand-in for an AsyncSession that only creates the session, and with it
+    checks out a pooled connection, once a repository first uses it.
+    Requests that fail validation or never reach the database hold no connection.
+
+    Requests marked with read_only_transaction() get a session bound to the
+    read-only engine, which runs in autocommit so a lookup is a single round-trip
+    with no BEGIN/COMMIT around it.
+    """
+
+    def __init__(self, request: Request):
+        self._request = request
+        self._session: Optional["AsyncSession"] = None
+        self.read_only = False
+
+    @property
+    def materialized(self) -> bool:
+        return self._session is not None
+
+    def _materialize(self) -> "AsyncSession":
+        if self._session is None:
+            # Decided on first use, so the marker dependency may run in any order
+            self.read_only = getattr(self._request.state, "read_only", False)
+            state = self._request.app.state
+            async_session_factory = state.postgres_read_only_session if self.read_only else state.postgres_session
+            self._session = async_session_factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything a repository touches (execute, add, begin, ...) creates the session
+        return getattr(self._materialize(), name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+async def read_only_transaction(request: Request) -> None:
+    """
+    Route dependency marking a request as read-only.
+    PostgreSQL: the request runs without a transaction and is never committed
+    DynamoDB: no effect
+    """
+    request.state.read_only = True
+
 def get_db_context() -> ContextDependency:
     """
     Returns the appropriate database context dependency based on configuration.
     For PostgreSQL: Returns a dependency that yields a database session
     For DynamoDB: Returns a dependency that yields a DynamoDB client
+    For Memory: Returns a dependency that yields the process-wide in-memory store
     """
     settings = get_settings()
     
     if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
         # Return the PostgreSQL session dependency
-        async def get_postgres_context(request: Request) -> AsyncGenerator[AsyncSession, None]:
-            async_session_factory = request.app.state.postgres_session
-            async with async_session_factory() as session:
-                try:
-                    yield session
+        async def get_postgres_context(request: Request) -> AsyncGenerator["AsyncSession", None]:
+            session = LazySession(request)
+            try:
+                yield session
+                if session.materialized and not session.read_only:
                     await session.commit()  # Automatically commit if no exceptions
-                except Exception:
+            except Exception:
+                if session.materialized:
                     await session.rollback()  # Rollback on exceptions
-                    raise
+                raise
+            finally:
+                await session.close()
         return get_postgres_context
     elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
-        # Return a DynamoDB context using the app-wide session
-        async def get_dynamo_context(request: Request) -> AsyncGenerator[DynamoDBClient, None]:
-            # Get the session from app state
-            session = request.app.state.dynamodb_session
-            
-            # Create a client for this request using the shared session
-            async with session.client(
-                'dynamodb',
-                endpoint_url=settings.AWS_ENDPOINT,
-                config=Config(
-                    connect_timeout=5.0,
-                    read_timeout=10.0,
-                    retries={'max_attempts': 3}
-                )
-            ) as dynamodb_client:
-                dynamodb_client: DynamoDBClient
-                yield dynamodb_client
+        # Return a DynamoDB context using the app-wide client
+        async def get_dynamo_context(request: Request) -> AsyncGenerator["DynamoDBClient", None]:
+            # One client for the whole app, so its connection pool outlives each request
+            dynamodb_client: "DynamoDBClient" = request.app.state.dynamodb_client
+            yield dynamodb_client
         
         return get_dynamo_context
+    elif settings.DATABASE_TYPE == DatabaseType.MEMORY:
+        from src.repository.implementations.Memory.store import get_memory_store
+
+        async def get_memory_context() -> AsyncGenerator["MemoryStore", None]:
+            yield get_memory_store()
+
+        return get_memory_context
     else:
         raise ValueError("Invalid DATABASE_TYPE")
 
@@ -63,7 +111,7 @@ async def get_db_session_for_background():
     
     if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
         from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-        
+
         # Create engine and session factory
         engine = create_async_engine(settings.POSTGRES_DATABASE_URL)
         async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
@@ -78,6 +126,8 @@ async def get_db_session_for_background():
                 raise
     elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
         import aioboto3
+        from botocore.config import Config
+
         session = aioboto3.Session()
         
         async with session.client(
@@ -90,6 +140,10 @@ async def get_db_session_for_background():
             )
         ) as dynamodb_client:
             yield dynamodb_client
+    elif settings.DATABASE_TYPE == DatabaseType.MEMORY:
+        from src.repository.implementations.Memory.store import get_memory_store
+
+        yield get_memory_store()
     else:
         raise ValueError("Invalid DATABASE_TYPE")
 
@@ -1,23 +1,72 @@
 # src/db/factory.py
-from sqlalchemy.ext.asyncio import AsyncSession
-from types_aiobotocore_dynamodb import DynamoDBClient
 from src.repository.interfaces.interface_SubscriptionRepository import SubscriptionRepository as SubscriptionRepositoryInterface
-from src.repository.implementations.PostgreSQL.postgres_SubscriptionRepository import SubscriptionRepository as PostgresSubscriptionRepository
-from src.repository.implementations.AWS_DynamoDB.awsdynamodb_SubscriptionRepository import SubscriptionRepository as DynamoSubscriptionRepository
 from .settings import get_settings, DatabaseType
-from typing import Union
+from typing import Union, TYPE_CHECKING
 
-def create_subscription_repository(db_context: Union[AsyncSession, DynamoDBClient]) -> SubscriptionRepositoryInterface:
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from types_aiobotocore_dynamodb import DynamoDBClient
+    from src.repository.implementations.Memory.store import MemoryStore
+
+def create_backend_repository(
+        database_type: DatabaseType,
+        db_context: Union["AsyncSession", "DynamoDBClient", "MemoryStore"]
+    ) -> SubscriptionRepositoryInterface:
+    """
+    Creates the repository of one backend, without any wrapper.
+    Only the implementation for that backend is imported.
+    """
+    settings = get_settings()
+
+    if database_type == DatabaseType.POSTGRES:
+        from src.repository.implementations.PostgreSQL.postgres_SubscriptionRepository import SubscriptionRepository as PostgresSubscriptionRepository
+        return PostgresSubscriptionRepository(db_context)
+    elif database_type == DatabaseType.DYNAMODB:
+        from src.repository.implementations.AWS_DynamoDB.awsdynamodb_SubscriptionRepository import SubscriptionRepository as DynamoSubscriptionRepository
+        from src.repository.implementations.AWS_DynamoDB.metrics import get_capacity_metrics
+        from src.repository.implementations.AWS_DynamoDB.hedging import get_hedging_policy
+        return DynamoSubscriptionRepository(
+            db_context,
+            consistent_read=settings.DYNAMODB_CONSISTENT_READ,
+            metrics=get_capacity_metrics() if settings.DYNAMODB_CAPACITY_METRICS else None,
+            hedging=get_hedging_policy() if settings.DYNAMODB_HEDGED_READS else None
+        )
+    elif database_type == DatabaseType.MEMORY:
+        from src.repository.implementations.Memory.memory_SubscriptionRepository import SubscriptionRepository as MemorySubscriptionRepository
+        return MemorySubscriptionRepository(db_context)
+    else:
+        raise ValueError(f"Unsupported database type: {database_type}")
+
+def create_subscription_repository(db_context: Union["AsyncSession", "DynamoDBClient", "MemoryStore"]) -> SubscriptionRepositoryInterface:
     """
     Creates the appropriate repository based on configuration.
     For PostgreSQL: Uses the provided database session
     For DynamoDB: Uses the provided database client
+    For Memory: Uses the provided in-process store
+    With SHADOW_ENABLED a sample of the reads is mirrored to the shadow backend.
+    With COALESCE_READS concurrent reads of the same subscription share one call.
+    With CACHE_ENABLED the repository is wrapped in the read-through cache.
     """
     settings = get_settings()
-    
-    if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
-        return PostgresSubscriptionRepository(db_context)
-    elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
-        return DynamoSubscriptionRepository(db_context)
-    else:
-        raise ValueError(f"Unsupported database type: {settings.DATABASE_TYPE}")
+    repository = create_backend_repository(settings.DATABASE_TYPE, db_context)
+
+    if settings.SHADOW_ENABLED:
+        # Inside the cache, so backends are compared on the reads that reach them
+        from src.repository.implementations.Shadow.shadow_SubscriptionRepository import ShadowSubscriptionRepository, get_shadow_backend, get_shadow_stats
+        repository = ShadowSubscriptionRepository(
+            repository,
+            backend=get_shadow_backend(),
+            stats=get_shadow_stats(),
+            sample_rate=settings.SHADOW_SAMPLE_RATE
+        )
+
+    if settings.COALESCE_READS:
+        # Inside the cache, so concurrent misses of a hot key become one backend call
+        from src.repository.implementations.Coalescing.coalescing_SubscriptionRepository import CoalescingSubscriptionRepository, get_subscription_flights
+        repository = CoalescingSubscriptionRepository(repository, flights=get_subscription_flights())
+
+    if settings.CACHE_ENABLED:
+        from src.repository.implementations.Caching.caching_SubscriptionRepository import CachingSubscriptionRepository, get_subscription_cache
+        repository = CachingSubscriptionRepository(repository, cache=get_subscription_cache())
+
+    return repository
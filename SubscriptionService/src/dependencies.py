@@ -1,14 +1,17 @@
 # src/dependencies.py
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from types_aiobotocore_dynamodb import DynamoDBClient
 from src.repository.interfaces.interface_SubscriptionRepository import SubscriptionRepository as SubscriptionRepositoryInterface
 from src.service.SubscriptionService import SubscriptionService
 from src.db.factory import create_subscription_repository
-from src.db.db_context import db_context
-from typing import Union
+from src.db.db_context import db_context, read_only_transaction
+from typing import Union, TYPE_CHECKING
 
-async def get_subscription_repository(db: Union[AsyncSession, DynamoDBClient] = Depends(db_context)) -> SubscriptionRepositoryInterface:
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from types_aiobotocore_dynamodb import DynamoDBClient
+    from src.repository.implementations.Memory.store import MemoryStore
+
+async def get_subscription_repository(db: Union["AsyncSession", "DynamoDBClient", "MemoryStore"] = Depends(db_context)) -> SubscriptionRepositoryInterface:
     """
     Creates the appropriate repository based on configuration.
     The db parameter will be a database session for PostgreSQL or None for DynamoDB.
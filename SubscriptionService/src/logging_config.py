@@ -6,7 +6,15 @@ class CorrelationIdFilter:
         record.correlation_id = get_correlation_id() or "-"
         return True
 
+_logging_configured = False
+
 def setup_logging():
+    """Configure logging once per process; later calls are no-ops."""
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+
     dictConfig({
         "version": 1,
         "disable_existing_loggers": False,
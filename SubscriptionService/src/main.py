@@ -1,21 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import SubscriptionController
+from .routes import SubscriptionController, HealthController, MetricsController
 from .exceptions import BaseAppException
 import logging
 from src.logging_config import setup_logging
 from fastapi.responses import JSONResponse
 from src.middleware.correlation_id_middleware import CorrelationIdMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, AsyncExitStack
 from src.db.settings import get_settings, DatabaseType
-import aioboto3
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-import httpx
-from src.repository.implementations.PostgreSQL.debezium_config import generate_config_dict
-from aiokafka import AIOKafkaConsumer
-import json
-import asyncio
-from src.consumer.kafka import event_manager, setup_kafka_handlers
+from src.consumer.kafka import event_manager, invalidation_manager, setup_kafka_handlers, setup_local_handlers
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -25,52 +18,109 @@ async def lifespan(app: FastAPI):
     # Startup code (runs before application startup)
     # This is where you put code that was previously in @app.on_event("startup")
     logger.info("Running startup tasks...")
-
-    #SOME STARTUP TASKS
-    # Initialize settings
-    settings = get_settings()
-    if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
-        # Create an async engine
-        engine = create_async_engine(settings.POSTGRES_DATABASE_URL, echo=True, future=True)
-
-        # Create an async sessionmaker factory
-        app.state.postgres_session = async_sessionmaker(
-            bind=engine,
-            expire_on_commit=False,  # optional: objects stay active after commit
-            class_=AsyncSession
-        )
-
-        # Create Debezium connector
-        connector_config = await generate_config_dict(
-            settings=settings
-        )
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(settings.DEBEZIUM_URL, json=connector_config)
-            if resp.status_code not in {201, 409}: # Created (201) or Already Exists (409)
-                raise RuntimeError(f"Failed to register Debezium connector: {resp.status_code} {resp.text}")
+    app.state.ready = False
+
+    # Everything opened during startup is closed on shutdown, and also if a later startup step fails
+    async with AsyncExitStack() as exit_stack:
+        #SOME STARTUP TASKS
+        # Initialize settings
+        settings = get_settings()
+        # Backend libraries are imported here so only the configured one is ever loaded
+        if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
+            import httpx
+            from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+            from src.repository.implementations.PostgreSQL.debezium_config import generate_config_dict
+
+            # Create an async engine
+            engine = create_async_engine(settings.POSTGRES_DATABASE_URL, echo=True, future=True, pool_size=settings.POSTGRES_POOL_SIZE)
+            exit_stack.push_async_callback(engine.dispose)
+
+            # Create an async sessionmaker factory
+            app.state.postgres_session = async_sessionmaker(
+                bind=engine,
+                expire_on_commit=False,  # optional: objects stay active after commit
+                class_=AsyncSession
+            )
+
+            # Read-only requests share the pool but run in autocommit, so no BEGIN/COMMIT round-trips
+            app.state.postgres_read_only_session = async_sessionmaker(
+                bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+                expire_on_commit=False,
+                class_=AsyncSession
+            )
+
+            # Create Debezium connector
+            connector_config = await generate_config_dict(
+                settings=settings
+            )
+            async with httpx.AsyncClient() as client:
+                resp = await client.post(settings.DEBEZIUM_URL, json=connector_config)
+                if resp.status_code not in {201, 409}: # Created (201) or Already Exists (409)
+                    raise RuntimeError(f"Failed to register Debezium connector: {resp.status_code} {resp.text}")
+
+            if settings.WARMUP_ENABLED:
+                from src.db.warmup import warm_up_postgres
+                await warm_up_postgres(engine, settings)
         
-    # Create the aioboto3 session at application startup if using DynamoDB
-    elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
-        logger.info("Initializing DynamoDB session")
-        app.state.dynamodb_session = aioboto3.Session(
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-
-    # Start Kafka consumer as a background task
-    await setup_kafka_handlers()
-
-    logger.info("Startup tasks completed")
-    yield
-    # Shutdown code (runs after application shutdown)
-    logger.info("Running shutdown tasks...")
-
-    #SOME SHUTDOWN TASKS
+        # Create the aioboto3 session at application startup if using DynamoDB
+        elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
+            import aioboto3
+            from botocore.config import Config
+
+            logger.info("Initializing DynamoDB session")
+            app.state.dynamodb_session = aioboto3.Session(
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION
+            )
+
+            # One client for the whole app, so connections are reused across requests
+            app.state.dynamodb_client = await exit_stack.enter_async_context(
+                app.state.dynamodb_session.client(
+                    'dynamodb',
+                    endpoint_url=settings.AWS_ENDPOINT,
+                    config=Config(
+                        connect_timeout=5.0,
+                        read_timeout=10.0,
+                        retries={'max_attempts': 3},
+                        max_pool_connections=settings.DYNAMODB_MAX_POOL_CONNECTIONS
+                    )
+                )
+            )
+
+            if settings.WARMUP_ENABLED:
+                from src.db.warmup import warm_up_dynamodb
+                await warm_up_dynamodb(app.state.dynamodb_client, settings)
+
+        # No database, Debezium or Kafka: outbox events go straight to the in-process handlers
+        elif settings.DATABASE_TYPE == DatabaseType.MEMORY:
+            from src.repository.implementations.Memory.store import get_memory_store
+
+            logger.info("Using the in-memory store")
+            await setup_local_handlers(get_memory_store())
+
+        # Second backend that a sample of the reads is mirrored to, to compare latency
+        if settings.SHADOW_ENABLED:
+            from src.repository.implementations.Shadow.shadow_SubscriptionRepository import get_shadow_backend
+            await get_shadow_backend().start(settings, exit_stack)
+
+        # Start Kafka consumer as a background task; stopped first on shutdown, even if it only partly started
+        if settings.DATABASE_TYPE != DatabaseType.MEMORY:
+            exit_stack.push_async_callback(invalidation_manager.stop)
+            exit_stack.push_async_callback(event_manager.stop)
+            await setup_kafka_handlers()
+
+        app.state.ready = True
+        logger.info("Startup tasks completed")
+        yield
+        # Shutdown code (runs after application shutdown)
+        logger.info("Running shutdown tasks...")
+        app.state.ready = False
+
+        #SOME SHUTDOWN TASKS
     
-    # Shutdown: stop Kafka consumer gracefully
-    logger.info("Stopping Kafka consumer...")
-    await event_manager.stop()
+        # Leaving the exit stack stops the Kafka consumers, then closes the database engine / DynamoDB client
+        logger.info("Stopping Kafka consumer...")
 
     logger.info("Shutdown tasks completed")
     # This is where you put code that was previously in @app.on_event("shutdown")
@@ -103,4 +153,6 @@ async def app_exception_handler(request, exc):
 
 
 app.include_router(SubscriptionController.router)
+app.include_router(HealthController.router)
+app.include_router(MetricsController.router)
     
\ No newline at end of file
@@ -4,21 +4,47 @@ from src.repository.interfaces import interface_SubscriptionRepository
 from src.schemas import SubscriptionSchemas
 from src.exceptions import ResourceNotFoundException, BaseAppException, ResourceAlreadyExistsException
 import logging
+from typing import AsyncIterator, Dict, List, Optional
 from .utils import *
+from .metrics import CapacityMetrics, MeteredClient
+from .hedging import HedgingPolicy
 
 logger = logging.getLogger(__name__)
 
 class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionRepository):
 
-    def __init__(self, client: DynamoDBClient):
+    def __init__(
+            self,
+            client: DynamoDBClient,
+            consistent_read: bool = False,
+            metrics: Optional[CapacityMetrics] = None,
+            hedging: Optional[HedgingPolicy] = None
+        ):
         """
         Initialize the DynamoDB repository.
+        With consistent_read, reads by key are strongly consistent (twice the read capacity);
+        queries on the email index are always eventually consistent.
+        With metrics, the consumed capacity and throttling of every call is recorded per operation.
+        With hedging, slow reads by key are sent a second time (see HedgingPolicy).
         """
         # Initialize DynamoDB client
         self.client = client
+        self.consistent_read = consistent_read
+        self.metrics = metrics
+        self.hedging = hedging
         
         # You could also use a table name prefix from settings
         self.table_name = "subscriptions"
+        self.outbox_table_name = "subscriptions_outbox"
+
+        # GSI with hash key email and range key subscription_id
+        self.email_index_name = "email-index"
+
+    def _client(self, operation: str) -> DynamoDBClient:
+        """Client for one repository operation; its calls are recorded under that operation."""
+        if self.metrics is None:
+            return self.client
+        return MeteredClient(self.client, self.metrics, operation)
 
     async def get_subscription(self, subscription_id: str) -> SubscriptionSchemas.Subscription:
         '''
@@ -26,19 +52,25 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
         Or raises an exception if the user does not exist.
         '''
         try:
-            response = await self.client.get_item(
+            client = self._client("get_subscription")
+            request = dict(
                 TableName=self.table_name,
                 Key=await get_key(
                     pkey_name="subscription_id",
                     pkey_value=subscription_id
-                )
+                ),
+                ConsistentRead=self.consistent_read
             )
+            if self.hedging is None:
+                response = await client.get_item(**request)
+            else:
+                response = await self.hedging.run(lambda: client.get_item(**request))
 
             if 'Item' not in response:
                 logger.warning(f"Subscription with subscription_id {subscription_id} not found")
                 raise ResourceNotFoundException(f"Subscription with subscription_id {subscription_id} not found")
             
-            return await dynamodb_to_basemodel(
+            return from_dynamodb_item(
                 basemodel=SubscriptionSchemas.Subscription,
                 dynamodb_data=response['Item'],
                 include_empty_string_in_stringsets=False
@@ -51,6 +83,121 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
             logger.exception(f"Error getting subscription: {str(e)}")
             raise BaseAppException(f"Internal database error: {str(e)}") from e
 
+    async def get_subscriptions(self, subscription_ids: List[str]) -> List[SubscriptionSchemas.Subscription]:
+        '''
+        This function returns the Subscription instances that exist for the given IDs,
+        in the order of subscription_ids. IDs that do not exist are skipped.
+        '''
+        try:
+            client = self._client("get_subscriptions")
+            unique_ids = list(dict.fromkeys(subscription_ids))
+            items = await batch_get_items(
+                client=client,
+                table_name=self.table_name,
+                keys=[await get_key(pkey_name="subscription_id", pkey_value=subscription_id) for subscription_id in unique_ids],
+                ConsistentRead=self.consistent_read
+            )
+
+            subscriptions = {}
+            for item in items:
+                subscription = from_dynamodb_item(
+                    basemodel=SubscriptionSchemas.Subscription,
+                    dynamodb_data=item,
+                    include_empty_string_in_stringsets=False
+                )
+                subscriptions[subscription.subscription_id] = subscription
+
+            return [subscriptions[subscription_id] for subscription_id in unique_ids if subscription_id in subscriptions]
+
+        except Exception as e:
+            logger.exception(f"Error getting subscriptions: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str],
+            limit: int
+        ) -> SubscriptionSchemas.SubscriptionPage:
+        '''
+        This function returns a page of the Subscription instances of an email,
+        ordered by subscription_id. It queries the email GSI, so it reads only the
+        page instead of scanning the table; after is the subscription_id where the
+        previous page stopped and is turned into the ExclusiveStartKey. Like on
+        Postgres, one item more than the page tells whether there is a next page:
+        LastEvaluatedKey is also returned when the last page is exactly full.
+        '''
+        try:
+            client = self._client("list_subscriptions")
+            query = {
+                "TableName": self.table_name,
+                "IndexName": self.email_index_name,
+                "KeyConditionExpression": "#email = :email",
+                "ExpressionAttributeNames": {"#email": "email"},
+                "ExpressionAttributeValues": {":email": {"S": email}},
+                "Limit": limit + 1
+            }
+            if after is not None:
+                # A GSI start key holds the index keys and the table key
+                query["ExclusiveStartKey"] = {
+                    "email": {"S": email},
+                    "subscription_id": {"S": after}
+                }
+
+            response = await client.query(**query)
+
+            subscriptions = [
+                from_dynamodb_item(
+                    basemodel=SubscriptionSchemas.Subscription,
+                    dynamodb_data=item,
+                    include_empty_string_in_stringsets=False
+                )
+                for item in response.get("Items", [])[:limit]
+            ]
+
+            if len(response.get("Items", [])) > limit:
+                next_after = subscriptions[-1].subscription_id
+            elif "LastEvaluatedKey" in response:
+                # The 1 MB response size stopped the query before the extra item, so there may be more
+                next_after = response["LastEvaluatedKey"]["subscription_id"]["S"]
+            else:
+                next_after = None
+
+            return SubscriptionSchemas.SubscriptionPage(
+                subscriptions=subscriptions,
+                next_after=next_after
+            )
+
+        except Exception as e:
+            logger.exception(f"Error listing subscriptions: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+    async def stream_subscriptions(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[SubscriptionSchemas.Subscription]:
+        '''
+        This function yields every Subscription instance using a parallel segmented Scan,
+        batch_size items per page; only a few pages are held in memory.
+        '''
+        try:
+            client = self._client("stream_subscriptions")
+            async for page in parallel_scan(
+                client=client,
+                table_name=self.table_name,
+                page_size=batch_size
+            ):
+                for item in page:
+                    yield from_dynamodb_item(
+                        basemodel=SubscriptionSchemas.Subscription,
+                        dynamodb_data=item,
+                        include_empty_string_in_stringsets=False
+                    )
+
+        except Exception as e:
+            logger.exception(f"Error streaming subscriptions: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
     async def create_subscription(
             self,
             Subscription_instance: SubscriptionSchemas.Subscription,
@@ -63,9 +210,10 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
         This function will return the User instance.
         '''
         try:
-            response = await self.client.put_item(
+            client = self._client("create_subscription")
+            response = await client.put_item(
                 TableName=self.table_name,
-                Item=await basemodel_to_dynamodb(
+                Item=to_dynamodb_item(
                     basemodel=SubscriptionSchemas.Subscription(
                         subscription_id=Subscription_instance.subscription_id,
                         subscription_type=Subscription_instance.subscription_type,
@@ -92,4 +240,54 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
 
         except Exception as e:
             logger.exception(f"Internal database error: {str(e)}")
-            raise BaseAppException(f"Internal database error: {str(e)}") from e
\ No newline at end of file
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+    async def create_subscriptions(
+            self,
+            Subscription_instances: List[SubscriptionSchemas.Subscription],
+            Outbox_instances: List[SubscriptionSchemas.Outbox]
+        ) -> Dict[str, SubscriptionSchemas.BulkItemStatus]:
+        '''
+        This function inserts many Subscription instances with TransactWriteItems,
+        50 per transaction and several transactions at a time. Each Put is paired
+        with the Put of its outbox event, so a subscription and its event are
+        written together or not at all.
+        Like create_subscription it never overwrites an existing subscription.
+        It returns the status of each subscription by subscription_id.
+        '''
+        try:
+            client = self._client("create_subscriptions")
+            operations = []
+            for Subscription_instance, Outbox_instance in zip(Subscription_instances, Outbox_instances):
+                operations.append({
+                    "Put": {
+                        "TableName": self.table_name,
+                        "Item": to_dynamodb_item(
+                            basemodel=SubscriptionSchemas.Subscription(
+                                subscription_id=Subscription_instance.subscription_id,
+                                subscription_type=Subscription_instance.subscription_type,
+                                email=Subscription_instance.email,
+                                is_active=False if Subscription_instance.is_active == False else True #Default to True
+                            )
+                        ),
+                        "ConditionExpression": "attribute_not_exists(subscription_id)"
+                    }
+                })
+                operations.append(outbox_put(self.outbox_table_name, Outbox_instance))
+
+            results = await transact_write_items(client=client, operations=operations, group_size=2)
+
+            statuses = {}
+            for Subscription_instance, reason in zip(Subscription_instances, results):
+                if reason is None:
+                    statuses[Subscription_instance.subscription_id] = "created"
+                elif reason == "ConditionalCheckFailed":
+                    statuses[Subscription_instance.subscription_id] = "already_exists"
+                else:
+                    logger.warning(f"Subscription {Subscription_instance.subscription_id} not created: {reason}")
+                    statuses[Subscription_instance.subscription_id] = "failed"
+            return statuses
+
+        except Exception as e:
+            logger.exception(f"Internal database error: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
@@ -0,0 +1,158 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from botocore.exceptions import ClientError
+
+# Client methods that accept ReturnConsumedCapacity, and the capacity they consume
+CAPACITY_OPERATIONS = {
+    "get_item": "read",
+    "batch_get_item": "read",
+    "query": "read",
+    "scan": "read",
+    "transact_get_items": "read",
+    "put_item": "write",
+    "update_item": "write",
+    "delete_item": "write",
+    "batch_write_item": "write",
+    "transact_write_items": "write"
+}
+
+# Error codes DynamoDB returns when a request exceeds the table's throughput
+THROTTLING_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded"
+}
+
+# Cancellation reasons of a transaction that was throttled
+THROTTLING_REASONS = {"ThrottlingError", "ProvisionedThroughputExceeded"}
+
+COUNTERS = (
+    "calls", "read_capacity_units", "write_capacity_units",
+    "retries", "throttles", "condition_failures", "errors", "unprocessed"
+)
+
+def request_table_names(request: Dict[str, Any]) -> List[str]:
+    '''
+    This function returns the tables a request addresses, for attributing calls that failed.
+    '''
+    if "TableName" in request:
+        return [request["TableName"]]
+    if "RequestItems" in request:
+        return list(request["RequestItems"])
+    if "TransactItems" in request:
+        return list(dict.fromkeys(
+            operation["TableName"]
+            for item in request["TransactItems"]
+            for operation in item.values()
+        ))
+    return ["unknown"]
+
+class CapacityMetrics:
+    """
+    Consumed capacity, retries and throttling of DynamoDB calls, per table and
+    repository operation.
+
+    retries are the attempts the SDK repeated on its own (RetryAttempts);
+    throttles are calls that failed because of throughput, whether the SDK
+    gave up or the caller (e.g. the batch and scan helpers) retries them itself;
+    condition_failures are writes rejected by their ConditionExpression (e.g. a
+    user that already exists), which are expected and kept apart from errors;
+    unprocessed counts the keys and items batch calls returned for a retry.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def _entry(self, table: str, operation: str) -> Dict[str, float]:
+        entry = self._entries.get((table, operation))
+        if entry is None:
+            entry = self._entries[(table, operation)] = dict.fromkeys(COUNTERS, 0)
+        return entry
+
+    def record_response(self, operation: str, kind: str, request: Dict[str, Any], response: Dict[str, Any]) -> None:
+        consumed = response.get("ConsumedCapacity") or []
+        if isinstance(consumed, dict):
+            consumed = [consumed]  # Single-table calls return one entry, batches and transactions a list
+        tables = [capacity["TableName"] for capacity in consumed] or request_table_names(request)
+
+        for capacity in consumed:
+            entry = self._entry(capacity["TableName"], operation)
+            if "ReadCapacityUnits" in capacity or "WriteCapacityUnits" in capacity:
+                entry["read_capacity_units"] += capacity.get("ReadCapacityUnits", 0)
+                entry["write_capacity_units"] += capacity.get("WriteCapacityUnits", 0)
+            else:
+                entry[f"{kind}_capacity_units"] += capacity.get("CapacityUnits", 0)
+
+        for table in tables:
+            self._entry(table, operation)["calls"] += 1
+        self._entry(tables[0], operation)["retries"] += response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+        for table, keys in (response.get("UnprocessedKeys") or {}).items():
+            self._entry(table, operation)["unprocessed"] += len(keys["Keys"])
+        for table, items in (response.get("UnprocessedItems") or {}).items():
+            self._entry(table, operation)["unprocessed"] += len(items)
+
+    def record_error(self, operation: str, request: Dict[str, Any], error: "ClientError") -> None:
+        code = error.response.get("Error", {}).get("Code")
+        reasons = {reason.get("Code") for reason in error.response.get("CancellationReasons", [])}
+        throttled = code in THROTTLING_ERRORS or bool(reasons & THROTTLING_REASONS)
+        condition_failed = code == "ConditionalCheckFailedException" or (reasons - {None, "None"}) == {"ConditionalCheckFailed"}
+
+        tables = request_table_names(request)
+        for table in tables:
+            entry = self._entry(table, operation)
+            entry["calls"] += 1
+            if throttled:
+                entry["throttles"] += 1
+            elif condition_failed:
+                entry["condition_failures"] += 1
+            else:
+                entry["errors"] += 1
+        self._entry(tables[0], operation)["retries"] += error.response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+    def stats(self) -> dict:
+        tables: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (table, operation), entry in sorted(self._entries.items()):
+            tables.setdefault(table, {})[operation] = dict(entry)
+        return tables
+
+@lru_cache()
+def get_capacity_metrics() -> CapacityMetrics:
+    """Process-wide DynamoDB metrics shared by every request's repository."""
+    return CapacityMetrics()
+
+class MeteredClient:
+    """
+    Wraps a DynamoDB client for one repository operation: every call that
+    supports it requests ReturnConsumedCapacity, and its consumed capacity,
+    retries and throttling are recorded under that operation.
+    Everything else (exceptions, describe_table, ...) is the client's own.
+    """
+
+    def __init__(self, client: Any, metrics: CapacityMetrics, operation: str):
+        self._client = client
+        self._metrics = metrics
+        self._operation = operation
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._client, name)
+        kind = CAPACITY_OPERATIONS.get(name)
+        if kind is None:
+            return method
+
+        # Imported here, so importing this module (e.g. for the metrics endpoint) does not pull in botocore
+        from botocore.exceptions import ClientError
+
+        async def metered_call(**request: Any) -> Dict[str, Any]:
+            request.setdefault("ReturnConsumedCapacity", "TOTAL")
+            try:
+                response = await method(**request)
+            except ClientError as e:
+                self._metrics.record_error(self._operation, request, e)
+                raise
+            self._metrics.record_response(self._operation, kind, request, response)
+            return response
+
+        return metered_call
@@ -1,5 +1,13 @@
-from pydantic import BaseModel
-from typing import Any, Dict, Type
+import asyncio
+import json
+import random
+import types
+import uuid
+from contextlib import aclosing
+from functools import lru_cache
+from botocore.exceptions import ClientError
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, NamedTuple, Optional, Type, Union, get_args, get_origin
 
 def transform_basemodel_field_to_dynamodb_field(
     value: Any,
@@ -90,6 +98,129 @@ async def dynamodb_to_basemodel(
     except Exception as e:
         raise ValueError(f"Error validating data against {basemodel.__name__}: {str(e)}")
 
+# ---------------------------------------------------------------------------
+# Compiled serializers
+#
+# basemodel_to_dynamodb / dynamodb_to_basemodel decide how to convert every
+# value from its runtime type. The functions below look at the model's field
+# annotations once per model class, cache the resulting plan, and then only
+# run the converter chosen for each field. They produce the same items and
+# models and need no await.
+# ---------------------------------------------------------------------------
+
+def _unwrap_optional(annotation: Any) -> Any:
+    """Optional[X] -> X, anything else unchanged."""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+def _scalar_type(annotation: Any) -> Optional[type]:
+    """The scalar type (str, bool, int, float) a field always holds, if there is one."""
+    annotation = _unwrap_optional(annotation)
+    if get_origin(annotation) is Literal:
+        literal_types = {type(value) for value in get_args(annotation)}
+        annotation = literal_types.pop() if len(literal_types) == 1 else None
+    return annotation if annotation in (str, bool, int, float) else None
+
+# DynamoDB type tag of each scalar type
+_SCALAR_TAGS = {str: "S", bool: "BOOL", int: "N", float: "N"}
+
+@lru_cache(maxsize=None)
+def compile_serializer(
+        basemodel: Type[BaseModel],
+        add_empty_string_to_stringsets: bool = False
+    ) -> Callable[[BaseModel], Dict[str, Any]]:
+    '''
+    This function builds the BaseModel -> DynamoDB item converter for a model class.
+    Scalar fields are tagged directly; other fields are dumped like model_dump()
+    would and then converted generically.
+    '''
+    def generic(value: Any) -> Any:
+        return transform_basemodel_field_to_dynamodb_field(value, add_empty_string_to_stringsets)
+
+    if basemodel.model_config.get("extra") == "allow" or basemodel.model_computed_fields:
+        # model_dump() would include fields that are not in model_fields
+        return lambda instance: {key: generic(value) for key, value in instance.model_dump().items() if value is not None}
+
+    # (name, scalar type or None, tag, dump for non-scalar fields)
+    plan = []
+    for name, field in basemodel.model_fields.items():
+        scalar_type = _scalar_type(field.annotation)
+        if scalar_type is not None:
+            plan.append((name, scalar_type, _SCALAR_TAGS[scalar_type], None))
+        else:
+            plan.append((name, None, None, TypeAdapter(field.annotation).dump_python))
+
+    def serialize(instance: BaseModel) -> Dict[str, Any]:
+        values = instance.__dict__
+        item = {}
+        for name, scalar_type, tag, dump in plan:
+            value = values.get(name)
+            if value is None:
+                continue
+            if value.__class__ is scalar_type:
+                item[name] = {tag: value if tag != "N" else str(value)}
+            elif dump is not None:
+                item[name] = generic(dump(value))
+            else:
+                # Not the annotated type, e.g. from model_construct
+                item[name] = generic(value)
+        return item
+
+    return serialize
+
+@lru_cache(maxsize=None)
+def compile_deserializer(
+        basemodel: Type[BaseModel],
+        include_empty_string_in_stringsets: bool = False
+    ) -> Callable[[Dict[str, Any]], BaseModel]:
+    '''
+    This function builds the DynamoDB item -> BaseModel converter for a model class.
+    Attributes of string and boolean fields are unwrapped by their expected tag;
+    everything else, including attributes that are not fields, is converted
+    generically. Numbers keep the int/float distinction of the generic path.
+    '''
+    def generic(value: Any) -> Any:
+        return transform_dynamodb_field_to_basemodel_field(value, include_empty_string_in_stringsets)
+
+    tags = {}
+    for name, field in basemodel.model_fields.items():
+        scalar_type = _scalar_type(field.annotation)
+        if scalar_type is str or scalar_type is bool:
+            tags[name] = _SCALAR_TAGS[scalar_type]
+
+    def deserialize(dynamodb_data: Dict[str, Any]) -> BaseModel:
+        data = {}
+        for key, value in dynamodb_data.items():
+            try:
+                data[key] = value[tags[key]]
+            except (KeyError, TypeError):
+                # Not a string/boolean field, or not the expected tag
+                data[key] = generic(value)
+        try:
+            return basemodel.model_validate(data)
+        except Exception as e:
+            raise ValueError(f"Error validating data against {basemodel.__name__}: {str(e)}")
+
+    return deserialize
+
+def to_dynamodb_item(
+        basemodel: BaseModel,
+        add_empty_string_to_stringsets: bool = False
+    ) -> Dict[str, Any]:
+    """Synchronous, compiled equivalent of basemodel_to_dynamodb."""
+    return compile_serializer(type(basemodel), add_empty_string_to_stringsets)(basemodel)
+
+def from_dynamodb_item(
+        basemodel: Type[BaseModel],
+        dynamodb_data: Dict[str, Any],
+        include_empty_string_in_stringsets: bool = False
+    ) -> BaseModel:
+    """Synchronous, compiled equivalent of dynamodb_to_basemodel."""
+    return compile_deserializer(basemodel, include_empty_string_in_stringsets)(dynamodb_data)
+
 async def get_key(
         pkey_name: str,
         pkey_value: str | int,
@@ -118,4 +249,325 @@ async def get_key(
             else:
                 raise TypeError(f"Unsupported type for sort key value: {type(skey_value)}")
     
-    return key
\ No newline at end of file
+    return key
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+
+async def batch_get_items(
+        client: Any,
+        table_name: str,
+        keys: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        max_attempts: int = 8,
+        base_delay: float = 0.05,
+        max_delay: float = 2.0,
+        **keys_and_attributes: Any
+    ) -> List[Dict[str, Any]]:
+    '''
+    This function reads many items by key with BatchGetItem.
+    Extra arguments (ProjectionExpression, ExpressionAttributeNames,
+    ConsistentRead) are sent with the keys of every chunk.
+    Keys are sent in chunks of 100, up to max_concurrency chunks at a time.
+    UnprocessedKeys (throttling, 16 MB response limit) are retried with
+    exponential backoff and full jitter; if keys are still unprocessed after
+    max_attempts a RuntimeError is raised.
+    Keys must be unique. Items are returned in no particular order; keys
+    that do not exist are simply absent.
+    '''
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        items = []
+        request_items = {table_name: {"Keys": chunk, **keys_and_attributes}}
+        async with semaphore:
+            for attempt in range(max_attempts):
+                response = await client.batch_get_item(RequestItems=request_items)
+                items.extend(response.get("Responses", {}).get(table_name, []))
+
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    return items
+                await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+        unprocessed = len(request_items.get(table_name, {}).get("Keys", []))
+        raise RuntimeError(f"BatchGetItem left {unprocessed} keys unprocessed after {max_attempts} attempts")
+
+    chunks = [keys[i:i + BATCH_GET_MAX_KEYS] for i in range(0, len(keys), BATCH_GET_MAX_KEYS)]
+    results = await asyncio.gather(*(get_chunk(chunk) for chunk in chunks))
+    return [item for items in results for item in items]
+
+# BatchWriteItem accepts at most 25 requests
+BATCH_WRITE_MAX_ITEMS = 25
+
+async def batch_write_items(
+        client: Any,
+        table_name: str,
+        items: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        max_attempts: int = 8,
+        base_delay: float = 0.05,
+        max_delay: float = 2.0
+    ) -> None:
+    '''
+    This function writes many items with BatchWriteItem (PutRequest).
+    Items are sent in chunks of 25, up to max_concurrency chunks at a time;
+    an existing item with the same key is replaced.
+    UnprocessedItems (throttling) are retried with exponential backoff and
+    full jitter; if items are still unprocessed after max_attempts a
+    RuntimeError is raised.
+    '''
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def write_chunk(chunk: List[Dict[str, Any]]) -> None:
+        request_items = {table_name: [{"PutRequest": {"Item": item}} for item in chunk]}
+        async with semaphore:
+            for attempt in range(max_attempts):
+                response = await client.batch_write_item(RequestItems=request_items)
+
+                request_items = response.get("UnprocessedItems") or {}
+                if not request_items:
+                    return
+                await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+        unprocessed = len(request_items.get(table_name, []))
+        raise RuntimeError(f"BatchWriteItem left {unprocessed} items unprocessed after {max_attempts} attempts")
+
+    chunks = [items[i:i + BATCH_WRITE_MAX_ITEMS] for i in range(0, len(items), BATCH_WRITE_MAX_ITEMS)]
+    await asyncio.gather(*(write_chunk(chunk) for chunk in chunks))
+
+# TransactWriteItems accepts at most 100 operations per request
+TRANSACT_WRITE_MAX_ITEMS = 100
+
+# Cancellation reasons and errors that may succeed when the operation is sent again
+TRANSACT_WRITE_RETRYABLE = {
+    "None",  # Did not fail itself, cancelled because another operation in the transaction did
+    "TransactionConflict",
+    "ThrottlingError",
+    "ProvisionedThroughputExceeded",
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+}
+
+async def transact_write_items(
+        client: Any,
+        operations: List[Dict[str, Any]],
+        max_concurrency: int = 8,
+        max_attempts: int = 5,
+        base_delay: float = 0.05,
+        max_delay: float = 2.0,
+        group_size: int = 1
+    ) -> List[Optional[str]]:
+    '''
+    This function runs many TransactWriteItems operations (Put, Update, Delete,
+    ConditionCheck) in chunks of 100, up to max_concurrency chunks at a time.
+    Each chunk is atomic on its own; chunks are independent of each other.
+
+    With group_size, every group_size consecutive operations form a group
+    (e.g. an Update and the Put of its outbox event) that is always sent in
+    the same chunk, so a group is written completely or not at all.
+
+    When a chunk is cancelled, the groups that caused it (for example a failed
+    ConditionExpression) are dropped and the rest are sent again; throttling and
+    transaction conflicts are retried with exponential backoff and full jitter.
+
+    Returns, per group (per operation without group_size), None if it was written,
+    or the reason it was not (e.g. "ConditionalCheckFailed", or the error code of
+    a failed request).
+    '''
+    if len(operations) % group_size:
+        raise ValueError(f"{len(operations)} operations do not form groups of {group_size}")
+    results: List[Optional[str]] = [None] * (len(operations) // group_size)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def write_chunk(indexes: List[int]) -> None:
+        async with semaphore:
+            for attempt in range(max_attempts):
+                items = [operation for i in indexes for operation in operations[i * group_size:(i + 1) * group_size]]
+                try:
+                    await client.transact_write_items(TransactItems=items)
+                    return
+                except ClientError as e:
+                    code = e.response["Error"]["Code"]
+                    reasons = [reason.get("Code", "None") for reason in e.response.get("CancellationReasons", [])]
+                    if code != "TransactionCanceledException" or len(reasons) != len(items):
+                        reasons = [code] * len(items)
+
+                    retry = []
+                    for n, i in enumerate(indexes):
+                        failed = [reason for reason in reasons[n * group_size:(n + 1) * group_size] if reason not in TRANSACT_WRITE_RETRYABLE]
+                        if failed:
+                            results[i] = failed[0]
+                        else:
+                            retry.append(i)
+                    indexes = retry
+                    if not indexes:
+                        return
+                    await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+            for i in indexes:
+                results[i] = "RetriesExhausted"
+
+    chunk_size = TRANSACT_WRITE_MAX_ITEMS // group_size
+    chunks = [list(range(i, min(i + chunk_size, len(results)))) for i in range(0, len(results), chunk_size)]
+    await asyncio.gather(*(write_chunk(chunk) for chunk in chunks))
+    return results
+
+def outbox_put(
+        table_name: str,
+        Outbox_instance: BaseModel
+    ) -> Dict[str, Any]:
+    '''
+    This function returns the TransactWriteItems Put of a {eventtype_prefix}_success
+    outbox event, with the same attributes as a row of the PostgreSQL outbox table.
+    The payload is stored as a JSON string, as the consumers expect it.
+    '''
+    return {
+        "Put": {
+            "TableName": table_name,
+            "Item": {
+                "id": {"S": str(uuid.uuid4())},
+                "aggregatetype": {"S": Outbox_instance.aggregatetype},
+                "aggregateid": {"S": Outbox_instance.aggregateid},
+                "eventtype": {"S": f"{Outbox_instance.eventtype_prefix}_success"},
+                "payload": {"S": json.dumps(Outbox_instance.payload)}
+            }
+        }
+    }
+
+# Scan errors that may succeed when the page is requested again
+SCAN_RETRYABLE = {
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+}
+
+class ScanPage(NamedTuple):
+    segment: int
+    items: List[Dict[str, Any]]
+    last_evaluated_key: Optional[Dict[str, Any]]  # None once the segment is finished
+
+async def parallel_scan_pages(
+        client: Any,
+        table_name: str,
+        total_segments: int = 4,
+        max_pages_in_flight: Optional[int] = None,
+        page_size: Optional[int] = None,
+        start_keys: Optional[Dict[int, Optional[Dict[str, Any]]]] = None,
+        max_attempts: int = 8,
+        base_delay: float = 0.05,
+        max_delay: float = 2.0,
+        **scan_kwargs: Any
+    ) -> AsyncIterator[ScanPage]:
+    '''
+    This function is parallel_scan with positions: it yields every page,
+    empty ones included, with its segment and LastEvaluatedKey, so the caller
+    can checkpoint each segment. To resume, pass start_keys (segment ->
+    ExclusiveStartKey, None to start the segment from the beginning); only the
+    segments in start_keys are scanned, so finished segments are left out.
+    '''
+    if total_segments < 1:
+        raise ValueError("total_segments must be at least 1")
+    if start_keys is None:
+        start_keys = dict.fromkeys(range(total_segments))
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pages_in_flight or total_segments)
+    delay = 0.0
+
+    async def scan_segment(segment: int) -> None:
+        nonlocal delay
+        request = {"TableName": table_name, **scan_kwargs}
+        if total_segments > 1:
+            request.update(Segment=segment, TotalSegments=total_segments)
+        if page_size:
+            request["Limit"] = page_size
+        if start_keys[segment]:
+            request["ExclusiveStartKey"] = start_keys[segment]
+
+        while True:
+            for attempt in range(max_attempts):
+                if delay:
+                    await asyncio.sleep(random.uniform(delay / 2, delay))
+                try:
+                    response = await client.scan(**request)
+                    break
+                except ClientError as e:
+                    if e.response["Error"]["Code"] not in SCAN_RETRYABLE or attempt == max_attempts - 1:
+                        raise
+                    delay = min(max_delay, max(base_delay, delay * 2))
+            delay = delay / 2 if delay > base_delay else 0.0
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            await queue.put(ScanPage(segment, response.get("Items", []), last_evaluated_key))
+            if not last_evaluated_key:
+                return
+            request["ExclusiveStartKey"] = last_evaluated_key
+
+    async def run_segment(segment: int) -> None:
+        # The consumer learns that a segment ended, or why it failed, through the queue
+        try:
+            await scan_segment(segment)
+            await queue.put(None)
+        except Exception as e:
+            await queue.put(e)
+
+    tasks = [asyncio.create_task(run_segment(segment)) for segment in start_keys]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            page = await queue.get()
+            if page is None:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield page
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def parallel_scan(
+        client: Any,
+        table_name: str,
+        total_segments: int = 4,
+        max_pages_in_flight: Optional[int] = None,
+        page_size: Optional[int] = None,
+        max_attempts: int = 8,
+        base_delay: float = 0.05,
+        max_delay: float = 2.0,
+        **scan_kwargs: Any
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+    '''
+    This function scans a whole table with total_segments concurrent Scan
+    requests (Segment/TotalSegments) and yields the items page by page, in
+    no particular order. Extra arguments (ProjectionExpression, FilterExpression,
+    ConsistentRead, ...) are passed to every Scan; page_size sets Limit.
+
+    At most max_pages_in_flight pages (default: total_segments) are buffered;
+    segments stop reading while the consumer is behind.
+
+    Throttled pages are requested again. The delay is shared by all segments:
+    it doubles (up to max_delay) on every throttling error and halves on every
+    successful page, so the scan slows down together instead of every segment
+    hammering the table on its own. A page still failing after max_attempts
+    raises the ClientError.
+
+    Closing the iterator early (break, exception) cancels the remaining segments.
+    '''
+    async with aclosing(parallel_scan_pages(
+        client,
+        table_name,
+        total_segments=total_segments,
+        max_pages_in_flight=max_pages_in_flight,
+        page_size=page_size,
+        max_attempts=max_attempts,
+        base_delay=base_delay,
+        max_delay=max_delay,
+        **scan_kwargs
+    )) as pages:
+        async for page in pages:
+            if page.items:
+                yield page.items
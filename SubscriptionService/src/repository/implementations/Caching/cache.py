@@ -0,0 +1,82 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+class TTLCache:
+    """
+    In-process cache with a per-entry time-to-live and least-recently-used eviction.
+
+    The cache is bounded by max_entries: inserting into a full cache evicts the
+    least recently read or written entry. Expired entries are dropped lazily
+    when they are read.
+
+    Fills are guarded by an invalidation token so that a value read from the
+    database before an invalidation arrived is never written back afterwards.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._invalidations = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def token(self) -> int:
+        """Returns a token to pass to set() after reading the value from the database."""
+        return self._invalidations
+
+    def set(self, key: Hashable, value: Any, token: Optional[int] = None) -> None:
+        """
+        Store a value. If a token is given and any invalidation happened since it
+        was taken, the value may be stale and is not stored.
+        """
+        if token is not None and token != self._invalidations:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._invalidations += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
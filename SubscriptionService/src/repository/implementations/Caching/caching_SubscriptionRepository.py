@@ -0,0 +1,134 @@
+from functools import lru_cache
+from src.repository.interfaces import interface_SubscriptionRepository
+from src.schemas import SubscriptionSchemas
+from src.db.settings import get_settings
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+@lru_cache()
+def get_subscription_cache() -> TTLCache:
+    """Process-wide subscription cache shared by every request's repository."""
+    settings = get_settings()
+    return TTLCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.CACHE_TTL_SECONDS
+    )
+
+class CachingSubscriptionRepository(interface_SubscriptionRepository.SubscriptionRepository):
+    """
+    Read-through cache in front of any SubscriptionRepository implementation.
+
+    get_subscription is served from the in-process cache when possible. Writes
+    made through this repository invalidate the local entry. Other pods learn
+    about changes from the subscription outbox events (see src/consumer/kafka.py);
+    changes that emit no event are picked up when the entry's TTL runs out.
+    """
+
+    def __init__(
+            self,
+            repository: interface_SubscriptionRepository.SubscriptionRepository,
+            cache: TTLCache
+        ):
+        self.repository = repository
+        self.cache = cache
+
+    async def get_subscription(
+            self,
+            subscription_id: str
+        ) -> SubscriptionSchemas.Subscription:
+
+        subscription = self.cache.get(subscription_id)
+        if subscription is not None:
+            return subscription
+
+        token = self.cache.token()
+        subscription = await self.repository.get_subscription(subscription_id)
+        self.cache.set(subscription_id, subscription, token)
+        return subscription
+
+    async def get_subscriptions(
+            self,
+            subscription_ids: List[str]
+        ) -> List[SubscriptionSchemas.Subscription]:
+
+        unique_ids = list(dict.fromkeys(subscription_ids))
+        subscriptions = {}
+        for subscription_id in unique_ids:
+            subscription = self.cache.get(subscription_id)
+            if subscription is not None:
+                subscriptions[subscription_id] = subscription
+
+        # Everything not cached is fetched in one batch
+        missing = [subscription_id for subscription_id in unique_ids if subscription_id not in subscriptions]
+        if missing:
+            token = self.cache.token()
+            for subscription in await self.repository.get_subscriptions(missing):
+                self.cache.set(subscription.subscription_id, subscription, token)
+                subscriptions[subscription.subscription_id] = subscription
+
+        return [subscriptions[subscription_id] for subscription_id in unique_ids if subscription_id in subscriptions]
+
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str],
+            limit: int
+        ) -> SubscriptionSchemas.SubscriptionPage:
+
+        # Pages are not cached: nothing invalidates them when a subscription is created
+        return await self.repository.list_subscriptions(email=email, after=after, limit=limit)
+
+    async def stream_subscriptions(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[SubscriptionSchemas.Subscription]:
+
+        # Exports go straight to the repository and do not fill the cache
+        async for subscription in self.repository.stream_subscriptions(batch_size=batch_size):
+            yield subscription
+
+    async def create_subscription(
+            self,
+            Subscription_instance: SubscriptionSchemas.Subscription,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        try:
+            return await self.repository.create_subscription(
+                Subscription_instance=Subscription_instance,
+                Outbox_instance=Outbox_instance
+            )
+        finally:
+            self.cache.invalidate(Subscription_instance.subscription_id)
+
+    async def create_subscriptions(
+            self,
+            Subscription_instances: List[SubscriptionSchemas.Subscription],
+            Outbox_instances: List[SubscriptionSchemas.Outbox]
+        ) -> Dict[str, SubscriptionSchemas.BulkItemStatus]:
+
+        try:
+            return await self.repository.create_subscriptions(
+                Subscription_instances=Subscription_instances,
+                Outbox_instances=Outbox_instances
+            )
+        finally:
+            for Subscription_instance in Subscription_instances:
+                self.cache.invalidate(Subscription_instance.subscription_id)
+
+    async def delete_subscription(
+            self,
+            subscription_id: str,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        try:
+            return await self.repository.delete_subscription(
+                subscription_id=subscription_id,
+                Outbox_instance=Outbox_instance
+            )
+        finally:
+            self.cache.invalidate(subscription_id)
@@ -0,0 +1,107 @@
+from functools import lru_cache
+from src.repository.interfaces import interface_SubscriptionRepository
+from src.schemas import SubscriptionSchemas
+from typing import AsyncIterator, Dict, List, Optional
+from .single_flight import SingleFlight
+
+@lru_cache()
+def get_subscription_flights() -> SingleFlight:
+    """Process-wide in-flight get_subscription calls, so concurrent requests share them."""
+    return SingleFlight()
+
+class CoalescingSubscriptionRepository(interface_SubscriptionRepository.SubscriptionRepository):
+    """
+    Collapses concurrent get_subscription calls for the same subscription_id
+    into one backend call whose result every caller shares, e.g. clients
+    polling a subscription right after create-subscription returned.
+
+    The call runs on the database context of the request that started it;
+    the others only wait for it. Writes made through this repository make
+    later reads start a new call, so a read never returns data from before
+    a write on this pod that completed before the read began.
+    """
+
+    def __init__(
+            self,
+            repository: interface_SubscriptionRepository.SubscriptionRepository,
+            flights: SingleFlight
+        ):
+        self.repository = repository
+        self.flights = flights
+
+    async def get_subscription(
+            self,
+            subscription_id: str
+        ) -> SubscriptionSchemas.Subscription:
+
+        return await self.flights.do(
+            subscription_id,
+            lambda: self.repository.get_subscription(subscription_id)
+        )
+
+    async def get_subscriptions(
+            self,
+            subscription_ids: List[str]
+        ) -> List[SubscriptionSchemas.Subscription]:
+
+        return await self.repository.get_subscriptions(subscription_ids)
+
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str],
+            limit: int
+        ) -> SubscriptionSchemas.SubscriptionPage:
+
+        return await self.repository.list_subscriptions(email=email, after=after, limit=limit)
+
+    async def stream_subscriptions(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[SubscriptionSchemas.Subscription]:
+
+        async for subscription in self.repository.stream_subscriptions(batch_size=batch_size):
+            yield subscription
+
+    async def create_subscription(
+            self,
+            Subscription_instance: SubscriptionSchemas.Subscription,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        try:
+            return await self.repository.create_subscription(
+                Subscription_instance=Subscription_instance,
+                Outbox_instance=Outbox_instance
+            )
+        finally:
+            self.flights.forget(Subscription_instance.subscription_id)
+
+    async def create_subscriptions(
+            self,
+            Subscription_instances: List[SubscriptionSchemas.Subscription],
+            Outbox_instances: List[SubscriptionSchemas.Outbox]
+        ) -> Dict[str, SubscriptionSchemas.BulkItemStatus]:
+
+        try:
+            return await self.repository.create_subscriptions(
+                Subscription_instances=Subscription_instances,
+                Outbox_instances=Outbox_instances
+            )
+        finally:
+            for Subscription_instance in Subscription_instances:
+                self.flights.forget(Subscription_instance.subscription_id)
+
+    async def delete_subscription(
+            self,
+            subscription_id: str,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        try:
+            return await self.repository.delete_subscription(
+                subscription_id=subscription_id,
+                Outbox_instance=Outbox_instance
+            )
+        finally:
+            self.flights.forget(subscription_id)
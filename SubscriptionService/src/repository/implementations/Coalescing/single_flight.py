@@ -0,0 +1,71 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one: the first caller
+    (the leader) runs the call, callers arriving while it is in flight wait
+    for it and get the same result, or the same exception.
+
+    Nothing is kept once the call returns, so this is not a cache: it only
+    removes the duplicate backend calls of one round-trip window.
+
+    A variant separates calls for the same key that return different results
+    (e.g. different projections); forget(key) drops every variant of a key,
+    so callers arriving after a write start a new call instead of joining one
+    that may have read before it. If the leader is cancelled (e.g. its client
+    went away), the waiting callers retry the call themselves.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[Hashable, Hashable], "asyncio.Future"] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]], variant: Hashable = None) -> T:
+        flight_key = (key, variant)
+        while (flight := self._flights.get(flight_key)) is not None:
+            self.coalesced += 1
+            try:
+                # Shielded, so a waiting caller that is cancelled does not cancel the leader
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise  # This caller was cancelled, not the leader
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[flight_key] = flight
+        self.calls += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # Marked as retrieved: without waiting callers nobody else reads it
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(flight_key) is flight:
+                del self._flights[flight_key]
+
+    def forget(self, key: Hashable) -> None:
+        """Callers arriving from now on start a new call; those already waiting keep theirs."""
+        for flight_key in [flight_key for flight_key in self._flights if flight_key[0] == key]:
+            del self._flights[flight_key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "calls": self.calls,
+            "coalesced": self.coalesced
+        }
@@ -0,0 +1,111 @@
+from src.repository.interfaces import interface_SubscriptionRepository
+from src.schemas import SubscriptionSchemas
+from src.exceptions import ResourceNotFoundException, ResourceAlreadyExistsException
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+from .store import MemoryStore
+
+logger = logging.getLogger(__name__)
+
+class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionRepository):
+    """
+    In-memory SubscriptionRepository with the same semantics as the PostgreSQL
+    one: subscription IDs are unique, missing subscriptions raise
+    ResourceNotFoundException and every write records an outbox event.
+    """
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+        self.table = store.table("subscriptions")
+
+    async def get_subscription(self, subscription_id: str) -> SubscriptionSchemas.Subscription:
+        db_subscription = self.table.get(subscription_id)
+        if db_subscription is None:
+            logger.warning(f"Subscription with subscription_id {subscription_id} not found")
+            raise ResourceNotFoundException(f"Subscription with subscription_id {subscription_id} not found")
+
+        # Stored subscriptions were validated when they were written
+        return SubscriptionSchemas.Subscription.model_construct(**db_subscription)
+
+    async def get_subscriptions(self, subscription_ids: List[str]) -> List[SubscriptionSchemas.Subscription]:
+        return [
+            SubscriptionSchemas.Subscription.model_construct(**self.table[subscription_id])
+            for subscription_id in dict.fromkeys(subscription_ids) if subscription_id in self.table
+        ]
+
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str],
+            limit: int
+        ) -> SubscriptionSchemas.SubscriptionPage:
+
+        subscription_ids = sorted(
+            subscription_id for subscription_id, db_subscription in self.table.items()
+            if db_subscription["email"] == email and (after is None or subscription_id > after)
+        )
+
+        return SubscriptionSchemas.SubscriptionPage.model_construct(
+            subscriptions=[
+                SubscriptionSchemas.Subscription.model_construct(**self.table[subscription_id])
+                for subscription_id in subscription_ids[:limit]
+            ],
+            next_after=subscription_ids[limit - 1] if len(subscription_ids) > limit else None
+        )
+
+    async def stream_subscriptions(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[SubscriptionSchemas.Subscription]:
+
+        # Snapshot, so writes during the export do not break the iteration
+        for db_subscription in list(self.table.values()):
+            yield SubscriptionSchemas.Subscription(**db_subscription)
+
+    async def create_subscription(
+            self,
+            Subscription_instance: SubscriptionSchemas.Subscription,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        if Subscription_instance.subscription_id in self.table:
+            logger.warning(f"Subscription with subscription_id {Subscription_instance.subscription_id} already exists")
+            await self.store.publish(Outbox_instance, "failed", {"exception": "ResourceAlreadyExistsException"})
+            raise ResourceAlreadyExistsException(f"Subscription with subscription_id {Subscription_instance.subscription_id} already exists")
+
+        self.table[Subscription_instance.subscription_id] = {
+            "subscription_id": Subscription_instance.subscription_id,
+            "subscription_type": Subscription_instance.subscription_type,
+            "email": Subscription_instance.email,
+            "is_active": False if Subscription_instance.is_active == False else True #default to True
+        }
+        await self.store.publish(Outbox_instance, "success")
+
+    async def create_subscriptions(
+            self,
+            Subscription_instances: List[SubscriptionSchemas.Subscription],
+            Outbox_instances: List[SubscriptionSchemas.Outbox]
+        ) -> Dict[str, SubscriptionSchemas.BulkItemStatus]:
+
+        statuses = {}
+        for Subscription_instance, Outbox_instance in zip(Subscription_instances, Outbox_instances):
+            try:
+                await self.create_subscription(Subscription_instance, Outbox_instance)
+                statuses[Subscription_instance.subscription_id] = "created"
+            except ResourceAlreadyExistsException:
+                statuses[Subscription_instance.subscription_id] = "already_exists"
+        return statuses
+
+    async def delete_subscription(
+            self,
+            subscription_id: str,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        if self.table.pop(subscription_id, None) is None:
+            logger.warning(f"Subscription with ID {subscription_id} not found for deletion")
+            await self.store.publish(Outbox_instance, "failed", {"exception": "ResourceNotFoundException"})
+            raise ResourceNotFoundException(f"Subscription with ID {subscription_id} not found for deletion")
+
+        await self.store.publish(Outbox_instance, "success")
+        logger.info(f"Subscription with ID {subscription_id} deleted successfully")
@@ -1,6 +1,6 @@
 import uuid6
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, Boolean, BigInteger, JSON
+from sqlalchemy import Column, String, Boolean, BigInteger, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -8,7 +8,10 @@ Base = declarative_base()
 
 class SubscriptionORM(Base):
     __tablename__ = "subscriptions"
-    __table_args__ = {"schema": "auth"}
+    __table_args__ = (
+        Index("subscriptions_email_subscription_id_idx", "email", "subscription_id"),  # Listing by email
+        {"schema": "auth"}
+    )
     subscription_id = Column(UUID(as_uuid=True), primary_key=True, unique=True, index= True, default=uuid6.uuid6)
     subscription_type = Column(String, nullable=True)
     email = Column(String, nullable=False)
@@ -23,4 +26,6 @@ class SubscriptionsOutboxORM(Base):
     aggregateid = Column(String, nullable=False)       # e.g., "subscription_id"
     eventtype = Column(String, nullable=False)              # e.g., "subscription_created_success"
     payload = Column(JSON, nullable=False)             # Event data as JSON
-    created_at = Column(BigInteger, nullable=False, default=lambda: int(datetime.now(timezone.utc).timestamp() * 1000))
\ No newline at end of file
+    # Partition key: the table is partitioned by day on created_at (PostgresDB/init_tables*.sql),
+    # so it is part of the primary key
+    created_at = Column(BigInteger, primary_key=True, nullable=False, default=lambda: int(datetime.now(timezone.utc).timestamp() * 1000))
\ No newline at end of file
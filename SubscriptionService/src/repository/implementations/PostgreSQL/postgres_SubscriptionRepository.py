@@ -1,12 +1,15 @@
 from src.repository.interfaces import interface_SubscriptionRepository
 from src.schemas import SubscriptionSchemas
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert as pg_insert
 from src.repository.implementations.PostgreSQL.models.ORM_Subscription import SubscriptionORM, SubscriptionsOutboxORM
-from src.exceptions import ResourceNotFoundException, BaseAppException, ResourceAlreadyExistsException
+from src.repository.implementations.PostgreSQL.utils import outbox_event_from_cte, failed_outbox_event
+from src.exceptions import ResourceNotFoundException, BaseAppException, ResourceAlreadyExistsException, ValidationException
 import logging
 from sqlalchemy.exc import IntegrityError
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, AsyncIterator
+import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +23,9 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
             stmt = select(SubscriptionORM).where(SubscriptionORM.subscription_id == subscription_id)
             result = await self.db.execute(stmt)
             db_subscription = result.scalar_one_or_none()
-            if db_subscription:    
-                return SubscriptionSchemas.Subscription(
+            if db_subscription:
+                # Rows have the column types of the model already (the UUID as str), so they are not validated again
+                return SubscriptionSchemas.Subscription.model_construct(
                     subscription_id=str(db_subscription.subscription_id),
                     subscription_type=db_subscription.subscription_type,
                     email=db_subscription.email,
@@ -38,93 +42,250 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
             logger.exception(f"Error getting subscription: {str(e)}")
             raise BaseAppException(f"Internal database error: {str(e)}") from e
     
+    async def get_subscriptions(self, subscription_ids: List[str]) -> List[SubscriptionSchemas.Subscription]:
+        try:
+            # IDs that are not UUIDs cannot exist, and would make the whole query fail
+            unique_ids = []
+            for subscription_id in dict.fromkeys(subscription_ids):
+                try:
+                    unique_ids.append(uuid.UUID(subscription_id))
+                except ValueError:
+                    continue
+            if not unique_ids:
+                return []
+
+            # One array parameter instead of IN (...), so the statement is the same for every batch size
+            stmt = select(SubscriptionORM).where(
+                SubscriptionORM.subscription_id == any_(bindparam("subscription_ids", type_=ARRAY(UUID(as_uuid=True))))
+            )
+            result = await self.db.execute(stmt, {"subscription_ids": unique_ids})
+            db_subscriptions = {db_subscription.subscription_id: db_subscription for db_subscription in result.scalars()}
+
+            return [
+                SubscriptionSchemas.Subscription.model_construct(
+                    subscription_id=str(db_subscriptions[subscription_id].subscription_id),
+                    subscription_type=db_subscriptions[subscription_id].subscription_type,
+                    email=db_subscriptions[subscription_id].email,
+                    is_active=db_subscriptions[subscription_id].is_active
+                )
+                for subscription_id in unique_ids if subscription_id in db_subscriptions
+            ]
+
+        except Exception as e:
+            logger.exception(f"Error getting subscriptions: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+    
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str],
+            limit: int
+        ) -> SubscriptionSchemas.SubscriptionPage:
+        """
+        List the subscriptions of an email with keyset pagination.
+
+        The (email, subscription_id) index serves both the filter and the order,
+        so every page is an index range scan that starts at the previous page's
+        last subscription_id, however far into the list it is.
+        """
+        try:
+            stmt = select(SubscriptionORM).where(SubscriptionORM.email == email)
+            if after is not None:
+                try:
+                    stmt = stmt.where(SubscriptionORM.subscription_id > uuid.UUID(after))
+                except ValueError:
+                    raise ValidationException(f"Invalid cursor {after}")
+
+            # One row more than the page tells whether there is a next page
+            stmt = stmt.order_by(SubscriptionORM.subscription_id).limit(limit + 1)
+            result = await self.db.execute(stmt)
+            db_subscriptions = result.scalars().all()
+
+            subscriptions = [
+                SubscriptionSchemas.Subscription.model_construct(
+                    subscription_id=str(db_subscription.subscription_id),
+                    subscription_type=db_subscription.subscription_type,
+                    email=db_subscription.email,
+                    is_active=db_subscription.is_active
+                )
+                for db_subscription in db_subscriptions[:limit]
+            ]
+
+            return SubscriptionSchemas.SubscriptionPage.model_construct(
+                subscriptions=subscriptions,
+                next_after=subscriptions[-1].subscription_id if len(db_subscriptions) > limit else None
+            )
+
+        except ValidationException:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Error listing subscriptions: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+    
+    async def stream_subscriptions(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[SubscriptionSchemas.Subscription]:
+        """
+        Yield every subscription from a server-side cursor, batch_size rows per fetch.
+        Only the exported columns are selected, so no ORM objects are kept.
+        The cursor needs a transaction, so the caller must not be read-only.
+        """
+        try:
+            stmt = select(
+                SubscriptionORM.subscription_id,
+                SubscriptionORM.subscription_type,
+                SubscriptionORM.email,
+                SubscriptionORM.is_active
+            ).execution_options(yield_per=batch_size)
+            result = await self.db.stream(stmt)
+            async for db_subscription in result:
+                yield SubscriptionSchemas.Subscription(
+                    subscription_id=str(db_subscription.subscription_id),
+                    subscription_type=db_subscription.subscription_type,
+                    email=db_subscription.email,
+                    is_active=db_subscription.is_active
+                )
+
+        except Exception as e:
+            logger.exception(f"Error streaming subscriptions: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+    
     async def create_subscription(
             self,
             Subscription_instance: SubscriptionSchemas.Subscription,
             Outbox_instance: SubscriptionSchemas.Outbox
         ) -> None:
         try:
-            db_subscription = SubscriptionORM(
+            is_active = False if Subscription_instance.is_active == False else True #default to True
+
+            # INSERT ... ON CONFLICT DO NOTHING RETURNING and the outbox event in one statement
+            inserted = pg_insert(SubscriptionORM).values(
                 subscription_id=Subscription_instance.subscription_id,
                 subscription_type=Subscription_instance.subscription_type,
                 email=Subscription_instance.email,
-                is_active=False if Subscription_instance.is_active == False else True #default to True
-            )
+                is_active=is_active
+            ).on_conflict_do_nothing(index_elements=[SubscriptionORM.subscription_id]).returning(SubscriptionORM.subscription_id).cte("inserted")
 
-            outbox_event = SubscriptionsOutboxORM(
-                aggregatetype = Outbox_instance.aggregatetype,
-                aggregateid = Outbox_instance.aggregateid,
-                eventtype = f"{Outbox_instance.eventtype_prefix}_success",
-                payload = Outbox_instance.payload
-            )
+            async with self.db.begin():
+                result = await self.db.execute(
+                    outbox_event_from_cte(
+                        SubscriptionsOutboxORM,
+                        inserted,
+                        Outbox_instance,
+                        exception="ResourceAlreadyExistsException"
+                    )
+                )
+                eventtype = result.scalar_one()
 
-            # Start transaction
-            async with self.db.begin():  # This ensures atomicity
-                self.db.add(db_subscription)
-                self.db.add(outbox_event)
-            
-            return SubscriptionSchemas.Subscription(
-                subscription_id = str(db_subscription.subscription_id),
-                subscription_type = db_subscription.subscription_type,
-                email = db_subscription.email,
-                is_active = db_subscription.is_active
-            )
-        
         except IntegrityError as e:
-            if "UniqueViolationError" in str(e.orig):
-                logger.warning(f"Subscription with subscription_id {Subscription_instance.subscription_id} already exists")
-
-                fail_event = SubscriptionsOutboxORM(
-                    aggregatetype = Outbox_instance.aggregatetype,
-                    aggregateid = Outbox_instance.aggregateid,
-                    eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                    payload = Outbox_instance.payload.update({
-                        "exception": "ResourceAlreadyExistsException"
-                    })
-                )
+            # Some other kind of IntegrityError (e.g., null value, foreign key constraint, etc)
+            logger.exception(f"Error creating subscription: {str(e)}")
+            await self._add_failed_event(Outbox_instance, "BaseAppException")
+            raise BaseAppException(f"Database integrity error: {str(e)}") from e
 
-                async with self.db.begin():
-                    self.db.add(fail_event)
+        except Exception as e:
+            logger.exception(f"Error creating subscription: {str(e)}")
+            await self._add_failed_event(Outbox_instance, "BaseAppException")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
 
-                raise ResourceAlreadyExistsException(f"Subscription with subscription_id {Subscription_instance.subscription_id} already exists")
-            else:
-                # Some other kind of IntegrityError (e.g., null value, foreign key constraint, etc)
-                logger.exception(f"Error creating user: {str(e)}")
-
-                fail_event = SubscriptionsOutboxORM(
-                    aggregatetype = Outbox_instance.aggregatetype,
-                    aggregateid = Outbox_instance.aggregateid,
-                    eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                    payload = Outbox_instance.payload.update({
-                        "exception": "BaseAppException"
-                    })
+        if eventtype.endswith("_failed"):
+            logger.warning(f"Subscription with subscription_id {Subscription_instance.subscription_id} already exists")
+            raise ResourceAlreadyExistsException(f"Subscription with subscription_id {Subscription_instance.subscription_id} already exists")
+
+        return SubscriptionSchemas.Subscription(
+            subscription_id = Subscription_instance.subscription_id,
+            subscription_type = Subscription_instance.subscription_type,
+            email = Subscription_instance.email,
+            is_active = is_active
+        )
+    
+
+    async def create_subscriptions(
+            self,
+            Subscription_instances: List[SubscriptionSchemas.Subscription],
+            Outbox_instances: List[SubscriptionSchemas.Outbox]
+        ) -> Dict[str, SubscriptionSchemas.BulkItemStatus]:
+        """
+        Create many subscriptions and their outbox events in one transaction.
+
+        Rows are sent as executemany batches, which SQLAlchemy turns into
+        multi-row INSERT ... VALUES statements of up to 1000 rows each.
+        Existing subscription IDs are skipped (ON CONFLICT DO NOTHING) and get a
+        _failed event, like create_subscription.
+
+        Returns:
+            The status of each subscription by subscription_id
+        """
+        try:
+            async with self.db.begin():
+                result = await self.db.execute(
+                    pg_insert(SubscriptionORM)
+                        .on_conflict_do_nothing(index_elements=[SubscriptionORM.subscription_id])
+                        .returning(SubscriptionORM.subscription_id),
+                    [
+                        {
+                            "subscription_id": uuid.UUID(Subscription_instance.subscription_id),
+                            "subscription_type": Subscription_instance.subscription_type,
+                            "email": Subscription_instance.email,
+                            "is_active": False if Subscription_instance.is_active == False else True #default to True
+                        }
+                        for Subscription_instance in Subscription_instances
+                    ]
                 )
+                created = {str(subscription_id) for subscription_id in result.scalars()}
 
-                async with self.db.begin():
-                    self.db.add(fail_event)
+                statuses = {
+                    Subscription_instance.subscription_id: "created" if Subscription_instance.subscription_id in created else "already_exists"
+                    for Subscription_instance in Subscription_instances
+                }
 
-                raise BaseAppException(f"Database integrity error: {str(e)}") from e
-            
-        except ResourceAlreadyExistsException:
-            raise
+                await self.db.execute(
+                    insert(SubscriptionsOutboxORM),
+                    [
+                        {
+                            "aggregatetype": Outbox_instance.aggregatetype,
+                            "aggregateid": Outbox_instance.aggregateid,
+                            "eventtype": f"{Outbox_instance.eventtype_prefix}_success",
+                            "payload": Outbox_instance.payload
+                        }
+                        if statuses[Outbox_instance.aggregateid] == "created" else
+                        {
+                            "aggregatetype": Outbox_instance.aggregatetype,
+                            "aggregateid": Outbox_instance.aggregateid,
+                            "eventtype": f"{Outbox_instance.eventtype_prefix}_failed",
+                            "payload": {**Outbox_instance.payload, "exception": "ResourceAlreadyExistsException"}
+                        }
+                        for Outbox_instance in Outbox_instances
+                    ]
+                )
 
-        except Exception as e:
-            logger.exception(f"Error creating subscription: {str(e)}")
+            if len(created) < len(statuses):
+                logger.warning(f"{len(statuses) - len(created)} of {len(statuses)} subscriptions already existed")
+            return statuses
 
-            fail_event = SubscriptionsOutboxORM(
-                aggregatetype = Outbox_instance.aggregatetype,
-                aggregateid = Outbox_instance.aggregateid,
-                eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                payload = Outbox_instance.payload.update({
-                    "exception": "BaseAppException"
-                })
-            )
+        except Exception as e:
+            logger.exception(f"Error creating subscriptions: {str(e)}")
 
-            async with self.db.begin():
-                self.db.add(fail_event)
+            try:
+                async with self.db.begin():
+                    await self.db.execute(
+                        insert(SubscriptionsOutboxORM),
+                        [
+                            {
+                                "aggregatetype": Outbox_instance.aggregatetype,
+                                "aggregateid": Outbox_instance.aggregateid,
+                                "eventtype": f"{Outbox_instance.eventtype_prefix}_failed",
+                                "payload": {**Outbox_instance.payload, "exception": "BaseAppException"}
+                            }
+                            for Outbox_instance in Outbox_instances
+                        ]
+                    )
+            except Exception as outbox_error:
+                logger.exception(f"Error creating outbox events: {str(outbox_error)}")
 
             raise BaseAppException(f"Internal database error: {str(e)}") from e
-    
 
     async def delete_subscription(
             self,
@@ -133,6 +294,9 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
         ) -> None:
         """
         Delete a subscription by subscription ID.
+
+        The DELETE ... RETURNING and the outbox event are a single statement, so
+        there is no SELECT beforehand and the event always matches what happened.
         
         Args:
             subscription_id: The subscription_id of the subscription to delete
@@ -142,68 +306,40 @@ class SubscriptionRepository(interface_SubscriptionRepository.SubscriptionReposi
             BaseAppException: For any other errors
         """
         try:
-            # First check if the user exists
-            stmt = select(SubscriptionORM).where(SubscriptionORM.subscription_id == subscription_id)
-            result = await self.db.execute(stmt)
-            db_subscription = result.scalar_one_or_none()
-            
-            if not db_subscription:
-                logger.warning(f"Subscription with ID {subscription_id} not found for deletion")
-                
-                # Create a failed event
-                fail_event = SubscriptionsOutboxORM(
-                    aggregatetype = Outbox_instance.aggregatetype,
-                    aggregateid = Outbox_instance.aggregateid,
-                    eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                    payload = Outbox_instance.payload.update({
-                        "exception": "ResourceNotFoundException"
-                    })
-                )
-                
-                async with self.db.begin():
-                    self.db.add(fail_event)
-                    
-                raise ResourceNotFoundException(f"Subscription with ID {subscription_id} not found for deletion")
-            
-            # Create a success event
-            success_event = SubscriptionsOutboxORM(
-                aggregatetype = Outbox_instance.aggregatetype,
-                aggregateid = Outbox_instance.aggregateid,
-                eventtype = f"{Outbox_instance.eventtype_prefix}_success",
-                payload = Outbox_instance.payload
-            )
-            
-            # Start transaction for deletion and event
+            deleted = delete(SubscriptionORM).where(
+                SubscriptionORM.subscription_id == subscription_id
+            ).returning(SubscriptionORM.subscription_id).cte("deleted")
+
             async with self.db.begin():
-                # Delete the user
-                delete_stmt = delete(SubscriptionORM).where(SubscriptionORM.subscription_id == subscription_id)
-                await self.db.execute(delete_stmt)
-                
-                # Add the outbox event
-                self.db.add(success_event)
-                
-            logger.info(f"Subscription with ID {subscription_id} deleted successfully")
-                
-        except ResourceNotFoundException:
-            raise
+                result = await self.db.execute(
+                    outbox_event_from_cte(
+                        SubscriptionsOutboxORM,
+                        deleted,
+                        Outbox_instance,
+                        exception="ResourceNotFoundException"
+                    )
+                )
+                eventtype = result.scalar_one()
             
         except Exception as e:
-            logger.exception(f"Error deleting user: {str(e)}")
-            
-            # Create a failed event
-            fail_event = SubscriptionsOutboxORM(
-                aggregatetype = Outbox_instance.aggregatetype,
-                aggregateid = Outbox_instance.aggregateid,
-                eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                payload = Outbox_instance.payload.update({
-                    "exception": "BaseAppException"
-                })
-            )
-            
-            try:
-                async with self.db.begin():
-                    self.db.add(fail_event)
-            except Exception as outbox_error:
-                logger.exception(f"Error creating outbox event: {str(outbox_error)}")
-                
-            raise BaseAppException(f"Error deleting user: {str(e)}") from e
\ No newline at end of file
+            logger.exception(f"Error deleting subscription: {str(e)}")
+            await self._add_failed_event(Outbox_instance, "BaseAppException")
+            raise BaseAppException(f"Error deleting subscription: {str(e)}") from e
+
+        if eventtype.endswith("_failed"):
+            logger.warning(f"Subscription with ID {subscription_id} not found for deletion")
+            raise ResourceNotFoundException(f"Subscription with ID {subscription_id} not found for deletion")
+
+        logger.info(f"Subscription with ID {subscription_id} deleted successfully")
+
+    async def _add_failed_event(
+            self,
+            Outbox_instance: SubscriptionSchemas.Outbox,
+            exception: str
+        ) -> None:
+
+        try:
+            async with self.db.begin():
+                await self.db.execute(failed_outbox_event(SubscriptionsOutboxORM, Outbox_instance, exception))
+        except Exception as outbox_error:
+            logger.exception(f"Error creating outbox event: {str(outbox_error)}")
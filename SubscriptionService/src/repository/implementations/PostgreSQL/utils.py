@@ -0,0 +1,58 @@
+from sqlalchemy import insert, select, literal, case, exists, String, JSON
+from sqlalchemy import CTE, Insert
+from pydantic import BaseModel
+from typing import Any
+
+def outbox_event_from_cte(
+        outbox_model: Any,
+        cte: CTE,
+        Outbox_instance: BaseModel,
+        exception: str
+    ) -> Insert:
+    """
+    Builds one statement that runs a data-modifying CTE (INSERT/UPDATE/DELETE ... RETURNING)
+    and writes its outbox event:
+
+        WITH cte AS (... RETURNING ...)
+        INSERT INTO outbox (...) SELECT ..., CASE WHEN EXISTS (SELECT 1 FROM cte) ... END
+        RETURNING eventtype
+
+    The event is {eventtype_prefix}_success if the CTE returned a row, otherwise
+    {eventtype_prefix}_failed with the exception added to the payload. The write and
+    its event are a single round-trip and always commit together.
+
+    Returns:
+        The INSERT statement; its result is the eventtype that was written
+    """
+    prefix = Outbox_instance.eventtype_prefix
+    payload = Outbox_instance.payload
+    succeeded = exists(select(literal(1)).select_from(cte))
+
+    return insert(outbox_model).from_select(
+        ["aggregatetype", "aggregateid", "eventtype", "payload"],
+        select(
+            literal(Outbox_instance.aggregatetype, String),
+            literal(Outbox_instance.aggregateid, String),
+            case(
+                (succeeded, literal(f"{prefix}_success", String)),
+                else_=literal(f"{prefix}_failed", String)
+            ),
+            case(
+                (succeeded, literal(payload, JSON)),
+                else_=literal({**payload, "exception": exception}, JSON)
+            )
+        )
+    ).add_cte(cte).returning(outbox_model.eventtype)
+
+def failed_outbox_event(
+        outbox_model: Any,
+        Outbox_instance: BaseModel,
+        exception: str
+    ) -> Insert:
+    """Builds the INSERT for a {eventtype_prefix}_failed event, written after a statement failed."""
+    return insert(outbox_model).values(
+        aggregatetype=Outbox_instance.aggregatetype,
+        aggregateid=Outbox_instance.aggregateid,
+        eventtype=f"{Outbox_instance.eventtype_prefix}_failed",
+        payload={**Outbox_instance.payload, "exception": exception}
+    )
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, nullcontext, AsyncExitStack
+from typing import Any, AsyncContextManager, Callable, Coroutine, Optional, Set
+from src.db.settings import Settings, DatabaseType
+
+logger = logging.getLogger(__name__)
+
+def shadow_database_type(settings: Settings) -> DatabaseType:
+    '''
+    This function returns SHADOW_DATABASE_TYPE, or the other of postgres and dynamodb when it is not set.
+    '''
+    if settings.SHADOW_DATABASE_TYPE is not None:
+        return settings.SHADOW_DATABASE_TYPE
+    return DatabaseType.DYNAMODB if settings.DATABASE_TYPE == DatabaseType.POSTGRES else DatabaseType.POSTGRES
+
+class ShadowBackend:
+    """
+    Connections to the shadow backend and the mirrored reads running on it.
+
+    The backend has its own engine or client, sized to max_in_flight, so mirrored
+    reads never wait for (or hold) the primary's connections. Mirrored reads run
+    as background tasks; once max_in_flight are running, further ones are dropped
+    rather than queued, so a slow shadow backend cannot build up work.
+    """
+
+    def __init__(self, database_type: DatabaseType, max_in_flight: int):
+        self.database_type = database_type
+        self.max_in_flight = max_in_flight
+        self._open_context: Optional[Callable[[], AsyncContextManager[Any]]] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.started = False
+
+    async def start(self, settings: Settings, exit_stack: AsyncExitStack) -> None:
+        """Opens the shadow backend; it is closed with exit_stack."""
+        # Backend libraries are imported here so only the shadow's are loaded in addition
+        if self.database_type == DatabaseType.POSTGRES:
+            from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+
+            engine = create_async_engine(settings.POSTGRES_DATABASE_URL, pool_size=self.max_in_flight)
+            exit_stack.push_async_callback(engine.dispose)
+            # Mirrored reads are single lookups, run in autocommit like read-only requests
+            session_factory = async_sessionmaker(
+                bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+                expire_on_commit=False,
+                class_=AsyncSession
+            )
+
+            @asynccontextmanager
+            async def open_postgres_context():
+                async with session_factory() as session:
+                    yield session
+
+            self._open_context = open_postgres_context
+        elif self.database_type == DatabaseType.DYNAMODB:
+            import aioboto3
+            from botocore.config import Config
+
+            session = aioboto3.Session(
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION
+            )
+            client = await exit_stack.enter_async_context(
+                session.client(
+                    'dynamodb',
+                    endpoint_url=settings.AWS_ENDPOINT,
+                    config=Config(
+                        connect_timeout=5.0,
+                        read_timeout=10.0,
+                        retries={'max_attempts': 3},
+                        max_pool_connections=self.max_in_flight
+                    )
+                )
+            )
+            self._open_context = lambda: nullcontext(client)
+        elif self.database_type == DatabaseType.MEMORY:
+            from src.repository.implementations.Memory.store import get_memory_store
+
+            store = get_memory_store()
+            self._open_context = lambda: nullcontext(store)
+        else:
+            raise ValueError(f"Unsupported database type: {self.database_type}")
+
+        # Registered last, so mirrored reads finish before the connections are closed
+        exit_stack.push_async_callback(self.stop)
+        self.started = True
+        logger.info(f"Shadow reads enabled on {self.database_type.value}")
+
+    def open_context(self) -> AsyncContextManager[Any]:
+        """Returns the database context for one mirrored read."""
+        if self._open_context is None:
+            raise RuntimeError("Shadow backend is not started")
+        return self._open_context()
+
+    def submit(self, mirror: Coroutine[Any, Any, None]) -> bool:
+        """Runs a mirrored read in the background; returns False if it was dropped."""
+        if not self.started or len(self._tasks) >= self.max_in_flight:
+            mirror.close()
+            return False
+        task = asyncio.create_task(mirror)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stops accepting mirrored reads and waits up to timeout for the running ones."""
+        self.started = False
+        if self._tasks:
+            _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._open_context = None
@@ -0,0 +1,163 @@
+import logging
+import random
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Coroutine, Dict, List, Optional
+from src.db.factory import create_backend_repository
+from src.db.settings import get_settings
+from src.exceptions import ResourceNotFoundException
+from src.repository.interfaces import interface_SubscriptionRepository
+from src.schemas import SubscriptionSchemas
+from .backend import ShadowBackend, shadow_database_type
+from .stats import ShadowStats
+
+logger = logging.getLogger(__name__)
+
+@lru_cache()
+def get_shadow_backend() -> ShadowBackend:
+    """Process-wide shadow backend, started in the lifespan."""
+    settings = get_settings()
+    return ShadowBackend(
+        database_type=shadow_database_type(settings),
+        max_in_flight=settings.SHADOW_MAX_IN_FLIGHT
+    )
+
+@lru_cache()
+def get_shadow_stats() -> ShadowStats:
+    """Process-wide statistics of the mirrored reads."""
+    return ShadowStats(window=get_settings().SHADOW_LATENCY_WINDOW)
+
+class ShadowSubscriptionRepository(interface_SubscriptionRepository.SubscriptionRepository):
+    """
+    Serves everything from the primary repository and mirrors a sample of
+    get_subscription calls to the shadow backend.
+
+    The response is returned as soon as the primary has answered; the mirrored
+    read runs in the background and records both latencies and whether the two
+    backends returned the same subscription. Writes are never mirrored, so the
+    shadow backend has to be kept in sync separately (e.g. with src.tools.migrate);
+    mismatches then measure how far it has drifted.
+    """
+
+    def __init__(
+            self,
+            repository: interface_SubscriptionRepository.SubscriptionRepository,
+            backend: ShadowBackend,
+            stats: ShadowStats,
+            sample_rate: float
+        ):
+        self.repository = repository
+        self.backend = backend
+        self.stats = stats
+        self.sample_rate = sample_rate
+
+    def _submit(self, operation: str, mirror: Coroutine[Any, Any, None]) -> None:
+        if not self.backend.submit(mirror):
+            self.stats.record_dropped(operation)
+
+    async def _mirror_get_subscription(
+            self,
+            subscription_id: str,
+            primary_subscription: Optional[SubscriptionSchemas.Subscription],
+            primary_seconds: float
+        ) -> None:
+
+        started = time.perf_counter()
+        try:
+            async with self.backend.open_context() as db_context:
+                repository = create_backend_repository(self.backend.database_type, db_context)
+                try:
+                    shadow_subscription = await repository.get_subscription(subscription_id)
+                except ResourceNotFoundException:
+                    shadow_subscription = None
+        except Exception as e:
+            self.stats.record_error("get_subscription")
+            logger.warning(f"Shadow get_subscription failed: {e!r}")
+            return
+        shadow_seconds = time.perf_counter() - started
+
+        matched = (
+            (primary_subscription is None and shadow_subscription is None) or
+            (
+                primary_subscription is not None and shadow_subscription is not None and
+                primary_subscription.model_dump() == shadow_subscription.model_dump()
+            )
+        )
+        if not matched:
+            logger.warning(f"Shadow get_subscription mismatch on {self.backend.database_type.value}")
+        self.stats.record("get_subscription", primary_seconds, shadow_seconds, matched)
+
+    async def get_subscription(
+            self,
+            subscription_id: str
+        ) -> SubscriptionSchemas.Subscription:
+
+        if not self.backend.started or random.random() >= self.sample_rate:
+            return await self.repository.get_subscription(subscription_id)
+
+        started = time.perf_counter()
+        try:
+            subscription = await self.repository.get_subscription(subscription_id)
+        except ResourceNotFoundException:
+            # Not found is a result too, the shadow should agree
+            self._submit("get_subscription", self._mirror_get_subscription(subscription_id, None, time.perf_counter() - started))
+            raise
+        self._submit("get_subscription", self._mirror_get_subscription(subscription_id, subscription, time.perf_counter() - started))
+        return subscription
+
+    async def get_subscriptions(
+            self,
+            subscription_ids: List[str]
+        ) -> List[SubscriptionSchemas.Subscription]:
+
+        return await self.repository.get_subscriptions(subscription_ids)
+
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str],
+            limit: int
+        ) -> SubscriptionSchemas.SubscriptionPage:
+
+        return await self.repository.list_subscriptions(email=email, after=after, limit=limit)
+
+    async def stream_subscriptions(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[SubscriptionSchemas.Subscription]:
+
+        async for subscription in self.repository.stream_subscriptions(batch_size=batch_size):
+            yield subscription
+
+    async def create_subscription(
+            self,
+            Subscription_instance: SubscriptionSchemas.Subscription,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        return await self.repository.create_subscription(
+            Subscription_instance=Subscription_instance,
+            Outbox_instance=Outbox_instance
+        )
+
+    async def create_subscriptions(
+            self,
+            Subscription_instances: List[SubscriptionSchemas.Subscription],
+            Outbox_instances: List[SubscriptionSchemas.Outbox]
+        ) -> Dict[str, SubscriptionSchemas.BulkItemStatus]:
+
+        return await self.repository.create_subscriptions(
+            Subscription_instances=Subscription_instances,
+            Outbox_instances=Outbox_instances
+        )
+
+    async def delete_subscription(
+            self,
+            subscription_id: str,
+            Outbox_instance: SubscriptionSchemas.Outbox
+        ) -> None:
+
+        return await self.repository.delete_subscription(
+            subscription_id=subscription_id,
+            Outbox_instance=Outbox_instance
+        )
@@ -0,0 +1,62 @@
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+def percentile(sorted_samples: List[float], p: float) -> Optional[float]:
+    '''
+    This function returns the nearest-rank p-th percentile of already sorted samples.
+    '''
+    if not sorted_samples:
+        return None
+    return sorted_samples[max(0, math.ceil(p / 100 * len(sorted_samples)) - 1)]
+
+class ShadowStats:
+    """
+    Latency samples and comparison counts of mirrored reads, per operation.
+
+    Each mirrored read records the primary's latency and the shadow's latency
+    for the same call, so both distributions cover exactly the same requests.
+    Only the latest window samples are kept per operation and backend.
+    """
+
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self._latencies: Dict[str, Dict[str, Deque[float]]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _operation(self, operation: str) -> Dict[str, int]:
+        if operation not in self._counts:
+            self._latencies[operation] = {"primary": deque(maxlen=self.window), "shadow": deque(maxlen=self.window)}
+            self._counts[operation] = {"mirrored": 0, "mismatches": 0, "errors": 0, "dropped": 0}
+        return self._counts[operation]
+
+    def record(self, operation: str, primary_seconds: float, shadow_seconds: float, matched: bool) -> None:
+        counts = self._operation(operation)
+        counts["mirrored"] += 1
+        if not matched:
+            counts["mismatches"] += 1
+        self._latencies[operation]["primary"].append(primary_seconds)
+        self._latencies[operation]["shadow"].append(shadow_seconds)
+
+    def record_error(self, operation: str) -> None:
+        self._operation(operation)["errors"] += 1
+
+    def record_dropped(self, operation: str) -> None:
+        self._operation(operation)["dropped"] += 1
+
+    def stats(self) -> dict:
+        operations = {}
+        for operation, counts in self._counts.items():
+            operations[operation] = dict(counts)
+            for backend, samples in self._latencies[operation].items():
+                sorted_samples = sorted(samples)
+                operations[operation][f"{backend}_ms"] = {
+                    "samples": len(sorted_samples),
+                    **{
+                        name: None if value is None else round(value * 1000, 3)
+                        for name, value in (("p50", percentile(sorted_samples, 50)), ("p99", percentile(sorted_samples, 99)))
+                    }
+                }
+        return operations
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from ...schemas import SubscriptionSchemas
+from typing import AsyncIterator, Dict, List, Optional
 
 class SubscriptionRepository(ABC):
 
@@ -12,6 +13,38 @@ class SubscriptionRepository(ABC):
         pass
     
 
+    @abstractmethod
+    async def get_subscriptions(
+            self,
+            subscription_ids: List[str]
+        ) -> List[SubscriptionSchemas.Subscription]:
+        """Returns the subscriptions that exist, in the order of subscription_ids; missing IDs are skipped."""
+        pass
+    
+
+    @abstractmethod
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str],
+            limit: int
+        ) -> SubscriptionSchemas.SubscriptionPage:
+        """
+        Returns up to limit subscriptions of email ordered by subscription_id,
+        starting after the subscription_id after (keyset pagination).
+        """
+        pass
+    
+
+    @abstractmethod
+    def stream_subscriptions(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[SubscriptionSchemas.Subscription]:
+        """Yields every subscription, reading batch_size at a time, without loading them all."""
+        pass
+    
+
     @abstractmethod
     async def create_subscription(
             self,
@@ -19,4 +52,14 @@ class SubscriptionRepository(ABC):
             Outbox_instance: SubscriptionSchemas.Outbox
         ) -> None:
         
-        pass
\ No newline at end of file
+        pass
+    
+
+    @abstractmethod
+    async def create_subscriptions(
+            self,
+            Subscription_instances: List[SubscriptionSchemas.Subscription],
+            Outbox_instances: List[SubscriptionSchemas.Outbox]
+        ) -> Dict[str, SubscriptionSchemas.BulkItemStatus]:
+        """Creates many subscriptions; returns the status of each one by subscription_id."""
+        pass
@@ -0,0 +1,51 @@
+from fastapi import APIRouter
+from src.db.settings import get_settings, DatabaseType
+
+router = APIRouter(
+    prefix="/metrics"
+)
+
+@router.get("/shadow", status_code=200)
+async def shadow():
+    # Latency percentiles and mismatches of the reads mirrored to the shadow backend
+    settings = get_settings()
+    if not settings.SHADOW_ENABLED:
+        return {"enabled": False}
+
+    from src.repository.implementations.Shadow.shadow_SubscriptionRepository import get_shadow_backend, get_shadow_stats
+    return {
+        "enabled": True,
+        "primary": settings.DATABASE_TYPE.value,
+        "shadow": get_shadow_backend().database_type.value,
+        "sample_rate": settings.SHADOW_SAMPLE_RATE,
+        "operations": get_shadow_stats().stats()
+    }
+
+@router.get("/dynamodb", status_code=200)
+async def dynamodb():
+    # Consumed capacity, retries and throttling per table and repository operation
+    settings = get_settings()
+    backends = {settings.DATABASE_TYPE}
+    if settings.SHADOW_ENABLED:
+        from src.repository.implementations.Shadow.backend import shadow_database_type
+        backends.add(shadow_database_type(settings))
+    if DatabaseType.DYNAMODB not in backends:
+        # Without DynamoDB there is nothing to report, and its SDK is not imported
+        return {"enabled": False}
+
+    from src.repository.implementations.AWS_DynamoDB.metrics import get_capacity_metrics
+    from src.repository.implementations.AWS_DynamoDB.hedging import get_hedging_policy
+    return {
+        "enabled": True,
+        "tables": get_capacity_metrics().stats(),
+        "hedging": get_hedging_policy().stats() if settings.DYNAMODB_HEDGED_READS else None
+    }
+
+@router.get("/coalescing", status_code=200)
+async def coalescing():
+    # Backend calls made and reads that joined a call already in flight
+    from src.repository.implementations.Coalescing.coalescing_SubscriptionRepository import get_subscription_flights
+    return {
+        "enabled": get_settings().COALESCE_READS,
+        "get_subscription": get_subscription_flights().stats()
+    }
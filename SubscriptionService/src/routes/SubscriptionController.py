@@ -1,17 +1,42 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
 from src.schemas import SubscriptionSchemas
-from src.dependencies import get_subscription_service
+from src.exceptions import ValidationException
+from src.dependencies import get_subscription_service, read_only_transaction
 from src.service.SubscriptionService import SubscriptionService
+from src.routes.utils import FastJSONResponse, ndjson_response
 
 router = APIRouter(
     prefix="/subscriptions"
 )
 
-@router.get("", status_code=200)
+# Hot reads return FastJSONResponse: serialized once, without jsonable_encoder
+@router.get("", status_code=200, response_class=FastJSONResponse, dependencies=[Depends(read_only_transaction)])
 async def get_subscription(
-    subscription_id: str,
+    subscription_id: Optional[str] = None,
+    email: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
     subscription_service: SubscriptionService = Depends(get_subscription_service)):
-    return await subscription_service.get_subscription(subscription_id=subscription_id)
+    # ?subscription_id=... returns one subscription, ?email=... a page of that user's subscriptions
+    if subscription_id is not None:
+        return FastJSONResponse(await subscription_service.get_subscription(subscription_id=subscription_id))
+    if email is not None:
+        return FastJSONResponse(await subscription_service.list_subscriptions(email=email, after=after, limit=limit))
+    raise ValidationException("Either subscription_id or email is required")
+
+@router.get("/batch", status_code=200, response_class=FastJSONResponse, dependencies=[Depends(read_only_transaction)])
+async def get_subscriptions(
+    subscription_id: List[str] = Query(..., min_length=1, max_length=100),
+    subscription_service: SubscriptionService = Depends(get_subscription_service)):
+    return FastJSONResponse(await subscription_service.get_subscriptions(subscription_ids=subscription_id))
+
+# Not read-only: the PostgreSQL server-side cursor needs a transaction
+@router.get("/export", status_code=200)
+async def export_subscriptions(
+    gzip: bool = False,
+    subscription_service: SubscriptionService = Depends(get_subscription_service)):
+    return ndjson_response(subscription_service.export_subscriptions(), gzip=gzip)
 
 @router.post("/create-subscription", status_code=201)
 async def create_subscription(
@@ -20,4 +45,13 @@ async def create_subscription(
     return await subscription_service.create_subscription(
         CreateSubscription_instance=subscription_create,
         eventtype_prefix="subscription_created"
-    )
\ No newline at end of file
+    )
+
+@router.post("/bulk", status_code=201)
+async def create_subscriptions(
+    subscriptions_create: SubscriptionSchemas.BulkCreateSubscriptions,
+    subscription_service: SubscriptionService = Depends(get_subscription_service)):
+    return await subscription_service.create_subscriptions(
+        CreateSubscription_instances=subscriptions_create.subscriptions,
+        eventtype_prefix="subscription_created"
+    )
@@ -0,0 +1,65 @@
+import zlib
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+from typing import Any, AsyncIterator
+
+# Lines are sent in chunks of about this many bytes rather than one write per item
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serialized by pydantic-core in one pass: models (also built
+    with model_construct), lists and dicts of them go straight to JSON bytes.
+
+    Returned from an endpoint, it also skips FastAPI's jsonable_encoder, which
+    would first convert every model to dicts in Python. The content is trusted
+    as is, so only return data that is already the response's shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+async def ndjson_chunks(
+        items: AsyncIterator[BaseModel],
+        chunk_size: int = NDJSON_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+    '''
+    This function serializes items as newline-delimited JSON, one object per line.
+    At most one chunk is held in memory, however many items there are.
+    '''
+    buffer = bytearray()
+    async for item in items:
+        buffer += item.model_dump_json().encode()
+        buffer += b"\n"
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    '''
+    This function compresses a byte stream into a single gzip member as it is produced.
+    '''
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def ndjson_response(
+        items: AsyncIterator[BaseModel],
+        gzip: bool = False
+    ) -> StreamingResponse:
+    '''
+    This function streams items as an application/x-ndjson response, optionally
+    gzip-compressed (Content-Encoding: gzip).
+    '''
+    body = ndjson_chunks(items)
+    headers = {}
+    if gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
 
 
 class Subscription(BaseModel):
@@ -14,10 +14,29 @@ class SubscriptionResponse(BaseModel):
     email: Optional[str] = None
     is_active: Optional[bool] = None
 
+class SubscriptionPage(BaseModel):
+    subscriptions: List[Subscription]
+    next_after: Optional[str] = None  # Pass as after to get the next page; None on the last page
+
+class SubscriptionPageResponse(BaseModel):
+    subscriptions: List[SubscriptionResponse]
+    next_after: Optional[str] = None
+
 class CreateSubscription(BaseModel):
     subscription_type: str
     email: str
 
+class BulkCreateSubscriptions(BaseModel):
+    subscriptions: List[CreateSubscription] = Field(..., min_length=1, max_length=50000)
+
+# Per-item outcome of a bulk write
+BulkItemStatus = Literal["created", "already_exists", "failed"]
+
+class BulkCreateSubscriptionResult(BaseModel):
+    subscription_id: str
+    email: str
+    status: BulkItemStatus
+
 class Outbox(BaseModel):
     aggregatetype: str
     aggregateid: str
@@ -3,7 +3,7 @@ from src.schemas import SubscriptionSchemas
 from src.exceptions import BaseAppException, ResourceNotFoundException, ValidationException, ResourceAlreadyExistsException
 import logging
 from src.service.utils import *
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, AsyncIterator
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +15,8 @@ class SubscriptionService:
     async def get_subscription(self, subscription_id: str) -> SubscriptionSchemas.SubscriptionResponse:
         try:
             subscription = await self.subscription_repository.get_subscription(subscription_id)
-            return SubscriptionSchemas.SubscriptionResponse(
+            # The repository returns checked data: constructed, not validated again
+            return SubscriptionSchemas.SubscriptionResponse.model_construct(
                 subscription_id=subscription.subscription_id,
                 subscription_type=subscription.subscription_type,
                 email=subscription.email,
@@ -27,6 +28,66 @@ class SubscriptionService:
             logger.exception(f"Error getting subscription: {str(e)}")
             raise BaseAppException(f"Error getting subscription: {str(e)}") from e
     
+    async def get_subscriptions(self, subscription_ids: List[str]) -> List[SubscriptionSchemas.SubscriptionResponse]:
+        try:
+            subscriptions = await self.subscription_repository.get_subscriptions(subscription_ids)
+            return [
+                SubscriptionSchemas.SubscriptionResponse.model_construct(
+                    subscription_id=subscription.subscription_id,
+                    subscription_type=subscription.subscription_type,
+                    email=subscription.email,
+                    is_active=subscription.is_active
+                )
+                for subscription in subscriptions
+            ]
+        except Exception as e:
+            logger.exception(f"Error getting subscriptions: {str(e)}")
+            raise BaseAppException(f"Error getting subscriptions: {str(e)}") from e
+    
+    async def list_subscriptions(
+            self,
+            email: str,
+            after: Optional[str] = None,
+            limit: int = 50
+        ) -> SubscriptionSchemas.SubscriptionPageResponse:
+        try:
+            page = await self.subscription_repository.list_subscriptions(
+                email=email,
+                after=after,
+                limit=limit
+            )
+            return SubscriptionSchemas.SubscriptionPageResponse.model_construct(
+                subscriptions=[
+                    SubscriptionSchemas.SubscriptionResponse.model_construct(
+                        subscription_id=subscription.subscription_id,
+                        subscription_type=subscription.subscription_type,
+                        email=subscription.email,
+                        is_active=subscription.is_active
+                    )
+                    for subscription in page.subscriptions
+                ],
+                next_after=page.next_after
+            )
+        except ValidationException:
+            raise
+        except Exception as e:
+            logger.exception(f"Error listing subscriptions: {str(e)}")
+            raise BaseAppException(f"Error listing subscriptions: {str(e)}") from e
+    
+    async def export_subscriptions(self) -> AsyncIterator[SubscriptionSchemas.SubscriptionResponse]:
+        # Runs while the response streams, so errors can only be logged and end the stream
+        try:
+            async for subscription in self.subscription_repository.stream_subscriptions():
+                yield SubscriptionSchemas.SubscriptionResponse(
+                    subscription_id=subscription.subscription_id,
+                    subscription_type=subscription.subscription_type,
+                    email=subscription.email,
+                    is_active=subscription.is_active
+                )
+        except Exception as e:
+            logger.exception(f"Error exporting subscriptions: {str(e)}")
+            raise BaseAppException(f"Error exporting subscriptions: {str(e)}") from e
+    
     async def create_subscription(
             self,
             CreateSubscription_instance: SubscriptionSchemas.CreateSubscription,
@@ -70,6 +131,62 @@ class SubscriptionService:
             raise BaseAppException(f"Error creating subscription: {str(e)}") from e
     
 
+    async def create_subscriptions(
+            self,
+            CreateSubscription_instances: List[SubscriptionSchemas.CreateSubscription],
+            eventtype_prefix: str,
+            payload_add: Dict[str, Any] = None
+        ) -> List[SubscriptionSchemas.BulkCreateSubscriptionResult]:
+        """
+        Create many subscriptions in one repository call.
+
+        Returns:
+            One result per input, in input order, with the new subscription_id and
+            whether it was created
+        """
+        subscription_ids = [generate_unique_id() for _ in CreateSubscription_instances]
+        try:
+            statuses = await self.subscription_repository.create_subscriptions(
+
+                Subscription_instances = [
+                    SubscriptionSchemas.Subscription(
+                        subscription_id=subscription_id,
+                        subscription_type=CreateSubscription_instance.subscription_type,
+                        email=CreateSubscription_instance.email,
+                        is_active=True # Default to True on creation
+                    )
+                    for subscription_id, CreateSubscription_instance in zip(subscription_ids, CreateSubscription_instances)
+                ],
+
+                Outbox_instances = [
+                    SubscriptionSchemas.Outbox(
+                        aggregatetype = "subscription",
+                        aggregateid = subscription_id,
+                        eventtype_prefix = eventtype_prefix,
+                        payload = {
+                            "subscription_id": subscription_id,
+                            "email": CreateSubscription_instance.email,
+                            **(payload_add or {})
+                        }
+                    )
+                    for subscription_id, CreateSubscription_instance in zip(subscription_ids, CreateSubscription_instances)
+                ]
+            )
+
+            return [
+                SubscriptionSchemas.BulkCreateSubscriptionResult(
+                    subscription_id=subscription_id,
+                    email=CreateSubscription_instance.email,
+                    status=statuses.get(subscription_id, "failed")
+                )
+                for subscription_id, CreateSubscription_instance in zip(subscription_ids, CreateSubscription_instances)
+            ]
+
+        except Exception as e:
+            logger.exception(f"Error creating subscriptions: {str(e)}")
+            raise BaseAppException(f"Error creating subscriptions: {str(e)}") from e
+    
+
     async def delete_subscription(
             self,
             subscription_id: str,
@@ -95,8 +212,9 @@ class SubscriptionService:
                     aggregateid = subscription_id,
                     eventtype_prefix = "subscription_deleted",
                     payload = {
-                        "subscription_id": subscription_id
-                    }.update(payload_add)
+                        "subscription_id": subscription_id,
+                        **(payload_add or {})
+                    }
                 )
             )
 
@@ -1,15 +1,16 @@
+import asyncio
 import pytest
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from types_aiobotocore_dynamodb import DynamoDBClient
 from sqlalchemy import text
-import boto3
 import aioboto3
 
 from src.repository.implementations.PostgreSQL.models.ORM_Subscription import Base
 from src.db.db_context import db_context
 from src.main import app
 from src.db.settings import get_settings, DatabaseType
+from src.repository.implementations.AWS_DynamoDB.utils import parallel_scan
 
 
 # Load settings
@@ -64,44 +65,46 @@ if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
     override_db_context = postgresql_context
 
 elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
-    # Simple synchronous client for test cleanup
-    @pytest.fixture(scope="session")
-    def dynamodb_client():
-        client = boto3.client(
-            'dynamodb',
+    async def cleanup_dynamodb_table(table_name):
+        """Clean up all items in a DynamoDB table with a parallel scan and batched deletes."""
+        session = aioboto3.Session(
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID_FOR_TESTING,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY_FOR_TESTING,
-            region_name=settings.AWS_REGION_FOR_TESTING,
-            endpoint_url=settings.AWS_ENDPOINT_FOR_TESTING
+            region_name=settings.AWS_REGION_FOR_TESTING
         )
-        return client
-
-    def cleanup_dynamodb_table(client, table_name):
-        """Clean up all items in a DynamoDB table one by one."""
-        try:
-            # Scan to get all items
-            response = client.scan(TableName=table_name)
-            items = response.get('Items', [])
-            
-            if not items:
-                return
-            
-            # Delete each item individually
-            for item in items:
-                client.delete_item(
-                    TableName=table_name,
-                    Key={'email': item['email']}
-                )
-        except Exception as e:
-            print(f"Error during cleanup: {str(e)}")
+        async with session.client(
+            'dynamodb',
+            endpoint_url=settings.AWS_ENDPOINT_FOR_TESTING
+        ) as client:
+            try:
+                # Only the key attributes are needed to delete an item
+                table = await client.describe_table(TableName=table_name)
+                key_names = [key['AttributeName'] for key in table['Table']['KeySchema']]
+
+                async for page in parallel_scan(
+                    client,
+                    table_name,
+                    ProjectionExpression=", ".join(f"#k{i}" for i in range(len(key_names))),
+                    ExpressionAttributeNames={f"#k{i}": name for i, name in enumerate(key_names)}
+                ):
+                    # BatchWriteItem accepts at most 25 requests
+                    for i in range(0, len(page), 25):
+                        request_items = {table_name: [{'DeleteRequest': {'Key': item}} for item in page[i:i + 25]]}
+                        while request_items:
+                            response = await client.batch_write_item(RequestItems=request_items)
+                            request_items = response.get('UnprocessedItems') or {}
+                            if request_items:
+                                await asyncio.sleep(0.1)
+            except Exception as e:
+                print(f"Error during cleanup: {str(e)}")
 
     @pytest.fixture(scope="session")
-    def setup_database(dynamodb_client):
+    async def setup_database():
         # Table name
         table_name = "subscriptions"
         yield
         # Clean up after tests
-        cleanup_dynamodb_table(dynamodb_client, table_name)
+        await cleanup_dynamodb_table(table_name)
 
     @pytest.fixture
     def db_session():
@@ -0,0 +1,116 @@
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def cache():
+    """Create a small TTLCache for testing."""
+    from src.repository.implementations.Caching.cache import TTLCache
+    return TTLCache(max_entries=2, ttl_seconds=60)
+
+@pytest.fixture
+def sample_subscription():
+    """Create a sample Subscription schema for testing."""
+    from src.schemas import SubscriptionSchemas
+    return SubscriptionSchemas.Subscription(
+        subscription_id="1_unique_id",
+        subscription_type="free_tier",
+        email="test@example.com",
+        is_active=True
+    )
+
+@pytest.fixture
+def sample_outbox():
+    """Create a sample Outbox schema for testing."""
+    from src.schemas import SubscriptionSchemas
+    return SubscriptionSchemas.Outbox(
+        aggregatetype = "subscription",
+        aggregateid = "1_unique_id",
+        eventtype_prefix = "subscription_deleted",
+        payload = {
+            "subscription_id": "1_unique_id"
+        }
+    )
+
+@pytest.fixture
+def inner_repo(sample_subscription):
+    """Create a mock SubscriptionRepository that the cache wraps."""
+    repo = AsyncMock()
+    repo.get_subscription.return_value = sample_subscription
+    return repo
+
+@pytest.fixture
+def caching_repo(inner_repo, cache):
+    """Create a CachingSubscriptionRepository around the mock repository."""
+    from src.repository.implementations.Caching.caching_SubscriptionRepository import CachingSubscriptionRepository
+    return CachingSubscriptionRepository(inner_repo, cache=cache)
+
+# Tests for TTLCache
+def test_cache_evicts_least_recently_used(cache):
+    """Test that a full cache evicts the entry that was used least recently."""
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+def test_cache_skips_stale_fill(cache):
+    """Test that a value read before an invalidation is not stored."""
+    token = cache.token()
+    cache.invalidate("key")
+    cache.set("key", "stale", token)
+
+    assert cache.get("key") is None
+
+# Tests for CachingSubscriptionRepository
+@pytest.mark.asyncio
+async def test_get_subscription_served_from_cache(caching_repo, inner_repo, sample_subscription):
+    """Test that repeated reads hit the wrapped repository only once."""
+    first = await caching_repo.get_subscription("1_unique_id")
+    second = await caching_repo.get_subscription("1_unique_id")
+
+    assert first == sample_subscription
+    assert second == sample_subscription
+    inner_repo.get_subscription.assert_awaited_once_with("1_unique_id")
+
+@pytest.mark.asyncio
+async def test_delete_subscription_invalidates_on_failure(caching_repo, inner_repo, sample_outbox):
+    """Test that the cached entry is dropped even when the delete raises."""
+    from src.exceptions import ResourceNotFoundException
+    inner_repo.delete_subscription.side_effect = ResourceNotFoundException("Subscription not found")
+
+    await caching_repo.get_subscription("1_unique_id")
+    with pytest.raises(ResourceNotFoundException):
+        await caching_repo.delete_subscription(subscription_id="1_unique_id", Outbox_instance=sample_outbox)
+    await caching_repo.get_subscription("1_unique_id")
+
+    assert inner_repo.get_subscription.await_count == 2
+
+@pytest.mark.asyncio
+async def test_invalidation_event_drops_cached_subscription(monkeypatch, cache):
+    """Test that a subscription outbox event routed through the Kafka manager invalidates the cache."""
+    from src.consumer import kafka
+    import src.repository.implementations.Caching.caching_SubscriptionRepository as caching_module
+    monkeypatch.setattr(caching_module, "get_subscription_cache", lambda: cache)
+
+    cache.set("1_unique_id", "cached")
+    manager = kafka.KafkaEventManager()
+    manager.register_handler("subscription_*_success", kafka.SubscriptionCacheInvalidationHandler())
+    await manager._process_event("subscription_deleted_success", {"subscription_id": "1_unique_id"})
+
+    assert cache.get("1_unique_id") is None
+
+@pytest.mark.asyncio
+async def test_get_subscriptions_fetches_only_misses(caching_repo, inner_repo, sample_subscription):
+    """Test that a batch read serves cached subscriptions and fetches the rest in one call."""
+    other_subscription = sample_subscription.model_copy(update={"subscription_id": "2_unique_id"})
+    inner_repo.get_subscriptions.return_value = [other_subscription]
+
+    await caching_repo.get_subscription("1_unique_id")
+    subscriptions = await caching_repo.get_subscriptions(["2_unique_id", "1_unique_id", "3_unique_id"])
+
+    assert subscriptions == [other_subscription, sample_subscription]
+    inner_repo.get_subscriptions.assert_awaited_once_with(["2_unique_id", "3_unique_id"])
@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def sample_subscription():
+    """Create a sample Subscription schema for testing."""
+    from src.schemas import SubscriptionSchemas
+    return SubscriptionSchemas.Subscription(
+        subscription_id="1_unique_id",
+        subscription_type="free_tier",
+        email="test@example.com",
+        is_active=True
+    )
+
+@pytest.fixture
+def sample_outbox():
+    """Create a sample Outbox schema for testing."""
+    from src.schemas import SubscriptionSchemas
+    return SubscriptionSchemas.Outbox(
+        aggregatetype = "subscription",
+        aggregateid = "1_unique_id",
+        eventtype_prefix = "subscription_deleted",
+        payload = {
+            "subscription_id": "1_unique_id"
+        }
+    )
+
+@pytest.fixture
+def release():
+    """An event the slow mock repository waits for before answering."""
+    return asyncio.Event()
+
+@pytest.fixture
+def inner_repo(sample_subscription, release):
+    """Create a mock SubscriptionRepository whose get_subscription only returns once released."""
+    async def get_subscription(subscription_id):
+        await release.wait()
+        return sample_subscription
+
+    repo = AsyncMock()
+    repo.get_subscription.side_effect = get_subscription
+    return repo
+
+@pytest.fixture
+def coalescing_repo(inner_repo):
+    """Create a CoalescingSubscriptionRepository around the mock repository."""
+    from src.repository.implementations.Coalescing.coalescing_SubscriptionRepository import CoalescingSubscriptionRepository
+    from src.repository.implementations.Coalescing.single_flight import SingleFlight
+    return CoalescingSubscriptionRepository(inner_repo, flights=SingleFlight())
+
+async def started(*coroutines):
+    """Start the coroutines as tasks and let them run until they wait."""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    await asyncio.sleep(0)
+    return tasks
+
+# Tests for CoalescingSubscriptionRepository
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_call(coalescing_repo, inner_repo, release, sample_subscription):
+    """Test that concurrent reads of the same subscription make one backend call and share its result."""
+    tasks = await started(
+        *(coalescing_repo.get_subscription("1_unique_id") for _ in range(10)),
+        coalescing_repo.get_subscription("2_unique_id")
+    )
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [sample_subscription] * 11
+    assert inner_repo.get_subscription.call_count == 2
+    assert coalescing_repo.flights.stats() == {"in_flight": 0, "calls": 2, "coalesced": 9}
+
+@pytest.mark.asyncio
+async def test_errors_are_shared(coalescing_repo, inner_repo):
+    """Test that every waiting caller gets the leader's exception, e.g. not found."""
+    from src.exceptions import ResourceNotFoundException
+
+    async def get_subscription(subscription_id):
+        await asyncio.sleep(0)
+        raise ResourceNotFoundException(f"Subscription with id {subscription_id} not found")
+    inner_repo.get_subscription.side_effect = get_subscription
+
+    results = await asyncio.gather(
+        *(coalescing_repo.get_subscription("1_unique_id") for _ in range(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, ResourceNotFoundException) for result in results)
+    inner_repo.get_subscription.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over(coalescing_repo, inner_repo, release, sample_subscription):
+    """Test that callers waiting on a cancelled leader retry the read themselves."""
+    leader, follower = await started(
+        coalescing_repo.get_subscription("1_unique_id"),
+        coalescing_repo.get_subscription("1_unique_id")
+    )
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == sample_subscription
+    assert leader.cancelled()
+    assert inner_repo.get_subscription.call_count == 2
+
+@pytest.mark.asyncio
+async def test_write_starts_a_new_call(coalescing_repo, inner_repo, release, sample_outbox):
+    """Test that reads after a delete do not join a call that started before it."""
+    before = await started(coalescing_repo.get_subscription("1_unique_id"))
+    await coalescing_repo.delete_subscription("1_unique_id", sample_outbox)
+    after = await started(coalescing_repo.get_subscription("1_unique_id"))
+    release.set()
+    await asyncio.gather(*before, *after)
+
+    assert inner_repo.get_subscription.call_count == 2
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def metrics():
+    """Create empty CapacityMetrics for testing."""
+    from src.repository.implementations.AWS_DynamoDB.metrics import CapacityMetrics
+    return CapacityMetrics()
+
+# Tests for MeteredClient
+@pytest.mark.asyncio
+async def test_metered_client_records_consumed_capacity(metrics):
+    """Test that calls request ReturnConsumedCapacity and their capacity is recorded under the operation."""
+    from src.repository.implementations.AWS_DynamoDB.metrics import MeteredClient
+    client = AsyncMock()
+    client.get_item.return_value = {
+        "Item": {"subscription_id": {"S": "1_unique_id"}},
+        "ConsumedCapacity": {"TableName": "subscriptions", "CapacityUnits": 0.5},
+        "ResponseMetadata": {"RetryAttempts": 1}
+    }
+    client.put_item.return_value = {
+        "ConsumedCapacity": {"TableName": "subscriptions", "CapacityUnits": 1.0, "WriteCapacityUnits": 1.0}
+    }
+
+    metered = MeteredClient(client, metrics, "get_subscription")
+    await metered.get_item(TableName="subscriptions", Key={"subscription_id": {"S": "1_unique_id"}})
+    await MeteredClient(client, metrics, "create_subscription").put_item(TableName="subscriptions", Item={})
+
+    assert client.get_item.call_args.kwargs["ReturnConsumedCapacity"] == "TOTAL"
+    stats = metrics.stats()["subscriptions"]
+    assert stats["get_subscription"]["calls"] == 1
+    assert stats["get_subscription"]["read_capacity_units"] == 0.5
+    assert stats["get_subscription"]["retries"] == 1
+    assert stats["create_subscription"]["write_capacity_units"] == 1.0
+
+@pytest.mark.asyncio
+async def test_metered_client_records_batch_capacity_per_table(metrics):
+    """Test that the capacity of batch calls is split by table, and unprocessed keys are counted."""
+    from src.repository.implementations.AWS_DynamoDB.metrics import MeteredClient
+    client = AsyncMock()
+    client.batch_get_item.return_value = {
+        "Responses": {"subscriptions": []},
+        "UnprocessedKeys": {"subscriptions": {"Keys": [{"subscription_id": {"S": "a"}}, {"subscription_id": {"S": "b"}}]}},
+        "ConsumedCapacity": [{"TableName": "subscriptions", "CapacityUnits": 3.0}]
+    }
+
+    await MeteredClient(client, metrics, "get_subscriptions").batch_get_item(RequestItems={"subscriptions": {"Keys": []}})
+
+    stats = metrics.stats()["subscriptions"]["get_subscriptions"]
+    assert stats["read_capacity_units"] == 3.0
+    assert stats["unprocessed"] == 2
+
+@pytest.mark.asyncio
+async def test_metered_client_classifies_errors(metrics):
+    """Test that throttling, failed conditions and other errors are counted apart, and the error is raised."""
+    from botocore.exceptions import ClientError
+    from src.repository.implementations.AWS_DynamoDB.metrics import MeteredClient
+    client = AsyncMock()
+    client.scan.side_effect = ClientError(
+        {"Error": {"Code": "ProvisionedThroughputExceededException"}, "ResponseMetadata": {"RetryAttempts": 3}}, "Scan"
+    )
+    client.put_item.side_effect = ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem")
+    client.transact_write_items.side_effect = ClientError(
+        {"Error": {"Code": "TransactionCanceledException"}, "CancellationReasons": [{"Code": "None"}, {"Code": "ThrottlingError"}]},
+        "TransactWriteItems"
+    )
+
+    metered = MeteredClient(client, metrics, "create_subscriptions")
+    with pytest.raises(ClientError):
+        await metered.scan(TableName="subscriptions")
+    with pytest.raises(ClientError):
+        await metered.put_item(TableName="subscriptions", Item={})
+    with pytest.raises(ClientError):
+        await metered.transact_write_items(TransactItems=[{"Update": {"TableName": "subscriptions"}}])
+
+    stats = metrics.stats()["subscriptions"]["create_subscriptions"]
+    assert stats["calls"] == 3
+    assert stats["throttles"] == 2
+    assert stats["condition_failures"] == 1
+    assert stats["errors"] == 0
+    assert stats["retries"] == 3
+
+# Tests for the metered SubscriptionRepository
+@pytest.mark.asyncio
+async def test_repository_records_calls_per_operation(metrics):
+    """Test that the DynamoDB SubscriptionRepository records its calls under the repository operation."""
+    from src.repository.implementations.AWS_DynamoDB.awsdynamodb_SubscriptionRepository import SubscriptionRepository
+    client = AsyncMock()
+    client.get_item.return_value = {
+        "Item": {"subscription_id": {"S": "1_unique_id"}, "email": {"S": "test@example.com"}, "is_active": {"BOOL": True}},
+        "ConsumedCapacity": {"TableName": "subscriptions", "CapacityUnits": 0.5}
+    }
+
+    subscription = await SubscriptionRepository(client, metrics=metrics).get_subscription("1_unique_id")
+
+    assert subscription.subscription_id == "1_unique_id"
+    assert metrics.stats() == {"subscriptions": {"get_subscription": {
+        "calls": 1, "read_capacity_units": 0.5, "write_capacity_units": 0,
+        "retries": 0, "throttles": 0, "condition_failures": 0, "errors": 0, "unprocessed": 0
+    }}}
@@ -0,0 +1,350 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+
+def make_keys(count):
+    """Create DynamoDB keys for count distinct subscription IDs."""
+    return [{"subscription_id": {"S": f"{i}_unique_id"}} for i in range(count)]
+
+# Tests for batch_get_items
+@pytest.mark.asyncio
+async def test_batch_get_items_chunks_keys():
+    """Test that keys are sent in chunks of at most 100."""
+    from src.repository.implementations.AWS_DynamoDB.utils import batch_get_items
+
+    async def batch_get_item(RequestItems):
+        return {"Responses": {"subscriptions": RequestItems["subscriptions"]["Keys"]}, "UnprocessedKeys": {}}
+
+    client = AsyncMock()
+    client.batch_get_item.side_effect = batch_get_item
+
+    items = await batch_get_items(client, "subscriptions", make_keys(250))
+
+    assert len(items) == 250
+    assert [len(call.kwargs["RequestItems"]["subscriptions"]["Keys"]) for call in client.batch_get_item.call_args_list] == [100, 100, 50]
+
+@pytest.mark.asyncio
+async def test_batch_get_items_retries_unprocessed_keys():
+    """Test that UnprocessedKeys are requested again after a backoff."""
+    from src.repository.implementations.AWS_DynamoDB.utils import batch_get_items
+    keys = make_keys(2)
+
+    client = AsyncMock()
+    client.batch_get_item.side_effect = [
+        {"Responses": {"subscriptions": [keys[0]]}, "UnprocessedKeys": {"subscriptions": {"Keys": [keys[1]]}}},
+        {"Responses": {"subscriptions": [keys[1]]}, "UnprocessedKeys": {}},
+    ]
+
+    with patch("src.repository.implementations.AWS_DynamoDB.utils.asyncio.sleep", new=AsyncMock()) as sleep:
+        items = await batch_get_items(client, "subscriptions", keys)
+
+    assert items == keys
+    sleep.assert_awaited_once()
+    assert client.batch_get_item.call_args_list[1].kwargs["RequestItems"] == {"subscriptions": {"Keys": [keys[1]]}}
+
+@pytest.mark.asyncio
+async def test_batch_get_items_gives_up():
+    """Test that keys still unprocessed after max_attempts raise."""
+    from src.repository.implementations.AWS_DynamoDB.utils import batch_get_items
+    keys = make_keys(1)
+
+    client = AsyncMock()
+    client.batch_get_item.return_value = {"Responses": {}, "UnprocessedKeys": {"subscriptions": {"Keys": keys}}}
+
+    with patch("src.repository.implementations.AWS_DynamoDB.utils.asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(RuntimeError):
+            await batch_get_items(client, "subscriptions", keys, max_attempts=3)
+
+    assert client.batch_get_item.await_count == 3
+
+# Tests for transact_write_items
+@pytest.mark.asyncio
+async def test_transact_write_items_chunks_operations():
+    """Test that operations are sent in transactions of at most 100."""
+    from src.repository.implementations.AWS_DynamoDB.utils import transact_write_items
+
+    client = AsyncMock()
+    results = await transact_write_items(client, [{"Put": {"Item": key}} for key in make_keys(150)])
+
+    assert results == [None] * 150
+    assert [len(call.kwargs["TransactItems"]) for call in client.transact_write_items.call_args_list] == [100, 50]
+
+@pytest.mark.asyncio
+async def test_transact_write_items_drops_failed_conditions():
+    """Test that a cancelled transaction is sent again without the operations that caused it."""
+    from botocore.exceptions import ClientError
+    from src.repository.implementations.AWS_DynamoDB.utils import transact_write_items
+    operations = [{"Put": {"Item": key}} for key in make_keys(3)]
+
+    client = AsyncMock()
+    client.transact_write_items.side_effect = [
+        ClientError(
+            {
+                "Error": {"Code": "TransactionCanceledException", "Message": "Transaction cancelled"},
+                "CancellationReasons": [{"Code": "None"}, {"Code": "ConditionalCheckFailed"}, {"Code": "None"}]
+            },
+            "TransactWriteItems"
+        ),
+        {},
+    ]
+
+    with patch("src.repository.implementations.AWS_DynamoDB.utils.asyncio.sleep", new=AsyncMock()):
+        results = await transact_write_items(client, operations)
+
+    assert results == [None, "ConditionalCheckFailed", None]
+    assert client.transact_write_items.call_args_list[1].kwargs["TransactItems"] == [operations[0], operations[2]]
+
+@pytest.mark.asyncio
+async def test_create_subscriptions_writes_outbox_events():
+    """Test that every subscription is created in the same transaction as its outbox event, and a conflict drops both."""
+    import json
+    from botocore.exceptions import ClientError
+    from src.repository.implementations.AWS_DynamoDB.awsdynamodb_SubscriptionRepository import SubscriptionRepository
+    from src.schemas import SubscriptionSchemas
+
+    subscriptions = [
+        SubscriptionSchemas.Subscription(subscription_id=str(i), subscription_type="free_tier", email=f"user{i}@example.com")
+        for i in range(2)
+    ]
+    outboxes = [
+        SubscriptionSchemas.Outbox(
+            aggregatetype="subscription",
+            aggregateid=subscription.subscription_id,
+            eventtype_prefix="subscription_created",
+            payload={"subscription_id": subscription.subscription_id, "email": subscription.email}
+        )
+        for subscription in subscriptions
+    ]
+    client = AsyncMock()
+    client.transact_write_items.side_effect = [
+        ClientError(
+            {
+                "Error": {"Code": "TransactionCanceledException", "Message": "Transaction cancelled"},
+                "CancellationReasons": [{"Code": "ConditionalCheckFailed"}, {"Code": "None"}, {"Code": "None"}, {"Code": "None"}]
+            },
+            "TransactWriteItems"
+        ),
+        {},
+    ]
+
+    with patch("src.repository.implementations.AWS_DynamoDB.utils.asyncio.sleep", new=AsyncMock()):
+        statuses = await SubscriptionRepository(client).create_subscriptions(subscriptions, outboxes)
+
+    assert statuses == {"0": "already_exists", "1": "created"}
+    first, retried = [call.kwargs["TransactItems"] for call in client.transact_write_items.call_args_list]
+    assert [item["Put"]["TableName"] for item in first] == ["subscriptions", "subscriptions_outbox"] * 2
+    assert retried == first[2:]
+    event = retried[1]["Put"]["Item"]
+    assert event["eventtype"] == {"S": "subscription_created_success"}
+    assert json.loads(event["payload"]["S"]) == {"subscription_id": "1", "email": "user1@example.com"}
+
+# Tests for list_subscriptions
+@pytest.mark.asyncio
+async def test_list_subscriptions_queries_email_index():
+    """Test that listing queries the email GSI starting after the cursor, one item more than the page."""
+    from src.repository.implementations.AWS_DynamoDB.awsdynamodb_SubscriptionRepository import SubscriptionRepository
+
+    client = AsyncMock()
+    client.query.return_value = {
+        "Items": [
+            {"subscription_id": {"S": "2"}, "email": {"S": "test@example.com"}, "subscription_type": {"S": "free_tier"}},
+            {"subscription_id": {"S": "3"}, "email": {"S": "test@example.com"}, "subscription_type": {"S": "free_tier"}}
+        ],
+        "LastEvaluatedKey": {"subscription_id": {"S": "3"}, "email": {"S": "test@example.com"}}
+    }
+
+    page = await SubscriptionRepository(client).list_subscriptions("test@example.com", after="1", limit=1)
+
+    query = client.query.call_args.kwargs
+    assert query["IndexName"] == "email-index"
+    assert query["Limit"] == 2
+    assert query["ExclusiveStartKey"] == {"email": {"S": "test@example.com"}, "subscription_id": {"S": "1"}}
+    assert [subscription.subscription_id for subscription in page.subscriptions] == ["2"]
+    assert page.next_after == "2"
+
+@pytest.mark.asyncio
+async def test_list_subscriptions_last_full_page():
+    """Test that an exactly full last page has no next page, like on Postgres."""
+    from src.repository.implementations.AWS_DynamoDB.awsdynamodb_SubscriptionRepository import SubscriptionRepository
+
+    client = AsyncMock()
+    client.query.return_value = {
+        "Items": [{"subscription_id": {"S": "2"}, "email": {"S": "test@example.com"}, "subscription_type": {"S": "free_tier"}}]
+    }
+
+    page = await SubscriptionRepository(client).list_subscriptions("test@example.com", after="1", limit=1)
+
+    assert [subscription.subscription_id for subscription in page.subscriptions] == ["2"]
+    assert page.next_after is None
+
+# Tests for compiled serializers
+def make_sample_models():
+    """Create models covering scalar, optional, literal, set, list, dict and nested fields."""
+    from pydantic import BaseModel
+    from typing import Dict, List, Literal, Optional, Set
+
+    class Nested(BaseModel):
+        name: str
+        count: int
+
+    class Sample(BaseModel):
+        text: str
+        flag: Optional[bool] = None
+        count: int = 0
+        ratio: float = 0.0
+        tier: Literal["free_tier", "paid_tier"] = "free_tier"
+        tags: Set[str] = set()
+        items: List[int] = []
+        extra: Dict[str, str] = {}
+        nested: Optional[Nested] = None
+
+    return Sample, Nested
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings("ignore::UserWarning")  # model_dump() warns about the model_construct sample
+async def test_compiled_serializer_matches_generic():
+    """Test that to_dynamodb_item produces the same item as basemodel_to_dynamodb."""
+    from src.repository.implementations.AWS_DynamoDB.utils import to_dynamodb_item, basemodel_to_dynamodb
+    Sample, Nested = make_sample_models()
+
+    samples = [
+        Sample(text="a"),
+        Sample(text="b", flag=False, count=3, ratio=1.5, tier="paid_tier", tags={"x"}, items=[1, 2], extra={"k": "v"}, nested=Nested(name="n", count=1)),
+        Sample.model_construct(text=1, flag=None, count=True, ratio=2, tier="free_tier", tags=set(), items=[], extra={}, nested=None),
+    ]
+    for sample in samples:
+        for add_empty_string in (False, True):
+            assert to_dynamodb_item(sample, add_empty_string) == await basemodel_to_dynamodb(sample, add_empty_string)
+
+@pytest.mark.asyncio
+async def test_compiled_deserializer_matches_generic():
+    """Test that from_dynamodb_item returns the same model as dynamodb_to_basemodel."""
+    from src.repository.implementations.AWS_DynamoDB.utils import from_dynamodb_item, dynamodb_to_basemodel, to_dynamodb_item
+    Sample, Nested = make_sample_models()
+
+    items = [
+        to_dynamodb_item(Sample(text="b", flag=True, count=3, ratio=1.5, tags={"x"}, items=[1], extra={"k": "v"}, nested=Nested(name="n", count=1)), True),
+        {"text": {"S": "c"}, "count": {"N": "7"}, "ratio": {"N": "2"}, "unknown": {"S": "ignored"}},
+    ]
+    for item in items:
+        for include_empty_string in (False, True):
+            assert from_dynamodb_item(Sample, item, include_empty_string) == await dynamodb_to_basemodel(Sample, item, include_empty_string)
+
+    with pytest.raises(ValueError):
+        from_dynamodb_item(Sample, {"text": {"BOOL": True}})
+
+def test_compiled_serializer_is_cached():
+    """Test that the conversion plan is built once per model class."""
+    from src.repository.implementations.AWS_DynamoDB.utils import compile_serializer, compile_deserializer
+    Sample, _ = make_sample_models()
+
+    assert compile_serializer(Sample) is compile_serializer(Sample)
+    assert compile_deserializer(Sample) is compile_deserializer(Sample)
+
+# Tests for parallel_scan
+def make_segmented_scan(pages_per_segment, key_name):
+    """Create a fake scan that returns pages_per_segment pages of two items per segment."""
+    async def scan(**request):
+        segment = request.get("Segment", 0)
+        page = request.get("ExclusiveStartKey", {}).get("page", 0)
+        response = {"Items": [{key_name: {"S": f"{segment}-{page}-{i}"}} for i in range(2)]}
+        if page + 1 < pages_per_segment:
+            response["LastEvaluatedKey"] = {"page": page + 1}
+        return response
+    return scan
+
+@pytest.mark.asyncio
+async def test_parallel_scan_reads_every_segment():
+    """Test that every segment is scanned to its end with Segment/TotalSegments."""
+    from src.repository.implementations.AWS_DynamoDB.utils import parallel_scan
+
+    client = AsyncMock()
+    client.scan.side_effect = make_segmented_scan(3, "KEY_NAME")
+
+    pages = [page async for page in parallel_scan(client, "TABLE_NAME", total_segments=4, page_size=2)]
+
+    assert len(pages) == 12
+    assert len({item["KEY_NAME"]["S"] for page in pages for item in page}) == 24
+    assert {call.kwargs["Segment"] for call in client.scan.call_args_list} == {0, 1, 2, 3}
+    assert all(call.kwargs["TotalSegments"] == 4 and call.kwargs["Limit"] == 2 for call in client.scan.call_args_list)
+
+@pytest.mark.asyncio
+async def test_parallel_scan_backs_off_on_throttling():
+    """Test that a throttled page is requested again after a backoff."""
+    from botocore.exceptions import ClientError
+    from src.repository.implementations.AWS_DynamoDB.utils import parallel_scan
+
+    throttled = ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "Scan")
+    client = AsyncMock()
+    client.scan.side_effect = [throttled, {"Items": [{"KEY_NAME": {"S": "a"}}]}]
+
+    with patch("src.repository.implementations.AWS_DynamoDB.utils.asyncio.sleep", new=AsyncMock()) as sleep:
+        pages = [page async for page in parallel_scan(client, "TABLE_NAME", total_segments=1)]
+
+    assert pages == [[{"KEY_NAME": {"S": "a"}}]]
+    sleep.assert_awaited_once()
+    assert "Segment" not in client.scan.call_args.kwargs
+
+@pytest.mark.asyncio
+async def test_parallel_scan_raises_other_errors():
+    """Test that an error that is not throttling ends the scan."""
+    from botocore.exceptions import ClientError
+    from src.repository.implementations.AWS_DynamoDB.utils import parallel_scan
+
+    client = AsyncMock()
+    client.scan.side_effect = ClientError({"Error": {"Code": "ResourceNotFoundException"}}, "Scan")
+
+    with pytest.raises(ClientError):
+        [page async for page in parallel_scan(client, "TABLE_NAME", total_segments=2)]
+
+@pytest.mark.asyncio
+async def test_parallel_scan_bounds_pages_in_flight():
+    """Test that segments stop reading when the consumer is behind, and stop when it closes the scan."""
+    import asyncio
+    from src.repository.implementations.AWS_DynamoDB.utils import parallel_scan
+
+    client = AsyncMock()
+    client.scan.side_effect = make_segmented_scan(100, "KEY_NAME")
+
+    scan = parallel_scan(client, "TABLE_NAME", total_segments=2, max_pages_in_flight=2)
+    await anext(scan)
+    await asyncio.sleep(0.01)
+    # Two buffered pages, one page held by each blocked segment, and the page consumed
+    assert client.scan.await_count <= 5
+
+    await scan.aclose()
+    assert client.scan.await_count <= 5
+
+@pytest.mark.asyncio
+async def test_parallel_scan_pages_resumes_segments():
+    """Test that only the segments in start_keys are scanned, each from its ExclusiveStartKey."""
+    from src.repository.implementations.AWS_DynamoDB.utils import parallel_scan_pages
+
+    client = AsyncMock()
+    client.scan.side_effect = make_segmented_scan(3, "KEY_NAME")
+
+    pages = [page async for page in parallel_scan_pages(client, "TABLE_NAME", total_segments=4, start_keys={1: {"page": 2}, 3: None})]
+
+    # The page each segment continues from, 0 once the segment is finished
+    assert sorted((page.segment, (page.last_evaluated_key or {"page": 0})["page"]) for page in pages) == [
+        (1, 0), (3, 0), (3, 1), (3, 2)
+    ]
+    assert {call.kwargs["Segment"] for call in client.scan.call_args_list} == {1, 3}
+
+# Tests for batch_write_items
+@pytest.mark.asyncio
+async def test_batch_write_items_retries_unprocessed_items():
+    """Test that items are put in chunks of 25 and UnprocessedItems are sent again."""
+    from src.repository.implementations.AWS_DynamoDB.utils import batch_write_items
+    items = [{"KEY_NAME": {"S": str(i)}} for i in range(30)]
+    unprocessed = {"TABLE_NAME": [{"PutRequest": {"Item": items[0]}}]}
+
+    client = AsyncMock()
+    client.batch_write_item.side_effect = [{"UnprocessedItems": unprocessed}, {}, {}]
+
+    with patch("src.repository.implementations.AWS_DynamoDB.utils.asyncio.sleep", new=AsyncMock()):
+        await batch_write_items(client, "TABLE_NAME", items, max_concurrency=1)
+
+    requests = [call.kwargs["RequestItems"]["TABLE_NAME"] for call in client.batch_write_item.call_args_list]
+    assert [len(request) for request in requests] == [25, 1, 5]
+    assert requests[1] == unprocessed["TABLE_NAME"]
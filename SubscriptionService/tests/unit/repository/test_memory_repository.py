@@ -0,0 +1,136 @@
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def store():
+    """Create an empty MemoryStore for testing."""
+    from src.repository.implementations.Memory.store import MemoryStore
+    return MemoryStore()
+
+@pytest.fixture
+def subscription_repo(store):
+    """Create an in-memory SubscriptionRepository."""
+    from src.repository.implementations.Memory.memory_SubscriptionRepository import SubscriptionRepository
+    return SubscriptionRepository(store)
+
+@pytest.fixture
+def sample_subscription():
+    """Create a sample Subscription schema for testing."""
+    from src.schemas import SubscriptionSchemas
+    return SubscriptionSchemas.Subscription(
+        subscription_id="1_unique_id",
+        subscription_type="free_tier",
+        email="test@example.com"
+    )
+
+@pytest.fixture
+def sample_outbox():
+    """Create a sample Outbox schema for testing."""
+    from src.schemas import SubscriptionSchemas
+    return SubscriptionSchemas.Outbox(
+        aggregatetype = "subscription",
+        aggregateid = "1_unique_id",
+        eventtype_prefix = "subscription_created",
+        payload = {
+            "subscription_id": "1_unique_id",
+            "email": "test@example.com",
+        }
+    )
+
+@pytest.mark.asyncio
+async def test_create_and_get_subscription(subscription_repo, store, sample_subscription, sample_outbox):
+    """Test that a created subscription can be read back and records a success event."""
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    result = await subscription_repo.get_subscription("1_unique_id")
+
+    assert result.email == "test@example.com"
+    assert result.is_active is True
+    assert store.outbox[-1]["eventtype"] == "subscription_created_success"
+
+@pytest.mark.asyncio
+async def test_create_subscription_already_exists(subscription_repo, store, sample_subscription, sample_outbox):
+    """Test that a duplicate subscription raises and records a failed event."""
+    from src.exceptions import ResourceAlreadyExistsException
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    with pytest.raises(ResourceAlreadyExistsException):
+        await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    assert store.outbox[-1]["eventtype"] == "subscription_created_failed"
+    assert store.outbox[-1]["payload"]["exception"] == "ResourceAlreadyExistsException"
+
+@pytest.mark.asyncio
+async def test_delete_subscription(subscription_repo, store, sample_subscription, sample_outbox):
+    """Test that a deleted subscription is gone and a second delete raises."""
+    from src.exceptions import ResourceNotFoundException
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    await subscription_repo.delete_subscription("1_unique_id", sample_outbox)
+
+    with pytest.raises(ResourceNotFoundException):
+        await subscription_repo.get_subscription("1_unique_id")
+    with pytest.raises(ResourceNotFoundException):
+        await subscription_repo.delete_subscription("1_unique_id", sample_outbox)
+
+@pytest.mark.asyncio
+async def test_outbox_delivered_to_subscribers(subscription_repo, store, sample_subscription, sample_outbox):
+    """Test that outbox events are handed to in-process subscribers."""
+    subscriber = AsyncMock()
+    store.subscribe(subscriber)
+
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    subscriber.assert_awaited_once_with(
+        "subscription_created_success",
+        {"subscription_id": "1_unique_id", "email": "test@example.com"}
+    )
+
+@pytest.mark.asyncio
+async def test_get_subscriptions(subscription_repo, sample_subscription, sample_outbox):
+    """Test that a batch read returns existing subscriptions once each, in request order."""
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    subscriptions = await subscription_repo.get_subscriptions(["missing_id", "1_unique_id", "1_unique_id"])
+
+    assert [subscription.subscription_id for subscription in subscriptions] == ["1_unique_id"]
+
+@pytest.mark.asyncio
+async def test_list_subscriptions_pages(subscription_repo, sample_outbox):
+    """Test that listing by email pages through the user's subscriptions in subscription_id order."""
+    from src.schemas import SubscriptionSchemas
+    for subscription_id, email in [("3", "test@example.com"), ("1", "test@example.com"), ("2", "other@example.com"), ("4", "test@example.com")]:
+        await subscription_repo.create_subscription(
+            SubscriptionSchemas.Subscription(subscription_id=subscription_id, subscription_type="free_tier", email=email),
+            sample_outbox
+        )
+
+    first = await subscription_repo.list_subscriptions("test@example.com", after=None, limit=2)
+    second = await subscription_repo.list_subscriptions("test@example.com", after=first.next_after, limit=2)
+
+    assert [subscription.subscription_id for subscription in first.subscriptions] == ["1", "3"]
+    assert first.next_after == "3"
+    assert [subscription.subscription_id for subscription in second.subscriptions] == ["4"]
+    assert second.next_after is None
+
+@pytest.mark.asyncio
+async def test_stream_subscriptions(subscription_repo, sample_subscription, sample_outbox):
+    """Test that streaming yields every stored subscription."""
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    subscriptions = [subscription async for subscription in subscription_repo.stream_subscriptions()]
+
+    assert [subscription.subscription_id for subscription in subscriptions] == ["1_unique_id"]
+
+@pytest.mark.asyncio
+async def test_create_subscriptions(subscription_repo, store, sample_subscription, sample_outbox):
+    """Test that bulk creation reports existing subscriptions and records an event per item."""
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+    new_subscription = sample_subscription.model_copy(update={"subscription_id": "2_unique_id"})
+    new_outbox = sample_outbox.model_copy(update={"aggregateid": "2_unique_id"})
+
+    statuses = await subscription_repo.create_subscriptions([sample_subscription, new_subscription], [sample_outbox, new_outbox])
+
+    assert statuses == {"1_unique_id": "already_exists", "2_unique_id": "created"}
+    assert [event["eventtype"] for event in list(store.outbox)[-2:]] == ["subscription_created_failed", "subscription_created_success"]
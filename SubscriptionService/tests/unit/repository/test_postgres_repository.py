@@ -111,18 +111,105 @@ async def test_get_subscription_database_error(subscription_repo, mock_db):
     assert "Internal database error" in str(exc_info.value)
     mock_db.execute.assert_called_once()
 
+# Tests for get_subscriptions method
+@pytest.mark.asyncio
+async def test_get_subscriptions_success(subscription_repo, mock_db):
+    """Test batch retrieval returns found subscriptions in request order with a single query."""
+    import uuid
+    first_id, second_id = uuid.uuid4(), uuid.uuid4()
+
+    def db_row(subscription_id, email):
+        row = MagicMock()
+        row.subscription_id = subscription_id
+        row.subscription_type = "free_tier"
+        row.email = email
+        row.is_active = True
+        return row
+
+    mock_result = MagicMock()
+    mock_result.scalars.return_value = [db_row(second_id, "second@example.com"), db_row(first_id, "first@example.com")]
+    mock_db.execute.return_value = mock_result
+
+    subscriptions = await subscription_repo.get_subscriptions([str(first_id), str(uuid.uuid4()), str(second_id)])
+
+    assert [subscription.subscription_id for subscription in subscriptions] == [str(first_id), str(second_id)]
+    mock_db.execute.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_get_subscriptions_invalid_ids_skip_query(subscription_repo, mock_db):
+    """Test that IDs which are not UUIDs are skipped instead of failing the query."""
+    subscriptions = await subscription_repo.get_subscriptions(["not-a-uuid"])
+
+    assert subscriptions == []
+    mock_db.execute.assert_not_called()
+
+# Tests for list_subscriptions method
+@pytest.mark.asyncio
+async def test_list_subscriptions_keyset_page(subscription_repo, mock_db, db_subscription):
+    """Test that a page seeks past the cursor and fetches one extra row to detect the next page."""
+    from sqlalchemy.dialects import postgresql
+
+    after = "0190c5b4-7d2e-7c6a-8f00-000000000001"
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [db_subscription, db_subscription]
+    mock_db.execute.return_value = mock_result
+
+    page = await subscription_repo.list_subscriptions("test@example.com", after=after, limit=1)
+
+    assert len(page.subscriptions) == 1
+    assert page.next_after == "1_unique_id"
+    compiled = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    assert "auth.subscriptions.subscription_id >" in str(compiled)
+    assert "ORDER BY auth.subscriptions.subscription_id" in str(compiled)
+    assert compiled.params["param_1"] == 2
+
+@pytest.mark.asyncio
+async def test_list_subscriptions_invalid_cursor(subscription_repo, mock_db):
+    """Test that a cursor that is not a subscription_id is rejected without a query."""
+    from src.exceptions import ValidationException
+
+    with pytest.raises(ValidationException):
+        await subscription_repo.list_subscriptions("test@example.com", after="not-a-uuid", limit=10)
+
+    mock_db.execute.assert_not_called()
+
 # Tests for create_subscription method
 @pytest.mark.asyncio
 async def test_create_subscription_success(subscription_repo, mock_db, sample_subscription, sample_outbox):
     """Test successful subscription creation."""
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "subscription_created_success"
+    mock_db.execute.return_value = mock_result
+
     # Call the method
-    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+    result = await subscription_repo.create_subscription(sample_subscription, sample_outbox)
     
     # Verify that begin() was called for the transaction
     mock_db.begin.assert_called_once()
     
-    # Verify that add() was called twice (subscription + outbox event)
-    assert mock_db.add.call_count == 2
+    # Verify that the subscription and its outbox event are one statement
+    mock_db.execute.assert_called_once()
+    mock_db.add.assert_not_called()
+    assert result.subscription_id == "1_unique_id"
+
+@pytest.mark.asyncio
+async def test_create_subscription_statement(subscription_repo, mock_db, sample_subscription, sample_outbox):
+    """Test that creation is a single INSERT ... ON CONFLICT DO NOTHING CTE with the outbox insert."""
+    from sqlalchemy.dialects import postgresql
+
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "subscription_created_success"
+    mock_db.execute.return_value = mock_result
+
+    await subscription_repo.create_subscription(sample_subscription, sample_outbox)
+
+    compiled = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("WITH inserted AS")
+    assert "ON CONFLICT (subscription_id) DO NOTHING RETURNING" in sql
+    assert "INSERT INTO auth.subscriptions_outbox" in sql
+    assert "RETURNING auth.subscriptions_outbox.eventtype" in sql
+    assert {"exception": "ResourceAlreadyExistsException", **sample_outbox.payload} in compiled.params.values()
 
 @pytest.mark.asyncio
 async def test_create_subscription_already_exists(subscription_repo, mock_db, sample_subscription, sample_outbox):
@@ -130,23 +217,10 @@ async def test_create_subscription_already_exists(subscription_repo, mock_db, sa
     # Import inside test function
     from src.exceptions import ResourceAlreadyExistsException
     
-    # Setup mock to raise IntegrityError with UniqueViolationError
-    unique_violation = Exception("UniqueViolationError")
-    integrity_error = IntegrityError("statement", "params", unique_violation)
-    integrity_error.orig = unique_violation
-    
-    # Make the first transaction fail
-    first_context = AsyncMock()
-    first_context.__aenter__.return_value = None
-    first_context.__aexit__.side_effect = integrity_error
-    
-    # Make the second transaction (for failure event) succeed
-    second_context = AsyncMock()
-    second_context.__aenter__.return_value = None
-    second_context.__aexit__.return_value = None
-    
-    # Configure mock_db.begin() to return different context managers on consecutive calls
-    mock_db.begin.side_effect = [first_context, second_context]
+    # The conflict is skipped and the statement writes the _failed event
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "subscription_created_failed"
+    mock_db.execute.return_value = mock_result
     
     # Test that the correct exception is raised
     with pytest.raises(ResourceAlreadyExistsException) as exc_info:
@@ -154,11 +228,9 @@ async def test_create_subscription_already_exists(subscription_repo, mock_db, sa
     
     assert "already exists" in str(exc_info.value)
     
-    # Verify begin() was called twice (initial attempt + failure event)
-    assert mock_db.begin.call_count == 2
-    
-    # Verify add() was called twice (initial subscription + outbox) and once more for failure event
-    assert mock_db.add.call_count == 3
+    # Verify the failed event was written by the same statement
+    mock_db.begin.assert_called_once()
+    mock_db.execute.assert_called_once()
 
 @pytest.mark.asyncio
 async def test_create_subscription_other_integrity_error(subscription_repo, mock_db, sample_subscription, sample_outbox):
@@ -171,18 +243,8 @@ async def test_create_subscription_other_integrity_error(subscription_repo, mock
     integrity_error = IntegrityError("statement", "params", other_error)
     integrity_error.orig = other_error
     
-    # Make the first transaction fail
-    first_context = AsyncMock()
-    first_context.__aenter__.return_value = None
-    first_context.__aexit__.side_effect = integrity_error
-    
-    # Make the second transaction (for failure event) succeed
-    second_context = AsyncMock()
-    second_context.__aenter__.return_value = None
-    second_context.__aexit__.return_value = None
-    
-    # Configure mock_db.begin() to return different context managers on consecutive calls
-    mock_db.begin.side_effect = [first_context, second_context]
+    # Make the statement fail, then let the failure event succeed
+    mock_db.execute.side_effect = [integrity_error, MagicMock()]
     
     # Test that the correct exception is raised
     with pytest.raises(BaseAppException) as exc_info:
@@ -193,8 +255,10 @@ async def test_create_subscription_other_integrity_error(subscription_repo, mock
     # Verify begin() was called twice (initial attempt + failure event)
     assert mock_db.begin.call_count == 2
     
-    # Verify add() was called twice (initial subscription + outbox) and once more for failure event
-    assert mock_db.add.call_count == 3
+    # Verify the failure event carries the exception
+    fail_event = mock_db.execute.call_args_list[1][0][0]
+    assert fail_event.compile().params["eventtype"] == "subscription_created_failed"
+    assert fail_event.compile().params["payload"]["exception"] == "BaseAppException"
 
 @pytest.mark.asyncio
 async def test_create_subscription_general_exception(subscription_repo, mock_db, sample_subscription, sample_outbox):
@@ -202,21 +266,8 @@ async def test_create_subscription_general_exception(subscription_repo, mock_db,
     # Import inside test function
     from src.exceptions import BaseAppException
     
-    # Setup mock to raise a general exception
-    general_error = Exception("Unexpected error")
-    
-    # Make the first transaction fail
-    first_context = AsyncMock()
-    first_context.__aenter__.return_value = None
-    first_context.__aexit__.side_effect = general_error
-    
-    # Make the second transaction (for failure event) succeed
-    second_context = AsyncMock()
-    second_context.__aenter__.return_value = None
-    second_context.__aexit__.return_value = None
-    
-    # Configure mock_db.begin() to return different context managers on consecutive calls
-    mock_db.begin.side_effect = [first_context, second_context]
+    # Make the statement fail, then let the failure event succeed
+    mock_db.execute.side_effect = [Exception("Unexpected error"), MagicMock()]
     
     # Test that the correct exception is raised
     with pytest.raises(BaseAppException) as exc_info:
@@ -226,6 +277,97 @@ async def test_create_subscription_general_exception(subscription_repo, mock_db,
     
     # Verify begin() was called twice (initial attempt + failure event)
     assert mock_db.begin.call_count == 2
-    
-    # Verify add() was called twice (initial subscription + outbox) and once more for failure event
-    assert mock_db.add.call_count == 3
\ No newline at end of file
+    assert mock_db.execute.call_count == 2
+
+# Tests for create_subscriptions method
+@pytest.mark.asyncio
+async def test_create_subscriptions_success(subscription_repo, mock_db):
+    """Test bulk creation inserts rows and outbox events in one transaction and reports conflicts."""
+    import uuid
+    from src.schemas import SubscriptionSchemas
+    new_id, existing_id = str(uuid.uuid4()), str(uuid.uuid4())
+    subscriptions = [
+        SubscriptionSchemas.Subscription(subscription_id=subscription_id, subscription_type="free_tier", email="test@example.com")
+        for subscription_id in (new_id, existing_id)
+    ]
+    outboxes = [
+        SubscriptionSchemas.Outbox(
+            aggregatetype="subscription",
+            aggregateid=subscription_id,
+            eventtype_prefix="subscription_created",
+            payload={"subscription_id": subscription_id}
+        )
+        for subscription_id in (new_id, existing_id)
+    ]
+
+    # Only the new subscription is returned by INSERT ... ON CONFLICT DO NOTHING RETURNING
+    insert_result = MagicMock()
+    insert_result.scalars.return_value = [uuid.UUID(new_id)]
+    mock_db.execute.side_effect = [insert_result, MagicMock()]
+
+    statuses = await subscription_repo.create_subscriptions(subscriptions, outboxes)
+
+    assert statuses == {new_id: "created", existing_id: "already_exists"}
+    mock_db.begin.assert_called_once()
+    assert mock_db.execute.call_count == 2
+
+    # One executemany call per table, with one row per subscription
+    outbox_rows = mock_db.execute.call_args_list[1].args[1]
+    assert [row["eventtype"] for row in outbox_rows] == ["subscription_created_success", "subscription_created_failed"]
+    assert outbox_rows[1]["payload"]["exception"] == "ResourceAlreadyExistsException"
+
+@pytest.mark.asyncio
+async def test_create_subscriptions_database_error(subscription_repo, mock_db, sample_subscription, sample_outbox):
+    """Test that a failed bulk transaction raises BaseAppException."""
+    from src.exceptions import BaseAppException
+
+    mock_db.execute.side_effect = Exception("Database connection error")
+
+    with pytest.raises(BaseAppException):
+        await subscription_repo.create_subscriptions([sample_subscription], [sample_outbox])
+
+# Tests for delete_subscription method
+@pytest.mark.asyncio
+async def test_delete_subscription_success(subscription_repo, mock_db, sample_outbox):
+    """Test that the DELETE and its outbox event are one statement."""
+    from sqlalchemy.dialects import postgresql
+
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "subscription_deleted_success"
+    mock_db.execute.return_value = mock_result
+
+    await subscription_repo.delete_subscription("1_unique_id", sample_outbox)
+
+    mock_db.begin.assert_called_once()
+    mock_db.execute.assert_called_once()
+    sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH deleted AS")
+    assert "DELETE FROM auth.subscriptions" in sql
+    assert "INSERT INTO auth.subscriptions_outbox" in sql
+
+@pytest.mark.asyncio
+async def test_delete_subscription_not_found(subscription_repo, mock_db, sample_outbox):
+    """Test that deleting a missing subscription raises ResourceNotFoundException."""
+    from src.exceptions import ResourceNotFoundException
+
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "subscription_deleted_failed"
+    mock_db.execute.return_value = mock_result
+
+    with pytest.raises(ResourceNotFoundException):
+        await subscription_repo.delete_subscription("1_unique_id", sample_outbox)
+
+    # The failed event was written by the same statement
+    mock_db.execute.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_delete_subscription_database_error(subscription_repo, mock_db, sample_outbox):
+    """Test that a database error writes a failed event and raises BaseAppException."""
+    from src.exceptions import BaseAppException
+
+    mock_db.execute.side_effect = [Exception("Database connection error"), MagicMock()]
+
+    with pytest.raises(BaseAppException):
+        await subscription_repo.delete_subscription("1_unique_id", sample_outbox)
+
+    assert mock_db.begin.call_count == 2
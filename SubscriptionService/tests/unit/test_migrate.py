@@ -0,0 +1,105 @@
+import asyncio
+import json
+import pytest
+
+
+class FakeSource:
+    """Source of count subscriptions in batches of batch_size; the position is the number of subscriptions read."""
+
+    def __init__(self, count, batch_size):
+        self.count = count
+        self.batch_size = batch_size
+
+    def initial_position(self):
+        return 0
+
+    def advance(self, position, mark):
+        return mark
+
+    async def read(self, position):
+        from src.schemas import SubscriptionSchemas
+        for start in range(position, self.count, self.batch_size):
+            end = min(start + self.batch_size, self.count)
+            yield [
+                SubscriptionSchemas.Subscription(subscription_id=f"sub{i}", email=f"user{i}@example.com", is_active=True)
+                for i in range(start, end)
+            ], end
+
+
+class FakeTarget:
+    """Target that keeps the written subscription ids and fails when asked to write fail_at."""
+
+    def __init__(self, fail_at=None):
+        self.subscription_ids = []
+        self.fail_at = fail_at
+
+    async def write(self, subscriptions):
+        # Later batches finish first, so the checkpoint has to wait for earlier ones
+        await asyncio.sleep(0.001 * (len(self.subscription_ids) % 3))
+        if self.fail_at is not None and self.fail_at in [subscription.subscription_id for subscription in subscriptions]:
+            raise RuntimeError("write failed")
+        self.subscription_ids.extend(subscription.subscription_id for subscription in subscriptions)
+
+# Tests for migrate
+@pytest.mark.asyncio
+async def test_migrate_copies_every_batch(tmp_path):
+    """Test that every subscription is written and the checkpoint ends at the end of the source."""
+    from src.tools.migrate import Checkpoint, migrate
+    path = str(tmp_path / "checkpoint.json")
+    target = FakeTarget()
+
+    rows = await migrate(FakeSource(25, 4), target, Checkpoint(path, "postgres", "dynamodb"), concurrency=3)
+
+    assert rows == 25
+    assert sorted(target.subscription_ids) == sorted(f"sub{i}" for i in range(25))
+    with open(path) as f:
+        assert json.load(f) == {"source": "postgres", "target": "dynamodb", "rows": 25, "position": 25}
+
+@pytest.mark.asyncio
+async def test_migrate_resumes_from_checkpoint(tmp_path):
+    """Test that a failed run leaves a checkpoint before the failed batch, and a new run continues from it."""
+    from src.tools.migrate import Checkpoint, migrate
+    path = str(tmp_path / "checkpoint.json")
+
+    with pytest.raises(ExceptionGroup):
+        await migrate(FakeSource(25, 4), FakeTarget(fail_at="sub13"), Checkpoint(path, "postgres", "dynamodb"), concurrency=2)
+
+    checkpoint = Checkpoint(path, "postgres", "dynamodb")
+    resumed_at = checkpoint.state["position"]
+    assert resumed_at <= 12
+
+    target = FakeTarget()
+    await migrate(FakeSource(25, 4), target, checkpoint, concurrency=2)
+
+    assert sorted(target.subscription_ids) == sorted(f"sub{i}" for i in range(resumed_at, 25))
+    assert checkpoint.state["position"] == 25
+    assert checkpoint.state["rows"] == 25
+
+def test_checkpoint_rejects_other_direction(tmp_path):
+    """Test that a checkpoint cannot be resumed with a different source or target."""
+    from src.tools.migrate import Checkpoint
+    path = str(tmp_path / "checkpoint.json")
+    Checkpoint(path, "postgres", "dynamodb").save()
+
+    with pytest.raises(ValueError):
+        Checkpoint(path, "dynamodb", "postgres")
+
+@pytest.mark.asyncio
+async def test_postgres_target_replaces_existing_rows():
+    """Test that the Postgres target upserts, so a new pass also brings already copied rows up to date."""
+    from unittest.mock import AsyncMock, MagicMock
+    from src.tools.migrate import PostgresTarget
+    from src.schemas import SubscriptionSchemas
+
+    driver_connection = MagicMock(execute=AsyncMock(), copy_records_to_table=AsyncMock())
+    driver_connection.transaction.return_value.__aenter__ = AsyncMock()
+    driver_connection.transaction.return_value.__aexit__ = AsyncMock(return_value=False)
+    conn = MagicMock(get_raw_connection=AsyncMock(return_value=MagicMock(driver_connection=driver_connection)))
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    await PostgresTarget(engine).write([SubscriptionSchemas.Subscription(subscription_id="00000000-0000-0000-0000-000000000001", subscription_type="free_tier", email="user0@example.com", is_active=False)])
+
+    insert = driver_connection.execute.await_args_list[-1].args[0]
+    assert "ON CONFLICT (subscription_id) DO UPDATE SET subscription_type = EXCLUDED.subscription_type, email = EXCLUDED.email, is_active = EXCLUDED.is_active" in insert
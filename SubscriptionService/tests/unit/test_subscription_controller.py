@@ -74,6 +74,73 @@ async def test_get_subscription_success(
     assert subscription_data["email"] == sample_subscriptionresponse_active.email
     assert subscription_data["is_active"] == sample_subscriptionresponse_active.is_active
 
+@pytest.mark.asyncio
+async def test_list_subscriptions_by_email(
+    mock_subscription_service,
+    sample_subscriptionresponse_active
+    ):
+    """Test that ?email= returns a page of the user's subscriptions."""
+    from src.schemas import SubscriptionSchemas
+    mock_subscription_service.list_subscriptions.return_value = SubscriptionSchemas.SubscriptionPageResponse(
+        subscriptions=[sample_subscriptionresponse_active],
+        next_after="1_unique_id"
+    )
+
+    app.dependency_overrides[get_subscription_service] = lambda: mock_subscription_service
+
+    with TestClient(app) as client:
+        response = client.get("/subscriptions", params={"email": "test@example.com", "limit": 1})
+
+    app.dependency_overrides.clear()
+
+    mock_subscription_service.list_subscriptions.assert_called_once_with(email="test@example.com", after=None, limit=1)
+    mock_subscription_service.get_subscription.assert_not_called()
+    assert response.status_code == 200
+    assert response.json()["next_after"] == "1_unique_id"
+    assert response.json()["subscriptions"][0]["subscription_id"] == "1_unique_id"
+
+# Tests for get_subscriptions method
+@pytest.mark.asyncio
+async def test_get_subscriptions_success(
+    mock_subscription_service,
+    sample_subscriptionresponse_active
+    ):
+    """Test batch retrieval with repeated subscription_id query parameters."""
+    mock_subscription_service.get_subscriptions.return_value = [sample_subscriptionresponse_active]
+
+    app.dependency_overrides[get_subscription_service] = lambda: mock_subscription_service
+
+    with TestClient(app) as client:
+        response = client.get("/subscriptions/batch", params={"subscription_id": ["1_unique_id", "2_unique_id"]})
+
+    app.dependency_overrides.clear()
+
+    mock_subscription_service.get_subscriptions.assert_called_once_with(subscription_ids=["1_unique_id", "2_unique_id"])
+    assert response.status_code == 200
+    assert response.json()[0]["subscription_id"] == "1_unique_id"
+
+# Tests for export_subscriptions method
+@pytest.mark.asyncio
+async def test_export_subscriptions_ndjson(mock_subscription_service, sample_subscriptionresponse_active):
+    """Test that the export streams one JSON object per line."""
+    import json
+    from unittest.mock import MagicMock
+
+    async def export_subscriptions():
+        yield sample_subscriptionresponse_active
+
+    mock_subscription_service.export_subscriptions = MagicMock(side_effect=export_subscriptions)
+    app.dependency_overrides[get_subscription_service] = lambda: mock_subscription_service
+
+    with TestClient(app) as client:
+        response = client.get("/subscriptions/export")
+
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["subscription_id"] for line in response.text.splitlines()] == ["1_unique_id"]
+
 # Tests for create_subscription method
 @pytest.mark.asyncio
 async def test_create_subscription_success(
@@ -107,4 +174,35 @@ async def test_create_subscription_success(
     assert subscription_data["subscription_id"] == sample_subscriptionresponse_after_creation.subscription_id
     assert subscription_data["subscription_type"] == sample_subscriptionresponse_after_creation.subscription_type
     assert subscription_data["email"] == sample_subscriptionresponse_after_creation.email
-    assert subscription_data["is_active"] == sample_subscriptionresponse_after_creation.is_active
\ No newline at end of file
+    assert subscription_data["is_active"] == sample_subscriptionresponse_after_creation.is_active
+
+
+# Tests for create_subscriptions method
+@pytest.mark.asyncio
+async def test_create_subscriptions_success(
+    mock_subscription_service,
+    sample_createsubscription
+    ):
+    """Test bulk subscription creation returns per-item results."""
+    from src.schemas import SubscriptionSchemas
+    mock_subscription_service.create_subscriptions.return_value = [
+        SubscriptionSchemas.BulkCreateSubscriptionResult(
+            subscription_id="1_unique_id",
+            email="test@example.com",
+            status="created"
+        )
+    ]
+
+    app.dependency_overrides[get_subscription_service] = lambda: mock_subscription_service
+
+    with TestClient(app) as client:
+        response = client.post("/subscriptions/bulk", json={"subscriptions": [sample_createsubscription.model_dump()]})
+
+    app.dependency_overrides.clear()
+
+    mock_subscription_service.create_subscriptions.assert_called_once_with(
+        CreateSubscription_instances=[sample_createsubscription],
+        eventtype_prefix="subscription_created"
+    )
+    assert response.status_code == 201
+    assert response.json() == [{"subscription_id": "1_unique_id", "email": "test@example.com", "status": "created"}]
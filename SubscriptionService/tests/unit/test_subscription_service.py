@@ -76,6 +76,19 @@ async def test_get_subscription_not_found(subscription_service):
     
     assert "not found" in str(exc_info.value)
 
+# Tests for get_subscriptions method
+@pytest.mark.asyncio
+async def test_get_subscriptions_success(subscription_service, sample_subscription_active):
+    """Test batch retrieval maps subscriptions to responses."""
+    subscription_service.subscription_repository.get_subscriptions = AsyncMock(return_value=[sample_subscription_active])
+
+    subscriptions = await subscription_service.get_subscriptions(["1_unique_id", "2_unique_id"])
+
+    subscription_service.subscription_repository.get_subscriptions.assert_called_once_with(["1_unique_id", "2_unique_id"])
+    assert len(subscriptions) == 1
+    assert subscriptions[0].subscription_id == "1_unique_id"
+    assert subscriptions[0].email == "test@example.com"
+
 # Tests for create_subscription method
 @pytest.mark.asyncio
 @patch("src.service.SubscriptionService.generate_unique_id")
@@ -115,4 +128,31 @@ async def test_create_subscription_success(
     assert subscription.subscription_id == sample_subscription_active.subscription_id
     assert subscription.subscription_type == None
     assert subscription.email == None
-    assert subscription.is_active == None
\ No newline at end of file
+    assert subscription.is_active == None
+
+# Tests for create_subscriptions method
+@pytest.mark.asyncio
+@patch("src.service.SubscriptionService.generate_unique_id")
+async def test_create_subscriptions_success(
+    mock_uuid,
+    subscription_service,
+    sample_createsubscription
+    ):
+    """Test bulk creation returns one result per input in input order."""
+    mock_uuid.side_effect = ["1_unique_id", "2_unique_id"]
+    subscription_service.subscription_repository.create_subscriptions = AsyncMock(
+        return_value={"1_unique_id": "created", "2_unique_id": "already_exists"}
+    )
+
+    results = await subscription_service.create_subscriptions(
+        CreateSubscription_instances=[sample_createsubscription, sample_createsubscription],
+        eventtype_prefix="subscription_created"
+    )
+
+    call = subscription_service.subscription_repository.create_subscriptions.call_args
+    assert [subscription.subscription_id for subscription in call.kwargs["Subscription_instances"]] == ["1_unique_id", "2_unique_id"]
+    assert [outbox.aggregateid for outbox in call.kwargs["Outbox_instances"]] == ["1_unique_id", "2_unique_id"]
+    assert [(result.subscription_id, result.status) for result in results] == [
+        ("1_unique_id", "created"),
+        ("2_unique_id", "already_exists")
+    ]
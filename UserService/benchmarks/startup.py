@@ -0,0 +1,124 @@
+"""
+Startup benchmark: measures, per DATABASE_TYPE, how long importing the
+application takes and how much resident memory the process holds afterwards,
+then the same after the backend step: what startup and the first request add
+for the configured backend (its repository, engine or client, and the Kafka
+consumer library), without any network calls.
+
+Every sample runs in a fresh interpreter so nothing is already imported.
+
+Usage (from the service root):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --database-type dynamodb --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Libraries that should only be loaded when their backend is configured
+BACKEND_MODULES = [
+    "sqlalchemy",
+    "asyncpg",
+    "httpx",
+    "aioboto3",
+    "botocore",
+    "types_aiobotocore_dynamodb",
+    "aiokafka",
+]
+
+# Runs inside the child interpreter
+PROBE = """
+import asyncio, json, resource, sys, time
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+start = time.perf_counter()
+import src.main
+import_seconds = time.perf_counter() - start
+import_rss_mb = max_rss_mb()
+
+# The imports and objects the lifespan and the repository factory create for the
+# configured backend; the engine and client are only created, never connected
+from src.db.factory import create_backend_repository
+from src.db.settings import get_settings, DatabaseType
+settings = get_settings()
+
+start = time.perf_counter()
+if settings.DATABASE_TYPE == DatabaseType.MEMORY:
+    from src.repository.implementations.Memory.store import get_memory_store
+    create_backend_repository(settings.DATABASE_TYPE, get_memory_store())
+else:
+    create_backend_repository(settings.DATABASE_TYPE, None)
+if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
+    import httpx
+    from sqlalchemy.ext.asyncio import create_async_engine
+    create_async_engine(settings.POSTGRES_DATABASE_URL)
+elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
+    import aioboto3
+
+    async def open_client():
+        session = aioboto3.Session(
+            aws_access_key_id="probe",
+            aws_secret_access_key="probe",
+            region_name=settings.AWS_REGION
+        )
+        async with session.client("dynamodb", endpoint_url=settings.AWS_ENDPOINT):
+            pass
+    asyncio.run(open_client())
+if settings.DATABASE_TYPE != DatabaseType.MEMORY:
+    import aiokafka
+backend_seconds = time.perf_counter() - start
+
+print(json.dumps({
+    "import_seconds": import_seconds,
+    "import_rss_mb": import_rss_mb,
+    "backend_seconds": backend_seconds,
+    "backend_rss_mb": max_rss_mb(),
+    "modules": len(sys.modules),
+    "backend_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (BACKEND_MODULES,)
+
+
+def run_probe(database_type: str) -> dict:
+    env = {**os.environ, "DATABASE_TYPE": database_type}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-type", action="append", dest="database_types",
+                        help="DATABASE_TYPE to measure (repeatable, default: postgres, dynamodb and memory)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per DATABASE_TYPE")
+    args = parser.parse_args()
+
+    for database_type in args.database_types or ["postgres", "dynamodb", "memory"]:
+        samples = [run_probe(database_type) for _ in range(args.runs)]
+        import_ms = [sample["import_seconds"] * 1000 for sample in samples]
+        backend_ms = [sample["backend_seconds"] * 1000 for sample in samples]
+        total_ms = [a + b for a, b in zip(import_ms, backend_ms)]
+        import_rss_mb = [sample["import_rss_mb"] for sample in samples]
+        backend_rss_mb = [sample["backend_rss_mb"] for sample in samples]
+        print(
+            f"{database_type:>10}: import {statistics.median(import_ms):7.1f} ms, "
+            f"backend {statistics.median(backend_ms):7.1f} ms, "
+            f"total {statistics.median(total_ms):7.1f} ms (min {min(total_ms):.1f}), "
+            f"max RSS {statistics.median(import_rss_mb):6.1f} MB after import, "
+            f"{statistics.median(backend_rss_mb):6.1f} MB after backend, "
+            f"{samples[-1]['modules']} modules, "
+            f"backend modules loaded: {', '.join(samples[-1]['backend_modules']) or 'none'}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Throughput benchmark: requests per second of the read endpoints, served
+in-process with DATABASE_TYPE=memory, so what is measured is FastAPI, pydantic
+and the service layer rather than a database.
+
+Requests are sent straight to the ASGI app by concurrent tasks, without an
+HTTP client or server in between, so their overhead does not hide the app's.
+CPU time per request is reported too: on a shared machine it varies much
+less than requests/s, which depends on what else is running.
+
+Usage (from the service root):
+    python -m benchmarks.throughput
+    python -m benchmarks.throughput --seconds 10 --concurrency 32 --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+# Read endpoints measured: name -> (path, query string)
+ENDPOINTS = {
+    "get_user": ("/users", "email=user1@example.com"),
+    "get_users": ("/users/batch", "&".join(f"email=user{i}@example.com" for i in range(20)))
+}
+
+SEEDED_USERS = 1000
+
+
+def seed(store: Any) -> None:
+    table = store.table("users")
+    for i in range(SEEDED_USERS):
+        email = f"user{i}@example.com"
+        table[email] = {"email": email, "hashed_password": "hashed_password_value", "is_active": True}
+
+
+async def request(app: Any, path: str, query_string: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+        "state": {}
+    }
+    status = 0
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app: Any, path: str, query_string: str, seconds: float, concurrency: int) -> Tuple[float, float, List[float]]:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        while (started := time.perf_counter()) < deadline:
+            status = await request(app, path, query_string)
+            if status != 200:
+                raise RuntimeError(f"GET {path} returned {status}")
+            latencies.append(time.perf_counter() - started)
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    cpu_per_request = (time.process_time() - cpu_started) / len(latencies)
+    return len(latencies) / (time.perf_counter() - started), cpu_per_request, latencies
+
+
+async def run(args: argparse.Namespace) -> None:
+    # Imported here, after DATABASE_TYPE is set, like the startup benchmark's probe
+    from src.main import app
+    from src.repository.implementations.Memory.store import get_memory_store
+
+    seed(get_memory_store())
+    for name, (path, query_string) in ENDPOINTS.items():
+        await measure(app, path, query_string, seconds=1.0, concurrency=args.concurrency)  # Warm-up
+        rates, cpu_times, latencies = [], [], []
+        for _ in range(args.runs):
+            rate, cpu_per_request, run_latencies = await measure(app, path, query_string, args.seconds, args.concurrency)
+            rates.append(rate)
+            cpu_times.append(cpu_per_request)
+            latencies.extend(run_latencies)
+        latencies.sort()
+        print(
+            f"{name:>10}: {statistics.median(rates):8.0f} requests/s (min {min(rates):.0f}, max {max(rates):.0f}), "
+            f"{min(cpu_times) * 1e6:6.0f} us CPU/request, "
+            f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per endpoint; the median is reported")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_TYPE"] = "memory"
+    os.environ.setdefault("CACHE_ENABLED", "false")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
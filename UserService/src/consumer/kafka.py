@@ -1,23 +1,24 @@
 import asyncio
 import json
 import logging
-from src.logging_config import setup_logging
-from typing import Dict, List, Any
-from aiokafka import AIOKafkaConsumer
+import time
+from fnmatch import fnmatchcase
+from typing import Dict, List, Any, Optional, Tuple
 from src.exceptions import ResourceAlreadyExistsException, BaseAppException, ResourceNotFoundException
 from src.db.db_context import get_db_session_for_background
 from src.db.factory import create_user_repository
 from src.service.UserService import UserService
 from src.schemas import UserSchemas
+from src.db.settings import get_settings
 
 
-# Configure logging
-setup_logging()
 logger = logging.getLogger(__name__)
 
 # Kafka configuration
 KAFKA_BOOTSTRAP_SERVERS = "kafka:29092"
 KAFKA_TOPICS = ["subscriptionservice.subscription"]  # Multiple topics
+KAFKA_OWN_TOPICS = ["userservice.user"]  # Events published by this service's outbox
+SESSION_REVOKING_EVENTS = ["user_deactivated_success", "user_password_reset_success"]
 KAFKA_CONSUMER_GROUP = "user_service_group"
 KAFKA_AUTO_COMMIT = True
 KAFKA_MAX_POLL_INTERVAL_MS = 300000  # 5 minutes
@@ -61,6 +62,40 @@ class SubscriptionCreatedSuccessHandler(EventHandler):
             logger.exception(f"Error creating user: {str(e)}")
             raise BaseAppException(f"Error creating user: {str(e)}") from e
 
+class UserCacheInvalidationHandler(EventHandler):
+    """Drops a user from this pod's read-through cache when its outbox reports a change"""
+
+    async def handle(self, payload: Dict[str, Any]) -> None:
+        from src.repository.implementations.Caching.caching_UserRepository import get_user_cache
+
+        email = (payload or {}).get("email")
+        if email:
+            get_user_cache().invalidate(email)
+            logger.debug(f"Invalidated cached user {email}")
+
+class SessionRevocationHandler(EventHandler):
+    """Revokes a user's sessions on this pod when its outbox reports a deactivation or password reset"""
+
+    async def handle(self, payload: Dict[str, Any]) -> None:
+        from src.service.sessions import get_session_tokens
+
+        payload = payload or {}
+        email = payload.get("email")
+        if email:
+            # As of the change, so tokens issued on any pod before it are rejected, however late the event is
+            get_session_tokens().revoke(email, at=payload.get("changed_at"))
+            logger.debug(f"Revoked sessions of {email}")
+
+class ChainedHandler(EventHandler):
+    """Runs several handlers for the same events, in order"""
+
+    def __init__(self, handlers: List[EventHandler]):
+        self.handlers = handlers
+
+    async def handle(self, payload: Dict[str, Any]) -> None:
+        for handler in self.handlers:
+            await handler.handle(payload)
+
 class KafkaEventManager:
     """Manages Kafka event consumption and routing to appropriate handlers"""
     
@@ -68,32 +103,75 @@ class KafkaEventManager:
         self.consumer = None
         self.tasks = []
         self.event_handlers: Dict[str, EventHandler] = {}
+        self.pattern_handlers: List[Tuple[str, EventHandler]] = []
         
     def register_handler(self, event_type: str, handler: EventHandler) -> None:
-        """Register a handler for a specific event type"""
-        self.event_handlers[event_type] = handler
+        """Register a handler for a specific event type, or for a glob pattern such as user_created_*_success"""
+        if any(char in event_type for char in "*?["):
+            self.pattern_handlers = [(pattern, h) for pattern, h in self.pattern_handlers if pattern != event_type]
+            self.pattern_handlers.append((event_type, handler))
+        else:
+            self.event_handlers[event_type] = handler
         logger.info(f"Registered handler for event type: {event_type}")
         
-    async def start(self, topics: List[str], bootstrap_servers: str, group_id: str) -> None:
+    async def start(
+            self,
+            topics: List[str],
+            bootstrap_servers: str,
+            group_id: Optional[str],
+            auto_offset_reset: str = "earliest",
+            workers: int = 3,
+            replay_seconds: Optional[float] = None
+        ) -> None:
+        """
+        Start consuming. With group_id=None every pod reads every partition,
+        which is what broadcast-style handlers like cache invalidation need.
+        With replay_seconds (only without a group), consumption starts at the
+        events of the last replay_seconds instead of at auto_offset_reset.
+        """
+        # Imported on start so importing the app does not pull in aiokafka
+        from aiokafka import AIOKafkaConsumer
+
         self.consumer = AIOKafkaConsumer(
-            *topics,
+            *(topics if replay_seconds is None else []),  # Otherwise assigned below
             bootstrap_servers=bootstrap_servers,
             group_id=group_id,
             value_deserializer=lambda m: json.loads(m.decode('utf-8')),
-            enable_auto_commit=KAFKA_AUTO_COMMIT,
+            enable_auto_commit=KAFKA_AUTO_COMMIT if group_id else False,
             max_poll_interval_ms=KAFKA_MAX_POLL_INTERVAL_MS,
             session_timeout_ms=KAFKA_SESSION_TIMEOUT_MS,
-            auto_offset_reset="earliest"
+            auto_offset_reset=auto_offset_reset
         )
         
         await self.consumer.start()
+        if replay_seconds is not None:
+            await self._assign_from(topics, time.time() - replay_seconds)
         logger.info(f"Kafka consumer started for topics: {topics}")
         
         # Start multiple consumer tasks for parallel processing
-        for i in range(3):  # Number of parallel consumers
+        for i in range(workers):  # Number of parallel consumers
             task = asyncio.create_task(self._consume(i))
             self.tasks.append(task)
             
+    async def _assign_from(self, topics: List[str], timestamp: float) -> None:
+        """Assign every partition of the topics, each at its first event at or after timestamp (Unix seconds)"""
+        from aiokafka import TopicPartition
+
+        await self.consumer.topics()  # Fetches the metadata partitions_for_topic reads
+        partitions = [
+            TopicPartition(topic, partition)
+            for topic in topics
+            for partition in sorted(self.consumer.partitions_for_topic(topic) or [])
+        ]
+        self.consumer.assign(partitions)
+
+        offsets = await self.consumer.offsets_for_times({partition: int(timestamp * 1000) for partition in partitions})
+        for partition in partitions:
+            if offsets.get(partition) is None:
+                await self.consumer.seek_to_end(partition)  # No event that recent
+            else:
+                self.consumer.seek(partition, offsets[partition].offset)
+
     async def _consume(self, worker_id: int) -> None:
         """Consume messages from Kafka and route to handlers using async iteration"""
         logger.info(f"Starting consumer worker {worker_id}")
@@ -128,6 +206,11 @@ class KafkaEventManager:
     async def _process_event(self, event_type: str, payload: Dict[str, Any]) -> None:
         """Process an event by routing to the appropriate handler"""
         handler = self.event_handlers.get(event_type)
+        if handler is None and event_type:
+            handler = next(
+                (pattern_handler for pattern, pattern_handler in self.pattern_handlers if fnmatchcase(event_type, pattern)),
+                None
+            )
         
         if handler:
             try:
@@ -162,6 +245,26 @@ class KafkaEventManager:
 # Create event manager instance
 event_manager = KafkaEventManager()
 
+# Broadcast consumer of this service's own outbox events (cache invalidation, session revocation)
+invalidation_manager = KafkaEventManager()
+
+
+def register_invalidation_handlers() -> None:
+    """Register the handlers for this service's own outbox events"""
+    handlers: List[EventHandler] = []
+    if get_settings().CACHE_ENABLED:
+        handlers.append(UserCacheInvalidationHandler())
+    for event_type in SESSION_REVOKING_EVENTS:
+        invalidation_manager.register_handler(event_type, ChainedHandler([SessionRevocationHandler(), *handlers]))
+    invalidation_manager.register_handler("user_*_success", ChainedHandler(handlers))
+
+async def setup_local_handlers(store) -> None:
+    """
+    For DATABASE_TYPE=memory: deliver outbox events from the in-memory store
+    straight to this service's handlers instead of through Debezium and Kafka.
+    """
+    register_invalidation_handlers()
+    store.subscribe(invalidation_manager._process_event)
 
 async def setup_kafka_handlers():
     """Initialize and start Kafka event handlers"""
@@ -174,3 +277,14 @@ async def setup_kafka_handlers():
         bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
         group_id=KAFKA_CONSUMER_GROUP
     )
+
+    # Every pod consumes every change. A token stays valid for SESSION_TTL_SECONDS, so a starting pod
+    # replays the revocations of that long; the cache starts empty, so replayed invalidations are harmless
+    register_invalidation_handlers()
+    await invalidation_manager.start(
+        topics=KAFKA_OWN_TOPICS,
+        bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
+        group_id=None,
+        workers=1,
+        replay_seconds=get_settings().SESSION_TTL_SECONDS
+    )
@@ -1,23 +1,76 @@
 # src/db/factory.py
-from sqlalchemy.ext.asyncio import AsyncSession
-from types_aiobotocore_dynamodb import DynamoDBClient
 from src.repository.interfaces.interface_UserRepository import UserRepository as UserRepositoryInterface
-from src.repository.implementations.PostgreSQL.postgres_UserRepository import UserRepository as PostgresUserRepository
-from src.repository.implementations.AWS_DynamoDB.awsdynamodb_UserRepository import UserRepository as DynamoUserRepository
 from .settings import get_settings, DatabaseType
-from typing import Union
+from typing import Union, TYPE_CHECKING
 
-def create_user_repository(db_context: Union[AsyncSession, DynamoDBClient]) -> UserRepositoryInterface:
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from types_aiobotocore_dynamodb import DynamoDBClient
+    from src.repository.implementations.Memory.store import MemoryStore
+
+def create_backend_repository(
+        database_type: DatabaseType,
+        db_context: Union["AsyncSession", "DynamoDBClient", "MemoryStore"]
+    ) -> UserRepositoryInterface:
+    """
+    Creates the repository of one backend, without any wrapper.
+    Only the implementation for that backend is imported.
+    """
+    settings = get_settings()
+
+    if database_type == DatabaseType.POSTGRES:
+        from src.repository.implementations.PostgreSQL.postgres_UserRepository import UserRepository as PostgresUserRepository
+        return PostgresUserRepository(db_context)
+    elif database_type == DatabaseType.DYNAMODB:
+        from src.repository.implementations.AWS_DynamoDB.awsdynamodb_UserRepository import UserRepository as DynamoUserRepository
+        from src.repository.implementations.AWS_DynamoDB.metrics import get_capacity_metrics
+        from src.repository.implementations.AWS_DynamoDB.hedging import get_hedging_policy
+        return DynamoUserRepository(
+            db_context,
+            consistent_read=settings.DYNAMODB_CONSISTENT_READ,
+            metrics=get_capacity_metrics() if settings.DYNAMODB_CAPACITY_METRICS else None,
+            hedging=get_hedging_policy() if settings.DYNAMODB_HEDGED_READS else None
+        )
+    elif database_type == DatabaseType.MEMORY:
+        from src.repository.implementations.Memory.memory_UserRepository import UserRepository as MemoryUserRepository
+        return MemoryUserRepository(db_context)
+    else:
+        raise ValueError(f"Unsupported database type: {database_type}")
+
+def create_user_repository(db_context: Union["AsyncSession", "DynamoDBClient", "MemoryStore"]) -> UserRepositoryInterface:
     """
     Creates the appropriate repository based on configuration.
     For PostgreSQL: Uses the provided database session
     For DynamoDB: Uses the provided database client
+    For Memory: Uses the provided in-process store
+    With SHADOW_ENABLED a sample of the reads is mirrored to the shadow backend.
+    With COALESCE_READS concurrent reads of the same user share one call.
+    With CACHE_ENABLED the repository is wrapped in the read-through cache.
     """
     settings = get_settings()
-    
-    if settings.DATABASE_TYPE == DatabaseType.POSTGRES:
-        return PostgresUserRepository(db_context)
-    elif settings.DATABASE_TYPE == DatabaseType.DYNAMODB:
-        return DynamoUserRepository(db_context)
-    else:
-        raise ValueError(f"Unsupported database type: {settings.DATABASE_TYPE}")
+    repository = create_backend_repository(settings.DATABASE_TYPE, db_context)
+
+    if settings.SHADOW_ENABLED:
+        # Inside the cache, so backends are compared on the reads that reach them
+        from src.repository.implementations.Shadow.shadow_UserRepository import ShadowUserRepository, get_shadow_backend, get_shadow_stats
+        repository = ShadowUserRepository(
+            repository,
+            backend=get_shadow_backend(),
+            stats=get_shadow_stats(),
+            sample_rate=settings.SHADOW_SAMPLE_RATE
+        )
+
+    if settings.COALESCE_READS:
+        # Inside the cache, so concurrent misses of a hot key become one backend call
+        from src.repository.implementations.Coalescing.coalescing_UserRepository import CoalescingUserRepository, get_user_flights
+        repository = CoalescingUserRepository(repository, flights=get_user_flights())
+
+    if settings.CACHE_ENABLED:
+        from src.repository.implementations.Caching.caching_UserRepository import CachingUserRepository, get_user_cache
+        repository = CachingUserRepository(
+            repository,
+            cache=get_user_cache(),
+            write_through=settings.CACHE_WRITE_THROUGH
+        )
+
+    return repository
@@ -0,0 +1,79 @@
+# src/db/warmup.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, TYPE_CHECKING
+from src.db.factory import create_user_repository
+from src.db.settings import Settings
+from src.exceptions import ResourceNotFoundException
+from src.schemas import UserSchemas
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+    from types_aiobotocore_dynamodb import DynamoDBClient
+
+logger = logging.getLogger(__name__)
+
+# Key that never exists, so the hot queries run without reading or writing real data
+WARMUP_KEY = "__warmup__"
+
+async def _run_hot_queries(db_context) -> None:
+    """Runs the repository read path once, exactly as a request would."""
+    repository = create_user_repository(db_context)
+    try:
+        await repository.get_user(WARMUP_KEY, fields=UserSchemas.USER_RESPONSE_FIELDS)
+    except ResourceNotFoundException:
+        pass
+
+async def _warm_up(name: str, settings: Settings, warm: Callable[[], Awaitable[None]]) -> None:
+    """Best effort: a failed or slow warm-up is logged and startup continues."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        async with asyncio.timeout(settings.WARMUP_TIMEOUT_SECONDS):
+            await warm()
+        logger.info(f"{name} warm-up finished: {settings.WARMUP_CONNECTIONS} connections in {loop.time() - started:.3f}s")
+    except Exception as e:
+        logger.warning(f"{name} warm-up failed, continuing without it: {e!r}")
+
+async def warm_up_postgres(engine: "AsyncEngine", settings: Settings) -> None:
+    """
+    Opens WARMUP_CONNECTIONS pool connections at the same time and runs the hot
+    queries on each, so asyncpg's type introspection and prepared statements are
+    done before the first request instead of during it.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    connections = min(settings.WARMUP_CONNECTIONS, settings.POSTGRES_POOL_SIZE)
+    if connections < 1:
+        # asyncio.Barrier needs at least one party
+        logger.warning(f"PostgreSQL warm-up skipped: {connections} connections")
+        return
+    # Every task holds its connection until all are open, so each one is a distinct pooled connection
+    barrier = asyncio.Barrier(connections)
+
+    async def warm_connection() -> None:
+        try:
+            async with engine.connect() as connection:
+                await barrier.wait()
+                async with AsyncSession(bind=connection) as session:
+                    await _run_hot_queries(session)
+        except BaseException:
+            await barrier.abort()
+            raise
+
+    async def warm() -> None:
+        await asyncio.gather(*(warm_connection() for _ in range(connections)))
+
+    await _warm_up("PostgreSQL", settings, warm)
+
+async def warm_up_dynamodb(client: "DynamoDBClient", settings: Settings) -> None:
+    """
+    Sends WARMUP_CONNECTIONS concurrent hot queries through the app-wide client,
+    so its pool holds that many open (TLS) connections before the first request.
+    """
+    connections = min(settings.WARMUP_CONNECTIONS, settings.DYNAMODB_MAX_POOL_CONNECTIONS)
+
+    async def warm() -> None:
+        await asyncio.gather(*(_run_hot_queries(client) for _ in range(connections)))
+
+    await _warm_up("DynamoDB", settings, warm)
@@ -1,14 +1,20 @@
 # src/dependencies.py
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from types_aiobotocore_dynamodb import DynamoDBClient
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from src.repository.interfaces.interface_UserRepository import UserRepository as UserRepositoryInterface
 from src.service.UserService import UserService
 from src.db.factory import create_user_repository
-from src.db.db_context import db_context
-from typing import Union
+from src.service.sessions import get_session_tokens
+from src.db.db_context import db_context, read_only_transaction
+from src.exceptions import UnauthorizedException
+from typing import Optional, Union, TYPE_CHECKING
 
-async def get_user_repository(db: Union[AsyncSession, DynamoDBClient] = Depends(db_context)) -> UserRepositoryInterface:
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from types_aiobotocore_dynamodb import DynamoDBClient
+    from src.repository.implementations.Memory.store import MemoryStore
+
+async def get_user_repository(db: Union["AsyncSession", "DynamoDBClient", "MemoryStore"] = Depends(db_context)) -> UserRepositoryInterface:
     """
     Creates the appropriate repository based on configuration.
     The db parameter will be a database session for PostgreSQL or None for DynamoDB.
@@ -17,3 +23,21 @@ async def get_user_repository(db: Union[AsyncSession, DynamoDBClient] = Depends(
 
 async def get_user_service(user_repository: UserRepositoryInterface = Depends(get_user_repository)) -> UserService:
     return UserService(user_repository)
+
+# auto_error=False: a missing token is reported through our UnauthorizedException (401)
+bearer_token = HTTPBearer(auto_error=False)
+
+async def get_session_email(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_token)) -> str:
+    """
+    Returns the email of the session token in the Authorization header (Bearer).
+    The token is verified in-process, without a database or Redis lookup.
+    """
+    if credentials is None:
+        raise UnauthorizedException("Missing session token")
+    return get_session_tokens().verify(credentials.credentials)
+
+async def get_optional_session_email(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_token)) -> Optional[str]:
+    """Like get_session_email, but None without an Authorization header; a token that is sent must still be valid."""
+    if credentials is None:
+        return None
+    return get_session_tokens().verify(credentials.credentials)
@@ -23,4 +23,14 @@ class ValidationException(BaseAppException):
 class UnauthorizedException(BaseAppException):
     """Raised when user is not authorized"""
     def __init__(self, message: str):
-        super().__init__(message, status_code=401)
\ No newline at end of file
+        super().__init__(message, status_code=401)
+
+class ServiceUnavailableException(BaseAppException):
+    """Raised when the service is too busy to take the request"""
+    def __init__(self, message: str):
+        super().__init__(message, status_code=503)
+
+class ConflictException(BaseAppException):
+    """Raised when a conditional write finds the resource changed since it was read"""
+    def __init__(self, message: str):
+        super().__init__(message, status_code=409)
@@ -2,48 +2,81 @@ from botocore.exceptions import ClientError
 from types_aiobotocore_dynamodb import DynamoDBClient
 from src.repository.interfaces import interface_UserRepository
 from src.schemas import UserSchemas
-from src.exceptions import ResourceNotFoundException, BaseAppException, ResourceAlreadyExistsException
+from src.exceptions import ResourceNotFoundException, BaseAppException, ResourceAlreadyExistsException, ConflictException
 import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 from .utils import *
+from .metrics import CapacityMetrics, MeteredClient
+from .hedging import HedgingPolicy
 
 logger = logging.getLogger(__name__)
 
 class UserRepository(interface_UserRepository.UserRepository):
 
-    def __init__(self, client: DynamoDBClient):
+    def __init__(
+            self,
+            client: DynamoDBClient,
+            consistent_read: bool = False,
+            metrics: Optional[CapacityMetrics] = None,
+            hedging: Optional[HedgingPolicy] = None
+        ):
         """
         Initialize the DynamoDB repository.
+        With consistent_read, reads by key are strongly consistent (twice the read capacity).
+        With metrics, the consumed capacity and throttling of every call is recorded per operation.
+        With hedging, slow reads by key are sent a second time (see HedgingPolicy).
         """
         
         # Initialize DynamoDB client
         self.client = client
+        self.consistent_read = consistent_read
+        self.metrics = metrics
+        self.hedging = hedging
         
         # You could also use a table name prefix from settings
         self.table_name = "users"
+        # Outbox events, written in the same transaction as the change; its stream feeds the user topic
+        self.outbox_table_name = "users_outbox"
+
+    def _client(self, operation: str) -> DynamoDBClient:
+        """Client for one repository operation; its calls are recorded under that operation."""
+        if self.metrics is None:
+            return self.client
+        return MeteredClient(self.client, self.metrics, operation)
 
     async def get_user(
             self,
-            email: str
+            email: str,
+            fields: Optional[Sequence[str]] = None
         ) -> UserSchemas.User:
         '''
         This function returns a User instance from the database.
         Or raises an exception if the user does not exist.
+        With fields, only those attributes are read (ProjectionExpression).
         '''
 
         try:
-            response = await self.client.get_item(
+            client = self._client("get_user")
+            request = dict(
                 TableName=self.table_name,
                 Key=await get_key(
                     pkey_name="email",
                     pkey_value=email
-                )
+                ),
+                ConsistentRead=self.consistent_read,
+                **build_projection(fields=fields, key_names=["email"])
             )
+            if self.hedging is None:
+                response = await client.get_item(**request)
+            else:
+                response = await self.hedging.run(lambda: client.get_item(**request))
 
             if 'Item' not in response:
                 logger.warning(f"User with email {email} not found")
                 raise ResourceNotFoundException(f"User with email {email} not found")
             
-            return await dynamodb_to_basemodel(
+            return from_dynamodb_item(
                 basemodel=UserSchemas.User,
                 dynamodb_data=response['Item'],
                 include_empty_string_in_stringsets=False
@@ -56,6 +89,72 @@ class UserRepository(interface_UserRepository.UserRepository):
             logger.exception(f"Error getting user: {str(e)}")
             raise BaseAppException(f"Internal database error: {str(e)}") from e
 
+    async def get_users(
+            self,
+            emails: List[str],
+            fields: Optional[Sequence[str]] = None
+        ) -> List[UserSchemas.User]:
+        '''
+        This function returns the User instances that exist for the given emails,
+        in the order of emails. Emails that do not exist are skipped.
+        With fields, only those attributes are read (ProjectionExpression).
+        '''
+
+        try:
+            client = self._client("get_users")
+            unique_emails = list(dict.fromkeys(emails))
+            items = await batch_get_items(
+                client=client,
+                table_name=self.table_name,
+                keys=[await get_key(pkey_name="email", pkey_value=email) for email in unique_emails],
+                ConsistentRead=self.consistent_read,
+                **build_projection(fields=fields, key_names=["email"])
+            )
+
+            users = {}
+            for item in items:
+                user = from_dynamodb_item(
+                    basemodel=UserSchemas.User,
+                    dynamodb_data=item,
+                    include_empty_string_in_stringsets=False
+                )
+                users[user.email] = user
+
+            return [users[email] for email in unique_emails if email in users]
+
+        except Exception as e:
+            logger.exception(f"Error getting users: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+    async def stream_users(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[UserSchemas.User]:
+        '''
+        This function yields every User instance using a parallel segmented Scan,
+        batch_size items per page; only a few pages are held in memory.
+        The password hash is not read.
+        '''
+        try:
+            client = self._client("stream_users")
+            async for page in parallel_scan(
+                client=client,
+                table_name=self.table_name,
+                page_size=batch_size,
+                ProjectionExpression="#email, #is_active",
+                ExpressionAttributeNames={"#email": "email", "#is_active": "is_active"}
+            ):
+                for item in page:
+                    yield from_dynamodb_item(
+                        basemodel=UserSchemas.User,
+                        dynamodb_data=item,
+                        include_empty_string_in_stringsets=False
+                    )
+
+        except Exception as e:
+            logger.exception(f"Error streaming users: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
     async def create_user(
             self,
             User_instance: UserSchemas.User,
@@ -69,9 +168,10 @@ class UserRepository(interface_UserRepository.UserRepository):
         '''
 
         try:
-            await self.client.put_item(
+            client = self._client("create_user")
+            await client.put_item(
                 TableName=self.table_name,
-                Item=await basemodel_to_dynamodb(
+                Item=to_dynamodb_item(
                     basemodel=UserSchemas.User(
                         email=User_instance.email,
                         is_active=True if User_instance.is_active else False
@@ -93,25 +193,179 @@ class UserRepository(interface_UserRepository.UserRepository):
 
     async def update_user(
             self,
-            User_instance: UserSchemas.User
-        ) -> None:
+            User_instance: UserSchemas.User,
+            Outbox_instance: Optional[UserSchemas.Outbox] = None,
+            expected: Optional[Dict[str, Any]] = None
+        ) -> UserSchemas.User:
         """
-        This function updates a User instance using put_item with a condition.
-        It ensures the user exists before proceeding with the update.
+        This function updates the fields set on a User instance using update_item.
+        Fields that are not set are left as they are, and the condition ensures the
+        user exists (and has the expected values) before proceeding with the update.
+        With an Outbox instance, the update and the Put of its event are one
+        transaction instead.
         It returns the updated User instance.
         """
 
+        if Outbox_instance is not None:
+            return await self._update_user_with_event(User_instance, Outbox_instance, expected)
+
         try:
-            await self.client.put_item(
+            client = self._client("update_user")
+            response = await client.update_item(
                 TableName=self.table_name,
-                Item=await basemodel_to_dynamodb(basemodel=User_instance),
-                ConditionExpression="attribute_exists(email)"  # Ensures user exists
+                Key=await get_key(
+                    pkey_name="email",
+                    pkey_value=User_instance.email
+                ),
+                **build_update_expression(
+                    fields=User_instance.model_dump(exclude_unset=True),
+                    key_names=["email"],
+                    expected=expected
+                )
+            )
+
+            return from_dynamodb_item(
+                basemodel=UserSchemas.User,
+                dynamodb_data=response["Attributes"],
+                include_empty_string_in_stringsets=False
             )
             
-        except self.client.exceptions.ConditionalCheckFailedException:
-            # Raised when ConditionExpression fails (user does not exist)
-            raise ResourceNotFoundException(f"User with email {User_instance.email} not found")
+        except client.exceptions.ConditionalCheckFailedException:
+            # Raised when ConditionExpression fails (user does not exist, or has changed)
+            self._raise_not_updated(User_instance, expected)
         except Exception as e:
             logger.exception(f"Internal database error: {str(e)}")
             raise BaseAppException(f"Internal database error: {str(e)}") from e
 
+    @staticmethod
+    def _raise_not_updated(
+            User_instance: UserSchemas.User,
+            expected: Optional[Dict[str, Any]]
+        ) -> None:
+        # A failed condition looks the same in both cases; with expected values a change is the likely one
+        if expected:
+            logger.info(f"User with email {User_instance.email} has changed or does not exist, not updated")
+            raise ConflictException(f"User with email {User_instance.email} has changed")
+        raise ResourceNotFoundException(f"User with email {User_instance.email} not found")
+
+    async def _update_user_with_event(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: UserSchemas.Outbox,
+            expected: Optional[Dict[str, Any]]
+        ) -> UserSchemas.User:
+        """
+        This function runs the conditional Update and the Put of its outbox event as
+        one TransactWriteItems, so the event is written if and only if the user is.
+        A transaction cannot return the item, so the result is built from the update.
+        """
+        fields = User_instance.model_dump(exclude_unset=True)
+        try:
+            client = self._client("update_user")
+            reasons = await transact_write_items(
+                client=client,
+                operations=[
+                    {
+                        "Update": {
+                            "TableName": self.table_name,
+                            "Key": await get_key(pkey_name="email", pkey_value=User_instance.email),
+                            **build_update_expression(
+                                fields=fields,
+                                key_names=["email"],
+                                return_values=None,
+                                expected=expected
+                            )
+                        }
+                    },
+                    outbox_put(self.outbox_table_name, Outbox_instance)
+                ],
+                group_size=2
+            )
+        except Exception as e:
+            logger.exception(f"Internal database error: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+        if reasons[0] == "ConditionalCheckFailed":
+            self._raise_not_updated(User_instance, expected)
+        if reasons[0] is not None:
+            logger.error(f"Updating user with email {User_instance.email} failed: {reasons[0]}")
+            raise BaseAppException(f"Internal database error: {reasons[0]}")
+
+        if "is_active" not in fields:
+            return await self.get_user(User_instance.email, fields=["is_active"])
+        return UserSchemas.User(
+            email=User_instance.email,
+            is_active=fields["is_active"]
+        )
+
+    async def deactivate_users(
+            self,
+            emails: Optional[List[str]],
+            email_domain: Optional[str],
+            eventtype_prefix: str
+        ) -> Dict[str, UserSchemas.BulkDeactivateStatus]:
+        '''
+        This function deactivates many users with concurrent, chunked TransactWriteItems.
+        Each Update is conditional on the user existing, so missing emails are
+        reported as not_found instead of being created.
+        With email_domain, the matching emails are found with a parallel segmented Scan first.
+        Every Update goes in the same transaction as the Put of its {eventtype_prefix}_success event.
+        '''
+        try:
+            client = self._client("deactivate_users")
+            if emails is None:
+                emails = []
+                async for page in parallel_scan(
+                    client=client,
+                    table_name=self.table_name,
+                    ProjectionExpression="#email",
+                    FilterExpression="contains(#email, :domain)",
+                    ExpressionAttributeNames={"#email": "email"},
+                    ExpressionAttributeValues={":domain": {"S": f"@{email_domain}"}}
+                ):
+                    emails.extend(
+                        item["email"]["S"] for item in page
+                        if item["email"]["S"].endswith(f"@{email_domain}")
+                    )
+
+            unique_emails = list(dict.fromkeys(emails))
+            changed_at = time.time()
+            update = build_update_expression(
+                fields={"is_active": False},
+                key_names=["email"],
+                return_values=None
+            )
+            operations = []
+            for email in unique_emails:
+                operations.append({
+                    "Update": {
+                        "TableName": self.table_name,
+                        "Key": await get_key(pkey_name="email", pkey_value=email),
+                        **update
+                    }
+                })
+                operations.append(outbox_put(
+                    self.outbox_table_name,
+                    UserSchemas.Outbox(
+                        aggregatetype="user",
+                        aggregateid=email,
+                        eventtype_prefix=eventtype_prefix,
+                        payload={"email": email, "is_active": False, "changed_at": changed_at}
+                    )
+                ))
+            reasons = await transact_write_items(client=client, operations=operations, group_size=2)
+
+            statuses = {}
+            for email, reason in zip(unique_emails, reasons):
+                if reason is None:
+                    statuses[email] = "deactivated"
+                elif reason == "ConditionalCheckFailed":
+                    statuses[email] = "not_found"
+                else:
+                    logger.warning(f"Deactivating user with email {email} failed: {reason}")
+                    statuses[email] = "failed"
+            return statuses
+
+        except Exception as e:
+            logger.exception(f"Error deactivating users: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
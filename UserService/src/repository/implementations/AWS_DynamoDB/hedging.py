@@ -0,0 +1,135 @@
+import asyncio
+import math
+from collections import deque
+from functools import lru_cache
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+from src.db.settings import get_settings
+
+T = TypeVar("T")
+
+class HedgingPolicy:
+    """
+    Hedged requests: if a request has not returned after the tracked percentile
+    of recent latencies (p95 by default), an identical second request is sent
+    and whichever succeeds first is used; the other one is cancelled.
+
+    Hedges are paid for from a token bucket that every request adds budget
+    tokens to and every hedge takes one from, so at most about budget extra
+    requests per request are sent, with bursts of up to max_tokens. Until
+    min_samples latencies have been seen there is no estimate and nothing is hedged.
+    """
+
+    def __init__(
+            self,
+            percentile: float = 95.0,
+            budget: float = 0.05,
+            max_tokens: float = 10.0,
+            window: int = 1000,
+            min_samples: int = 100,
+            min_delay: float = 0.001,
+            recompute_every: int = 50
+        ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.budget = budget
+        self.max_tokens = max_tokens
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.recompute_every = recompute_every
+
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._since_recompute = 0
+        self._delay: Optional[float] = None
+        self._tokens = 0.0
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self.over_budget = 0
+
+    @property
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        return self._delay
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._since_recompute += 1
+        # Sorting the window on every request would cost more than the lookup it hedges
+        if len(self._latencies) >= self.min_samples and (self._delay is None or self._since_recompute >= self.recompute_every):
+            self._since_recompute = 0
+            ordered = sorted(self._latencies)
+            index = max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+            self._delay = max(self.min_delay, ordered[index])
+
+    def _start(self, request: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        task = asyncio.ensure_future(request())
+
+        def record_latency(task: "asyncio.Task[T]") -> None:
+            if not task.cancelled():
+                self.record(loop.time() - started)
+
+        task.add_done_callback(record_latency)
+        return task
+
+    async def run(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of request(), sending it a second time if the first is slow."""
+        self.requests += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.budget)
+
+        first_started = asyncio.get_running_loop().time()
+        first = self._start(request)
+        tasks = [first]
+        try:
+            if self._delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=self._delay)
+                if not done:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.hedges += 1
+                        tasks.append(self._start(request))
+                    else:
+                        self.over_budget += 1
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedges_won += 1
+                        return task.result()
+                    # A failed request does not win while the other may still succeed
+                    error = error or task.exception()
+            raise error
+
+        finally:
+            for task in tasks:
+                if not task.done():
+                    if task is first:
+                        # Cancelled, so the slow request is only known to take at least this long
+                        self.record(asyncio.get_running_loop().time() - first_started)
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "percentile": self.percentile,
+            "delay_ms": None if self._delay is None else round(self._delay * 1000, 3),
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedges_won": self.hedges_won,
+            "over_budget": self.over_budget
+        }
+
+@lru_cache()
+def get_hedging_policy() -> HedgingPolicy:
+    """Process-wide hedging policy, so latencies are tracked across requests."""
+    settings = get_settings()
+    return HedgingPolicy(
+        percentile=settings.DYNAMODB_HEDGE_PERCENTILE,
+        budget=settings.DYNAMODB_HEDGE_BUDGET
+    )
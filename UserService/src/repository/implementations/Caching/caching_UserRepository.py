@@ -0,0 +1,149 @@
+from functools import lru_cache
+from src.repository.interfaces import interface_UserRepository
+from src.schemas import UserSchemas
+from src.db.settings import get_settings
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Cached users hold only these fields, so the password hash is never kept in the cache
+CACHED_FIELDS = UserSchemas.USER_RESPONSE_FIELDS
+
+@lru_cache()
+def get_user_cache() -> TTLCache:
+    """Process-wide user cache shared by every request's repository."""
+    settings = get_settings()
+    return TTLCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.CACHE_TTL_SECONDS
+    )
+
+class CachingUserRepository(interface_UserRepository.UserRepository):
+    """
+    Read-through cache in front of any UserRepository implementation.
+
+    get_user is served from the in-process cache when possible. Only reads
+    projected to CACHED_FIELDS are cached; other reads go to the repository. Writes made
+    through this repository invalidate the local entry (or update it, with
+    write_through). Other pods learn about changes from the user outbox events
+    (see src/consumer/kafka.py); changes that emit no event are picked up when
+    the entry's TTL runs out.
+    """
+
+    def __init__(
+            self,
+            repository: interface_UserRepository.UserRepository,
+            cache: TTLCache,
+            write_through: bool = False
+        ):
+        self.repository = repository
+        self.cache = cache
+        self.write_through = write_through
+
+    async def get_user(
+            self,
+            email: str,
+            fields: Optional[Sequence[str]] = None
+        ) -> UserSchemas.User:
+
+        if fields is None or not set(fields) <= set(CACHED_FIELDS):
+            return await self.repository.get_user(email, fields=fields)
+
+        user = self.cache.get(email)
+        if user is not None:
+            return user
+
+        token = self.cache.token()
+        user = await self.repository.get_user(email, fields=CACHED_FIELDS)
+        self.cache.set(email, user, token)
+        return user
+
+    async def get_users(
+            self,
+            emails: List[str],
+            fields: Optional[Sequence[str]] = None
+        ) -> List[UserSchemas.User]:
+
+        if fields is None or not set(fields) <= set(CACHED_FIELDS):
+            return await self.repository.get_users(emails, fields=fields)
+
+        unique_emails = list(dict.fromkeys(emails))
+        users = {}
+        for email in unique_emails:
+            user = self.cache.get(email)
+            if user is not None:
+                users[email] = user
+
+        # Everything not cached is fetched in one batch
+        missing = [email for email in unique_emails if email not in users]
+        if missing:
+            token = self.cache.token()
+            for user in await self.repository.get_users(missing, fields=CACHED_FIELDS):
+                self.cache.set(user.email, user, token)
+                users[user.email] = user
+
+        return [users[email] for email in unique_emails if email in users]
+
+    async def stream_users(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[UserSchemas.User]:
+
+        # Exports go straight to the repository and do not fill the cache
+        async for user in self.repository.stream_users(batch_size=batch_size):
+            yield user
+
+    async def create_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: UserSchemas.Outbox
+        ) -> None:
+
+        try:
+            return await self.repository.create_user(
+                User_instance=User_instance,
+                Outbox_instance=Outbox_instance
+            )
+        finally:
+            self.cache.invalidate(User_instance.email)
+
+    async def update_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: Optional[UserSchemas.Outbox] = None,
+            expected: Optional[Dict[str, Any]] = None
+        ) -> UserSchemas.User:
+
+        self.cache.invalidate(User_instance.email)
+        token = self.cache.token()
+
+        user = await self.repository.update_user(User_instance, Outbox_instance=Outbox_instance, expected=expected)
+
+        if self.write_through:
+            # The repository returns the row as it is after the update
+            self.cache.set(User_instance.email, UserSchemas.User(**user.model_dump(include=set(CACHED_FIELDS))), token)
+
+        return user
+
+    async def deactivate_users(
+            self,
+            emails: Optional[List[str]],
+            email_domain: Optional[str],
+            eventtype_prefix: str
+        ) -> Dict[str, UserSchemas.BulkDeactivateStatus]:
+
+        for email in emails or []:
+            self.cache.invalidate(email)
+
+        statuses = await self.repository.deactivate_users(
+            emails=emails,
+            email_domain=email_domain,
+            eventtype_prefix=eventtype_prefix
+        )
+
+        # Users matched by email_domain are only known now
+        for email in statuses:
+            self.cache.invalidate(email)
+        return statuses
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from src.repository.interfaces import interface_UserRepository
+from src.schemas import UserSchemas
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from .single_flight import SingleFlight
+
+@lru_cache()
+def get_user_flights() -> SingleFlight:
+    """Process-wide in-flight get_user calls, so concurrent requests share them."""
+    return SingleFlight()
+
+class CoalescingUserRepository(interface_UserRepository.UserRepository):
+    """
+    Collapses concurrent get_user calls for the same email (and projection)
+    into one backend call whose result every caller shares.
+
+    The call runs on the database context of the request that started it;
+    the others only wait for it. Writes made through this repository make
+    later reads start a new call, so a read never returns data from before
+    a write on this pod that completed before the read began.
+    """
+
+    def __init__(
+            self,
+            repository: interface_UserRepository.UserRepository,
+            flights: SingleFlight
+        ):
+        self.repository = repository
+        self.flights = flights
+
+    async def get_user(
+            self,
+            email: str,
+            fields: Optional[Sequence[str]] = None
+        ) -> UserSchemas.User:
+
+        return await self.flights.do(
+            email,
+            lambda: self.repository.get_user(email, fields=fields),
+            variant=None if fields is None else frozenset(fields)
+        )
+
+    async def get_users(
+            self,
+            emails: List[str],
+            fields: Optional[Sequence[str]] = None
+        ) -> List[UserSchemas.User]:
+
+        return await self.repository.get_users(emails, fields=fields)
+
+    async def stream_users(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[UserSchemas.User]:
+
+        async for user in self.repository.stream_users(batch_size=batch_size):
+            yield user
+
+    async def create_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: UserSchemas.Outbox
+        ) -> None:
+
+        try:
+            return await self.repository.create_user(
+                User_instance=User_instance,
+                Outbox_instance=Outbox_instance
+            )
+        finally:
+            self.flights.forget(User_instance.email)
+
+    async def update_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: Optional[UserSchemas.Outbox] = None,
+            expected: Optional[Dict[str, Any]] = None
+        ) -> UserSchemas.User:
+
+        try:
+            return await self.repository.update_user(User_instance, Outbox_instance=Outbox_instance, expected=expected)
+        finally:
+            self.flights.forget(User_instance.email)
+
+    async def deactivate_users(
+            self,
+            emails: Optional[List[str]],
+            email_domain: Optional[str],
+            eventtype_prefix: str
+        ) -> Dict[str, UserSchemas.BulkDeactivateStatus]:
+
+        try:
+            statuses = await self.repository.deactivate_users(
+                emails=emails,
+                email_domain=email_domain,
+                eventtype_prefix=eventtype_prefix
+            )
+        finally:
+            for email in emails or []:
+                self.flights.forget(email)
+
+        # Users matched by email_domain are only known now
+        for email in statuses:
+            self.flights.forget(email)
+        return statuses
@@ -0,0 +1,143 @@
+from src.repository.interfaces import interface_UserRepository
+from src.schemas import UserSchemas
+from src.exceptions import ConflictException, ResourceNotFoundException, ResourceAlreadyExistsException
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from .store import MemoryStore
+
+logger = logging.getLogger(__name__)
+
+class UserRepository(interface_UserRepository.UserRepository):
+    """
+    In-memory UserRepository with the same semantics as the PostgreSQL one:
+    emails are unique, missing users raise ResourceNotFoundException and
+    reads return only the projected fields.
+    """
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+        self.table = store.table("users")
+
+    @staticmethod
+    def _project(
+            db_user: Dict[str, Any],
+            fields: Optional[Sequence[str]]
+        ) -> UserSchemas.User:
+        # Stored users were validated when they were written
+        if fields is None:
+            return UserSchemas.User.model_construct(**db_user)
+        return UserSchemas.User.model_construct(email=db_user["email"], **{field: db_user[field] for field in fields if field != "email"})
+
+    async def get_user(
+            self,
+            email: str,
+            fields: Optional[Sequence[str]] = None
+        ) -> UserSchemas.User:
+
+        db_user = self.table.get(email)
+        if db_user is None:
+            logger.warning(f"User with email {email} not found")
+            raise ResourceNotFoundException(f"User with email {email} not found")
+
+        return self._project(db_user, fields)
+
+    async def get_users(
+            self,
+            emails: List[str],
+            fields: Optional[Sequence[str]] = None
+        ) -> List[UserSchemas.User]:
+
+        return [
+            self._project(self.table[email], fields)
+            for email in dict.fromkeys(emails) if email in self.table
+        ]
+
+    async def stream_users(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[UserSchemas.User]:
+
+        # Snapshot, so writes during the export do not break the iteration
+        for db_user in list(self.table.values()):
+            yield UserSchemas.User(
+                email=db_user["email"],
+                is_active=db_user["is_active"]
+            )
+
+    async def create_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: UserSchemas.Outbox
+        ) -> None:
+
+        if User_instance.email in self.table:
+            logger.warning(f"User with email {User_instance.email} already exists")
+            await self.store.publish(Outbox_instance, "failed", {"exception": "ResourceAlreadyExistsException"})
+            raise ResourceAlreadyExistsException(f"User with email {User_instance.email} already exists")
+
+        self.table[User_instance.email] = {
+            "email": User_instance.email,
+            "hashed_password": User_instance.hashed_password,
+            "is_active": True if User_instance.is_active else False
+        }
+        await self.store.publish(Outbox_instance, "success")
+
+    async def update_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: Optional[UserSchemas.Outbox] = None,
+            expected: Optional[Dict[str, Any]] = None
+        ) -> UserSchemas.User:
+
+        db_user = self.table.get(User_instance.email)
+        if db_user is None:
+            logger.warning(f"User with email {User_instance.email} not found")
+            if Outbox_instance is not None:
+                await self.store.publish(Outbox_instance, "failed", {"exception": "ResourceNotFoundException"})
+            raise ResourceNotFoundException(f"User with email {User_instance.email} not found")
+        if expected and any(db_user.get(field) != value for field, value in expected.items()):
+            if Outbox_instance is not None:
+                await self.store.publish(Outbox_instance, "failed", {"exception": "ConflictException"})
+            raise ConflictException(f"User with email {User_instance.email} has changed")
+
+        db_user.update(User_instance.model_dump(exclude_unset=True))
+        if Outbox_instance is not None:
+            await self.store.publish(Outbox_instance, "success")
+
+        return UserSchemas.User(
+            email=db_user["email"],
+            is_active=db_user["is_active"]
+        )
+
+    async def deactivate_users(
+            self,
+            emails: Optional[List[str]],
+            email_domain: Optional[str],
+            eventtype_prefix: str
+        ) -> Dict[str, UserSchemas.BulkDeactivateStatus]:
+
+        if emails is None:
+            emails = [email for email in self.table if email.endswith(f"@{email_domain}")]
+
+        changed_at = time.time()
+        statuses = {}
+        for email in dict.fromkeys(emails):
+            db_user = self.table.get(email)
+            if db_user is None:
+                statuses[email] = "not_found"
+                continue
+
+            db_user["is_active"] = False
+            statuses[email] = "deactivated"
+            await self.store.publish(
+                UserSchemas.Outbox(
+                    aggregatetype="user",
+                    aggregateid=email,
+                    eventtype_prefix=eventtype_prefix,
+                    payload={"email": email, "is_active": False, "changed_at": changed_at}
+                ),
+                "success"
+            )
+
+        return statuses
@@ -0,0 +1,66 @@
+from collections import deque
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Called with (eventtype, payload) for every outbox event
+OutboxSubscriber = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+class MemoryStore:
+    """
+    Dict-backed tables and outbox for DATABASE_TYPE=memory.
+
+    Meant for benchmarks and load tests: it gives the repositories the same
+    behaviour as the real backends without any I/O, so what is measured is
+    FastAPI, pydantic and the service layer.
+
+    Outbox events are kept in a bounded buffer and handed straight to the
+    in-process subscribers, standing in for Debezium and Kafka.
+    """
+
+    def __init__(self, outbox_max_events: int = 10000):
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.outbox: Deque[Dict[str, Any]] = deque(maxlen=outbox_max_events)
+        self._subscribers: List[OutboxSubscriber] = []
+
+    def table(self, table_name: str) -> Dict[str, Dict[str, Any]]:
+        return self.tables.setdefault(table_name, {})
+
+    def subscribe(self, subscriber: OutboxSubscriber) -> None:
+        if subscriber not in self._subscribers:
+            self._subscribers.append(subscriber)
+
+    async def publish(
+            self,
+            Outbox_instance: Any,
+            outcome: str,
+            payload_add: Optional[Dict[str, Any]] = None
+        ) -> None:
+        """
+        Record an outbox event named {eventtype_prefix}_{outcome} and deliver it.
+        Subscriber errors are logged, like handler errors in the Kafka consumer.
+        """
+        event = {
+            "aggregatetype": Outbox_instance.aggregatetype,
+            "aggregateid": Outbox_instance.aggregateid,
+            "eventtype": f"{Outbox_instance.eventtype_prefix}_{outcome}",
+            "payload": {**Outbox_instance.payload, **(payload_add or {})}
+        }
+        self.outbox.append(event)
+
+        for subscriber in self._subscribers:
+            try:
+                await subscriber(event["eventtype"], event["payload"])
+            except Exception as e:
+                logger.error(f"Error delivering outbox event {event['eventtype']}: {e}", exc_info=True)
+
+    def clear(self) -> None:
+        self.tables.clear()
+        self.outbox.clear()
+
+@lru_cache()
+def get_memory_store() -> MemoryStore:
+    """Process-wide store shared by every request and background task."""
+    return MemoryStore()
@@ -22,4 +22,6 @@ class UsersOutboxORM(Base):
     aggregateid = Column(String, nullable=False)       # e.g., user_id
     eventtype = Column(String, nullable=False)              # e.g., "user_created_success"
     payload = Column(JSON, nullable=False)             # Event data as JSON
-    created_at = Column(BigInteger, nullable=False, default=lambda: int(datetime.now(timezone.utc).timestamp() * 1000))
+    # Partition key: the table is partitioned by day on created_at (PostgresDB/init_tables*.sql),
+    # so it is part of the primary key
+    created_at = Column(BigInteger, primary_key=True, nullable=False, default=lambda: int(datetime.now(timezone.utc).timestamp() * 1000))
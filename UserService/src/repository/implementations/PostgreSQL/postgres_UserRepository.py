@@ -1,12 +1,15 @@
 from src.repository.interfaces import interface_UserRepository
 from src.schemas import UserSchemas
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, insert, any_, bindparam, literal, func, false, Float, String, Update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from src.repository.implementations.PostgreSQL.models.ORM_User import UserORM, UsersOutboxORM
-from src.exceptions import ResourceNotFoundException, BaseAppException, ResourceAlreadyExistsException, ValidationException
+from src.repository.implementations.PostgreSQL.utils import outbox_event_from_cte, failed_outbox_event, projected_columns
+from src.exceptions import ResourceNotFoundException, BaseAppException, ResourceAlreadyExistsException, ValidationException, ConflictException
 import logging
+import time
 from sqlalchemy.exc import IntegrityError
-from typing import Dict, Any
+from typing import Dict, Any, List, AsyncIterator, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -17,18 +20,18 @@ class UserRepository(interface_UserRepository.UserRepository):
 
     async def get_user(
             self,
-            email: str
+            email: str,
+            fields: Optional[Sequence[str]] = None
         ) -> UserSchemas.User:
 
         try:
-            stmt = select(UserORM).where(UserORM.email == email)
+            # Only the projected columns are selected, not the whole row
+            stmt = select(*projected_columns(UserORM, UserSchemas.User, fields, ["email"])).where(UserORM.email == email)
             result = await self.db.execute(stmt)
-            db_user = result.scalar_one_or_none()
-            if db_user:    
-                return UserSchemas.User(
-                    email=db_user.email,
-                    is_active=db_user.is_active
-                )
+            db_user = result.mappings().one_or_none()
+            if db_user:
+                # Rows have the column types of the model already, so they are not validated again
+                return UserSchemas.User.model_construct(**db_user)
             else:
                 logger.warning(f"User with email {email} not found")
                 raise ResourceNotFoundException(f"User with email {email} not found")
@@ -40,6 +43,51 @@ class UserRepository(interface_UserRepository.UserRepository):
             logger.exception(f"Error getting user: {str(e)}")
             raise BaseAppException(f"Internal database error: {str(e)}") from e
 
+    async def get_users(
+            self,
+            emails: List[str],
+            fields: Optional[Sequence[str]] = None
+        ) -> List[UserSchemas.User]:
+
+        try:
+            # One array parameter instead of IN (...), so the statement is the same for every batch size
+            stmt = select(*projected_columns(UserORM, UserSchemas.User, fields, ["email"])).where(
+                UserORM.email == any_(bindparam("emails", type_=ARRAY(String)))
+            )
+            result = await self.db.execute(stmt, {"emails": list(emails)})
+            db_users = {db_user["email"]: db_user for db_user in result.mappings()}
+
+            return [
+                UserSchemas.User.model_construct(**db_users[email])
+                for email in dict.fromkeys(emails) if email in db_users
+            ]
+
+        except Exception as e:
+            logger.exception(f"Error getting users: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+    async def stream_users(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[UserSchemas.User]:
+        """
+        Yield every user from a server-side cursor, batch_size rows per fetch.
+        Only the exported columns are selected, so no ORM objects are kept.
+        The cursor needs a transaction, so the caller must not be read-only.
+        """
+        try:
+            stmt = select(UserORM.email, UserORM.is_active).execution_options(yield_per=batch_size)
+            result = await self.db.stream(stmt)
+            async for db_user in result:
+                yield UserSchemas.User(
+                    email=db_user.email,
+                    is_active=db_user.is_active
+                )
+
+        except Exception as e:
+            logger.exception(f"Error streaming users: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
     async def create_user(
             self,
             User_instance: UserSchemas.User,
@@ -47,106 +95,209 @@ class UserRepository(interface_UserRepository.UserRepository):
         ) -> None:
 
         try:
-            db_user = UserORM(
+            # INSERT ... ON CONFLICT DO NOTHING RETURNING and the outbox event in one statement
+            inserted = pg_insert(UserORM).values(
                 email=User_instance.email,
                 hashed_password=User_instance.hashed_password,
                 is_active=True if User_instance.is_active else False
-            )
+            ).on_conflict_do_nothing(index_elements=[UserORM.email]).returning(UserORM.email).cte("inserted")
 
-            outbox_event = UsersOutboxORM(
-                aggregatetype = Outbox_instance.aggregatetype,
-                aggregateid = Outbox_instance.aggregateid,
-                eventtype = f"{Outbox_instance.eventtype_prefix}_success",
-                payload = Outbox_instance.payload
-            )
+            async with self.db.begin():
+                result = await self.db.execute(
+                    outbox_event_from_cte(
+                        UsersOutboxORM,
+                        inserted,
+                        Outbox_instance,
+                        exception="ResourceAlreadyExistsException"
+                    )
+                )
+                eventtype = result.scalar_one()
 
-            # Start transaction
-            async with self.db.begin():  # This ensures atomicity
-                self.db.add(db_user)
-                self.db.add(outbox_event)
-        
         except IntegrityError as e:
-            if "UniqueViolationError" in str(e.orig):
-                logger.warning(f"User with email {User_instance.email} already exists")
-
-                fail_event = UsersOutboxORM(
-                    aggregatetype = Outbox_instance.aggregatetype,
-                    aggregateid = Outbox_instance.aggregateid,
-                    eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                    payload = Outbox_instance.payload.update({
-                        "exception": "ResourceAlreadyExistsException"
-                    })
-                )
+            # Some other kind of IntegrityError (e.g., null value, foreign key constraint, etc)
+            logger.exception(f"Error creating user: {str(e)}")
+            await self._add_failed_event(Outbox_instance, "BaseAppException")
+            raise BaseAppException(f"Database integrity error: {str(e)}") from e
+
+        except Exception as e:
+            logger.exception(f"Error creating user: {str(e)}")
+            await self._add_failed_event(Outbox_instance, "BaseAppException")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
 
-                async with self.db.begin():
-                    self.db.add(fail_event)
+        if eventtype.endswith("_failed"):
+            logger.warning(f"User with email {User_instance.email} already exists")
+            raise ResourceAlreadyExistsException(f"User with email {User_instance.email} already exists")
 
-                raise ResourceAlreadyExistsException(f"User with email {User_instance.email} already exists")
-            else:
-                # Some other kind of IntegrityError (e.g., null value, foreign key constraint, etc)
-                logger.exception(f"Error creating user: {str(e)}")
-
-                fail_event = UsersOutboxORM(
-                    aggregatetype = Outbox_instance.aggregatetype,
-                    aggregateid = Outbox_instance.aggregateid,
-                    eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                    payload = Outbox_instance.payload.update({
-                        "exception": "BaseAppException"
-                    })
-                )
+    async def update_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: Optional[UserSchemas.Outbox] = None,
+            expected: Optional[Dict[str, Any]] = None
+        ) -> UserSchemas.User:
 
-                async with self.db.begin():
-                    self.db.add(fail_event)
+        if Outbox_instance is not None:
+            return await self._update_user_with_event(User_instance, Outbox_instance, expected)
 
-                raise BaseAppException(f"Database integrity error: {str(e)}") from e
-            
-        except ResourceAlreadyExistsException:
-            raise
+        try:
+            # UPDATE ... RETURNING: no SELECT before the update and no refresh after it
+            stmt = (
+                self._update_statement(User_instance, expected)
+                    .returning(UserORM.email, UserORM.is_active)
+            )
+            result = await self.db.execute(stmt)
+            db_user = result.one_or_none()
+
+            if db_user is None:
+                self._raise_not_updated(User_instance, expected)
+
+            await self.db.commit()
+
+            return UserSchemas.User(
+                email=db_user.email,
+                is_active=db_user.is_active
+            )
 
+        except (ResourceNotFoundException, ConflictException):
+            raise
+        
         except Exception as e:
-            logger.exception(f"Error creating user: {str(e)}")
+            logger.exception(f"Error updating user: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+    def _update_statement(
+            self,
+            User_instance: UserSchemas.User,
+            expected: Optional[Dict[str, Any]]
+        ) -> Update:
+        """UPDATE of the fields set on User_instance, only WHERE the expected fields still match."""
+        return (
+            update(UserORM)
+                .where(UserORM.email == User_instance.email)
+                .where(*(getattr(UserORM, field) == value for field, value in (expected or {}).items()))
+                .values(**User_instance.model_dump(exclude_unset=True))
+        )
+
+    @staticmethod
+    def _raise_not_updated(
+            User_instance: UserSchemas.User,
+            expected: Optional[Dict[str, Any]]
+        ) -> None:
+        # Without a row the two cases look the same; with expected fields a change is the likely one
+        if expected:
+            logger.info(f"User with email {User_instance.email} has changed or does not exist, not updated")
+            raise ConflictException(f"User with email {User_instance.email} has changed")
+        logger.warning(f"User with email {User_instance.email} not found")
+        raise ResourceNotFoundException(f"User with email {User_instance.email} not found")
 
-            fail_event = UsersOutboxORM(
-                aggregatetype = Outbox_instance.aggregatetype,
-                aggregateid = Outbox_instance.aggregateid,
-                eventtype = f"{Outbox_instance.eventtype_prefix}_failed",
-                payload = Outbox_instance.payload.update({
-                    "exception": "BaseAppException"
-                })
+    async def _update_user_with_event(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: UserSchemas.Outbox,
+            expected: Optional[Dict[str, Any]]
+        ) -> UserSchemas.User:
+        """
+        The UPDATE ... RETURNING and its outbox event in one statement, like create_user:
+        a missing user writes the _failed event instead.
+        """
+        fields = User_instance.model_dump(exclude_unset=True)
+        try:
+            updated = (
+                self._update_statement(User_instance, expected)
+                    .returning(UserORM.email)
+                    .cte("updated")
             )
 
             async with self.db.begin():
-                self.db.add(fail_event)
+                result = await self.db.execute(
+                    outbox_event_from_cte(
+                        UsersOutboxORM,
+                        updated,
+                        Outbox_instance,
+                        exception="ResourceNotFoundException"
+                    )
+                )
+                eventtype = result.scalar_one()
 
+        except Exception as e:
+            logger.exception(f"Error updating user: {str(e)}")
+            await self._add_failed_event(Outbox_instance, "BaseAppException")
             raise BaseAppException(f"Internal database error: {str(e)}") from e
 
-    async def update_user(
+        if eventtype.endswith("_failed"):
+            self._raise_not_updated(User_instance, expected)
+
+        # The statement returns the event, not the row
+        if "is_active" not in fields:
+            return await self.get_user(User_instance.email, fields=["is_active"])
+        return UserSchemas.User(
+            email=User_instance.email,
+            is_active=fields["is_active"]
+        )
+
+    async def deactivate_users(
             self,
-            User_instance: UserSchemas.User
-        ) -> None:
+            emails: Optional[List[str]],
+            email_domain: Optional[str],
+            eventtype_prefix: str
+        ) -> Dict[str, UserSchemas.BulkDeactivateStatus]:
+        """
+        Deactivate many users with one set-based statement:
 
-        try:
-            stmt = select(UserORM).where(UserORM.email == User_instance.email)
-            result = await self.db.execute(stmt)
-            db_user = result.scalar_one_or_none()
+            WITH deactivated AS (UPDATE users SET is_active = false WHERE ... RETURNING email)
+            INSERT INTO users_outbox (...) SELECT ... FROM deactivated RETURNING aggregateid
 
-            if db_user:
-                update_fields = User_instance.model_dump(exclude_unset=True)
-
-                for field, value in update_fields.items():
-                    setattr(db_user, field, value)  # dynamically update each field
-                
-                await self.db.commit()
-                await self.db.refresh(db_user)
-                
-            
+        Every deactivated user gets its own outbox event in the same statement.
+
+        Returns:
+            The status of each email: deactivated, or not_found for requested emails without a user
+        """
+        try:
+            changed_at = time.time()
+            deactivated = update(UserORM).values(is_active=False)
+            if emails is not None:
+                deactivated = deactivated.where(
+                    UserORM.email == any_(bindparam("emails", value=list(dict.fromkeys(emails)), type_=ARRAY(String)))
+                )
             else:
-                logger.warning(f"User with email {User_instance.email} not found")
-                raise ResourceNotFoundException(f"User with email {User_instance.email} not found")
-            
-        except ResourceNotFoundException:
-            raise
-        
+                deactivated = deactivated.where(UserORM.email.endswith(f"@{email_domain}", autoescape=True))
+            deactivated = deactivated.returning(UserORM.email).cte("deactivated")
+
+            stmt = insert(UsersOutboxORM).from_select(
+                # A Python-side default would give every row the same id
+                ["id", "aggregatetype", "aggregateid", "eventtype", "payload"],
+                select(
+                    func.gen_random_uuid(),
+                    literal("user", String),
+                    deactivated.c.email,
+                    literal(f"{eventtype_prefix}_success", String),
+                    func.json_build_object(
+                        "email", deactivated.c.email,
+                        "is_active", false(),
+                        "changed_at", literal(changed_at, Float)
+                    )
+                )
+            ).add_cte(deactivated).returning(UsersOutboxORM.aggregateid)
+
+            async with self.db.begin():
+                result = await self.db.execute(stmt)
+                statuses = {email: "deactivated" for email in result.scalars()}
+
+            for email in emails or []:
+                statuses.setdefault(email, "not_found")
+            return statuses
+
         except Exception as e:
-            logger.exception(f"Error updating user: {str(e)}")
-            raise BaseAppException(f"Internal database error: {str(e)}") from e
\ No newline at end of file
+            logger.exception(f"Error deactivating users: {str(e)}")
+            raise BaseAppException(f"Internal database error: {str(e)}") from e
+
+    async def _add_failed_event(
+            self,
+            Outbox_instance: UserSchemas.Outbox,
+            exception: str
+        ) -> None:
+
+        try:
+            async with self.db.begin():
+                await self.db.execute(failed_outbox_event(UsersOutboxORM, Outbox_instance, exception))
+        except Exception as outbox_error:
+            logger.exception(f"Error creating outbox event: {str(outbox_error)}")
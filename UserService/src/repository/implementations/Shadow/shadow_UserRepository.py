@@ -0,0 +1,154 @@
+import logging
+import random
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Coroutine, Dict, List, Optional, Sequence
+from src.db.factory import create_backend_repository
+from src.db.settings import get_settings
+from src.exceptions import ResourceNotFoundException
+from src.repository.interfaces import interface_UserRepository
+from src.schemas import UserSchemas
+from .backend import ShadowBackend, shadow_database_type
+from .stats import ShadowStats
+
+logger = logging.getLogger(__name__)
+
+@lru_cache()
+def get_shadow_backend() -> ShadowBackend:
+    """Process-wide shadow backend, started in the lifespan."""
+    settings = get_settings()
+    return ShadowBackend(
+        database_type=shadow_database_type(settings),
+        max_in_flight=settings.SHADOW_MAX_IN_FLIGHT
+    )
+
+@lru_cache()
+def get_shadow_stats() -> ShadowStats:
+    """Process-wide statistics of the mirrored reads."""
+    return ShadowStats(window=get_settings().SHADOW_LATENCY_WINDOW)
+
+class ShadowUserRepository(interface_UserRepository.UserRepository):
+    """
+    Serves everything from the primary repository and mirrors a sample of
+    get_user calls to the shadow backend.
+
+    The response is returned as soon as the primary has answered; the mirrored
+    read runs in the background and records both latencies and whether the two
+    backends returned the same user. Writes are never mirrored, so the shadow
+    backend has to be kept in sync separately (e.g. with src.tools.migrate);
+    mismatches then measure how far it has drifted.
+    """
+
+    def __init__(
+            self,
+            repository: interface_UserRepository.UserRepository,
+            backend: ShadowBackend,
+            stats: ShadowStats,
+            sample_rate: float
+        ):
+        self.repository = repository
+        self.backend = backend
+        self.stats = stats
+        self.sample_rate = sample_rate
+
+    def _submit(self, operation: str, mirror: Coroutine[Any, Any, None]) -> None:
+        if not self.backend.submit(mirror):
+            self.stats.record_dropped(operation)
+
+    async def _mirror_get_user(
+            self,
+            email: str,
+            fields: Optional[Sequence[str]],
+            primary_user: Optional[UserSchemas.User],
+            primary_seconds: float
+        ) -> None:
+
+        started = time.perf_counter()
+        try:
+            async with self.backend.open_context() as db_context:
+                repository = create_backend_repository(self.backend.database_type, db_context)
+                try:
+                    shadow_user = await repository.get_user(email, fields=fields)
+                except ResourceNotFoundException:
+                    shadow_user = None
+        except Exception as e:
+            self.stats.record_error("get_user")
+            logger.warning(f"Shadow get_user failed: {e!r}")
+            return
+        shadow_seconds = time.perf_counter() - started
+
+        matched = (
+            (primary_user is None and shadow_user is None) or
+            (primary_user is not None and shadow_user is not None and primary_user.model_dump() == shadow_user.model_dump())
+        )
+        if not matched:
+            logger.warning(f"Shadow get_user mismatch on {self.backend.database_type.value}")
+        self.stats.record("get_user", primary_seconds, shadow_seconds, matched)
+
+    async def get_user(
+            self,
+            email: str,
+            fields: Optional[Sequence[str]] = None
+        ) -> UserSchemas.User:
+
+        if not self.backend.started or random.random() >= self.sample_rate:
+            return await self.repository.get_user(email, fields=fields)
+
+        started = time.perf_counter()
+        try:
+            user = await self.repository.get_user(email, fields=fields)
+        except ResourceNotFoundException:
+            # Not found is a result too, the shadow should agree
+            self._submit("get_user", self._mirror_get_user(email, fields, None, time.perf_counter() - started))
+            raise
+        self._submit("get_user", self._mirror_get_user(email, fields, user, time.perf_counter() - started))
+        return user
+
+    async def get_users(
+            self,
+            emails: List[str],
+            fields: Optional[Sequence[str]] = None
+        ) -> List[UserSchemas.User]:
+
+        return await self.repository.get_users(emails, fields=fields)
+
+    async def stream_users(
+            self,
+            batch_size: int = 1000
+        ) -> AsyncIterator[UserSchemas.User]:
+
+        async for user in self.repository.stream_users(batch_size=batch_size):
+            yield user
+
+    async def create_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: UserSchemas.Outbox
+        ) -> None:
+
+        return await self.repository.create_user(
+            User_instance=User_instance,
+            Outbox_instance=Outbox_instance
+        )
+
+    async def update_user(
+            self,
+            User_instance: UserSchemas.User,
+            Outbox_instance: Optional[UserSchemas.Outbox] = None,
+            expected: Optional[Dict[str, Any]] = None
+        ) -> UserSchemas.User:
+
+        return await self.repository.update_user(User_instance, Outbox_instance=Outbox_instance, expected=expected)
+
+    async def deactivate_users(
+            self,
+            emails: Optional[List[str]],
+            email_domain: Optional[str],
+            eventtype_prefix: str
+        ) -> Dict[str, UserSchemas.BulkDeactivateStatus]:
+
+        return await self.repository.deactivate_users(
+            emails=emails,
+            email_domain=email_domain,
+            eventtype_prefix=eventtype_prefix
+        )
@@ -1,13 +1,39 @@
 from abc import ABC, abstractmethod
 from ...schemas import UserSchemas
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 
 class UserRepository(ABC):
 
     @abstractmethod
     async def get_user(
         self,
-        email: str
+        email: str,
+        fields: Optional[Sequence[str]] = None
     ) -> UserSchemas.User:
+        """
+        Returns the user. With fields, only those fields (and email) are read;
+        the other fields of the returned User are None.
+        """
+        pass
+
+    @abstractmethod
+    async def get_users(
+        self,
+        emails: List[str],
+        fields: Optional[Sequence[str]] = None
+    ) -> List[UserSchemas.User]:
+        """
+        Returns the users that exist, in the order of emails; missing emails are skipped.
+        fields projects the users as in get_user.
+        """
+        pass
+
+    @abstractmethod
+    def stream_users(
+        self,
+        batch_size: int = 1000
+    ) -> AsyncIterator[UserSchemas.User]:
+        """Yields every user, reading batch_size users at a time, without loading them all."""
         pass
 
     @abstractmethod
@@ -21,6 +47,29 @@ class UserRepository(ABC):
     @abstractmethod
     async def update_user(
         self,
-        User_instance: UserSchemas.User
-    ) -> None:
-        pass
\ No newline at end of file
+        User_instance: UserSchemas.User,
+        Outbox_instance: Optional[UserSchemas.Outbox] = None,
+        expected: Optional[Dict[str, Any]] = None
+    ) -> UserSchemas.User:
+        """
+        Updates the fields set on User_instance and returns the updated user.
+        With Outbox_instance, its {eventtype_prefix}_success event is written in
+        the same transaction as the update, so other pods learn about it.
+        With expected, the update only applies if the stored fields still have
+        these values; otherwise nothing is written and ConflictException is raised.
+        """
+        pass
+
+    @abstractmethod
+    async def deactivate_users(
+        self,
+        emails: Optional[List[str]],
+        email_domain: Optional[str],
+        eventtype_prefix: str
+    ) -> Dict[str, UserSchemas.BulkDeactivateStatus]:
+        """
+        Deactivates the users with the given emails, or every user whose email ends
+        with @email_domain, writing a {eventtype_prefix}_success event per user.
+        Returns the status of each email (requested or matched).
+        """
+        pass
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(
+    prefix="/health"
+)
+
+@router.get("/live", status_code=200)
+async def live():
+    return {"status": "live"}
+
+@router.get("/ready", status_code=200)
+async def ready(request: Request):
+    # Set by the lifespan once startup (including the optional warm-up) has finished
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "not ready"})
+    return {"status": "ready"}
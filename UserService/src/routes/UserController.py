@@ -1,32 +1,57 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
 from src.schemas import UserSchemas
-from src.dependencies import get_user_service
+from src.dependencies import get_user_service, get_optional_session_email, read_only_transaction
+from src.exceptions import UnauthorizedException
 from src.service.UserService import UserService
+from src.routes.utils import FastJSONResponse, ndjson_response
 
 router = APIRouter(
     prefix="/users"
 )
 
-@router.get("", status_code=200)
+# Hot reads return FastJSONResponse: serialized once, without jsonable_encoder
+@router.get("", status_code=200, response_class=FastJSONResponse, dependencies=[Depends(read_only_transaction)])
 async def get_user(
     email: str,
     user_service: UserService = Depends(get_user_service)):
-    return await user_service.get_user(email=email)
+    return FastJSONResponse(await user_service.get_user(email=email))
 
+@router.get("/batch", status_code=200, response_class=FastJSONResponse, dependencies=[Depends(read_only_transaction)])
+async def get_users(
+    email: List[str] = Query(..., min_length=1, max_length=100),
+    user_service: UserService = Depends(get_user_service)):
+    return FastJSONResponse(await user_service.get_users(emails=email))
+
+# Not read-only: the PostgreSQL server-side cursor needs a transaction
+@router.get("/export", status_code=200)
+async def export_users(
+    gzip: bool = False,
+    user_service: UserService = Depends(get_user_service)):
+    return ndjson_response(user_service.export_users(), gzip=gzip)
+
+@router.post("/login", status_code=200)
+async def login(
+    login: UserSchemas.Login,
+    user_service: UserService = Depends(get_user_service)):
+    return await user_service.login(login=login)
 
 @router.put("/reset-password", status_code=201)
 async def reset_password(
     email: str,
-    #sessionId: str,
     reset_password: UserSchemas.ResetPassword,
+    session_email: Optional[str] = Depends(get_optional_session_email),
     user_service: UserService = Depends(get_user_service)):
 
-    # Check if sessionId is valid (sessionId == email in Redis or DB)
-    # Will be implemented as Dependency Injection later
+    # Users may only reset their own password; without a session the service checks the current one
+    if session_email is not None and session_email != email:
+        raise UnauthorizedException("Session does not belong to this user")
 
     return await user_service.reset_password(
         email=email,
-        reset_password=reset_password
+        reset_password=reset_password,
+        eventtype_prefix="user_password_reset",
+        authenticated=session_email is not None
     )
 
 @router.put("/deactivate-user", status_code=201)
@@ -34,5 +59,15 @@ async def deactivate_user(
     email: str,
     user_service: UserService = Depends(get_user_service)):
     return await user_service.deactivate_user(
-        email=email
-    )
\ No newline at end of file
+        email=email,
+        eventtype_prefix="user_deactivated"
+    )
+
+@router.put("/deactivate-bulk", status_code=201)
+async def deactivate_users(
+    users_deactivate: UserSchemas.BulkDeactivateUsers,
+    user_service: UserService = Depends(get_user_service)):
+    return await user_service.deactivate_users(
+        BulkDeactivateUsers_instance=users_deactivate,
+        eventtype_prefix="user_deactivated"
+    )
@@ -1,10 +1,11 @@
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 from typing_extensions import Self
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 
 class ResetPassword(BaseModel):
     password: str
     password_repeat: str
+    current_password: Optional[str] = None # Instead of a session token, e.g. for a deactivated user
 
     @model_validator(mode='after')
     def check_passwords_match(self) -> Self:
@@ -12,6 +13,10 @@ class ResetPassword(BaseModel):
             raise ValueError('Passwords do not match')
         return self
 
+class Login(BaseModel):
+    email: str
+    password: str
+
 class User(BaseModel):
     email: str
     hashed_password: Optional[str] = None
@@ -21,6 +26,33 @@ class UserResponse(BaseModel):
     email: str
     is_active: Optional[bool] = None
 
+# The fields a UserResponse is built from; reads that serve responses fetch only these
+USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+
+class Session(UserResponse):
+    session_token: str
+    expires_at: float # Unix seconds
+
+# The fields a login is checked against
+LOGIN_FIELDS = ("email", "hashed_password", "is_active")
+
+class BulkDeactivateUsers(BaseModel):
+    emails: Optional[List[str]] = Field(None, min_length=1, max_length=50000)
+    email_domain: Optional[str] = None  # Every user whose email ends with @email_domain
+
+    @model_validator(mode='after')
+    def check_one_selector(self) -> Self:
+        if (self.emails is None) == (self.email_domain is None):
+            raise ValueError('Provide either emails or email_domain')
+        return self
+
+# Per-email outcome of a bulk deactivation
+BulkDeactivateStatus = Literal["deactivated", "not_found", "failed"]
+
+class BulkDeactivateUserResult(BaseModel):
+    email: str
+    status: BulkDeactivateStatus
+
 class Outbox(BaseModel):
     aggregatetype: str
     aggregateid: str
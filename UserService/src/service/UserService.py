@@ -1,9 +1,11 @@
 from src.repository.interfaces import interface_UserRepository
 from src.schemas import UserSchemas
-from .utils import saltAndHashedPW
-from src.exceptions import BaseAppException, ResourceNotFoundException, ResourceAlreadyExistsException, ValidationException
+from .utils import saltAndHashedPW, verifyPW
+from .sessions import get_session_tokens
+from src.exceptions import BaseAppException, ConflictException, ResourceNotFoundException, ResourceAlreadyExistsException, ValidationException, UnauthorizedException
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, AsyncIterator, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +16,9 @@ class UserService:
     
     async def get_user(self, email: str) -> UserSchemas.UserResponse:
         try:
-            user = await self.user_repository.get_user(email)
-            return UserSchemas.UserResponse(
+            user = await self.user_repository.get_user(email, fields=UserSchemas.USER_RESPONSE_FIELDS)
+            # The repository returns checked data: constructed, not validated again
+            return UserSchemas.UserResponse.model_construct(
                 email=user.email,
                 is_active=user.is_active
             )
@@ -25,6 +28,20 @@ class UserService:
             logger.exception(f"Error getting user: {str(e)}")
             raise BaseAppException(f"Error getting user: {str(e)}") from e
         
+    async def get_users(self, emails: List[str]) -> List[UserSchemas.UserResponse]:
+        try:
+            users = await self.user_repository.get_users(emails, fields=UserSchemas.USER_RESPONSE_FIELDS)
+            return [
+                UserSchemas.UserResponse.model_construct(
+                    email=user.email,
+                    is_active=user.is_active
+                )
+                for user in users
+            ]
+        except Exception as e:
+            logger.exception(f"Error getting users: {str(e)}")
+            raise BaseAppException(f"Error getting users: {str(e)}") from e
+
     async def create_user(
             self,
             User_instance: UserSchemas.User,
@@ -56,12 +73,100 @@ class UserService:
             logger.exception(f"Error creating user: {str(e)}")
             raise BaseAppException(f"Error creating user: {str(e)}") from e
     
+    async def export_users(self) -> AsyncIterator[UserSchemas.UserResponse]:
+        # Runs while the response streams, so errors can only be logged and end the stream
+        try:
+            async for user in self.user_repository.stream_users():
+                yield UserSchemas.UserResponse(
+                    email=user.email,
+                    is_active=user.is_active
+                )
+        except Exception as e:
+            logger.exception(f"Error exporting users: {str(e)}")
+            raise BaseAppException(f"Error exporting users: {str(e)}") from e
+
+    async def login(self, login: UserSchemas.Login) -> UserSchemas.Session:
+        try:
+            user = await self.user_repository.get_user(login.email, fields=UserSchemas.LOGIN_FIELDS)
+        except ResourceNotFoundException:
+            user = None  # Verified against a dummy hash, so unknown emails take as long as wrong passwords
+        except Exception as e:
+            logger.exception(f"Error getting user: {str(e)}")
+            raise BaseAppException(f"Error getting user: {str(e)}") from e
+
+        valid, new_hash = await verifyPW(login.password, user.hashed_password if user else None)
+        if not valid or not user.is_active:
+            raise UnauthorizedException("Invalid email or password")
+
+        if new_hash is not None:
+            # The stored hash uses an outdated scheme or cost; the password is only known now.
+            # Only if the hash is still the one verified, so a reset during the verification is not undone
+            try:
+                await self.user_repository.update_user(
+                    UserSchemas.User(
+                        email=user.email,
+                        hashed_password=new_hash
+                    ),
+                    expected={"hashed_password": user.hashed_password}
+                )
+            except ConflictException:
+                logger.info(f"Password of {user.email} changed during login, not rehashed")
+            except Exception as e:
+                logger.warning(f"Rehashing password of {user.email} failed, keeping the old hash: {str(e)}")
+
+        session_token, expires_at = get_session_tokens().issue(user.email)
+        return UserSchemas.Session(
+            email=user.email,
+            is_active=user.is_active,
+            session_token=session_token,
+            expires_at=expires_at
+        )
+
+    @staticmethod
+    def _session_revoking_event(email: str, is_active: bool, eventtype_prefix: str) -> UserSchemas.Outbox:
+        # changed_at lets the other pods revoke the tokens issued before the change, not before the event arrives
+        return UserSchemas.Outbox(
+            aggregatetype="user",
+            aggregateid=email,
+            eventtype_prefix=eventtype_prefix,
+            payload={"email": email, "is_active": is_active, "changed_at": time.time()}
+        )
+
+    async def _check_current_password(self, email: str, current_password: Optional[str]) -> Optional[str]:
+        """
+        Authorizes a password reset without a session token and returns the hash it was checked against.
+        Users created without a password (e.g. from a subscription event) set their first one here,
+        and users who cannot log in (e.g. deactivated ones) prove their current password instead.
+        """
+        try:
+            user = await self.user_repository.get_user(email, fields=UserSchemas.LOGIN_FIELDS)
+        except ResourceNotFoundException:
+            raise
+        except Exception as e:
+            logger.exception(f"Error getting user: {str(e)}")
+            raise BaseAppException(f"Error getting user: {str(e)}") from e
+
+        if user.hashed_password is None:
+            return None
+        if current_password is None:
+            raise UnauthorizedException("Missing session token")
+        valid, _ = await verifyPW(current_password, user.hashed_password)
+        if not valid:
+            raise UnauthorizedException("Invalid email or password")
+        return user.hashed_password
+
     async def reset_password(
             self,
             email: str,
-            reset_password: UserSchemas.ResetPassword
+            reset_password: UserSchemas.ResetPassword,
+            eventtype_prefix: str,
+            authenticated: bool = False
         ) -> UserSchemas.UserResponse:
 
+        expected = None
+        if not authenticated:
+            expected = {"hashed_password": await self._check_current_password(email, reset_password.current_password)}
+
         hashed_pw = await saltAndHashedPW(reset_password.password)
         try:
             await self.user_repository.update_user(
@@ -69,26 +174,32 @@ class UserService:
                     email=email,
                     hashed_password=hashed_pw,
                     is_active=True
-                )
+                ),
+                Outbox_instance=self._session_revoking_event(email, True, eventtype_prefix),
+                expected=expected
             )
+            # Sessions opened with the old password end here; on other pods once they get the event
+            get_session_tokens().revoke(email)
 
             return UserSchemas.UserResponse(
                 email=email
             )
-        except ResourceNotFoundException:
+        except (ResourceNotFoundException, ConflictException):
             raise
         except Exception as e:
             logger.exception(f"Error updating user: {str(e)}")
             raise BaseAppException(f"Error updating user: {str(e)}") from e
     
-    async def deactivate_user(self, email: str) -> UserSchemas.UserResponse:
+    async def deactivate_user(self, email: str, eventtype_prefix: str) -> UserSchemas.UserResponse:
         try:
             user = await self.user_repository.update_user(
                 UserSchemas.User(
                     email=email,
                     is_active=False
-                )
+                ),
+                Outbox_instance=self._session_revoking_event(email, False, eventtype_prefix)
             )
+            get_session_tokens().revoke(email)
             return UserSchemas.UserResponse(
                 email=user.email,
                 is_active=user.is_active
@@ -99,6 +210,29 @@ class UserService:
             logger.exception(f"Error deactivating user: {str(e)}")
             raise BaseAppException(f"Error deactivating user: {str(e)}") from e
     
+    async def deactivate_users(
+            self,
+            BulkDeactivateUsers_instance: UserSchemas.BulkDeactivateUsers,
+            eventtype_prefix: str
+        ) -> List[UserSchemas.BulkDeactivateUserResult]:
+        try:
+            statuses = await self.user_repository.deactivate_users(
+                emails=BulkDeactivateUsers_instance.emails,
+                email_domain=BulkDeactivateUsers_instance.email_domain,
+                eventtype_prefix=eventtype_prefix
+            )
+            session_tokens = get_session_tokens()
+            for email, status in statuses.items():
+                if status == "deactivated":
+                    session_tokens.revoke(email)
+            return [
+                UserSchemas.BulkDeactivateUserResult(email=email, status=status)
+                for email, status in statuses.items()
+            ]
+        except Exception as e:
+            logger.exception(f"Error deactivating users: {str(e)}")
+            raise BaseAppException(f"Error deactivating users: {str(e)}") from e
+    
     async def delete_user(self, email: str) -> None:
         try:
             await self.user_repository.delete_user(
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Deque, List, Optional, Tuple
+from src.db.settings import get_settings
+from src.exceptions import ServiceUnavailableException
+from .hashing_policy import calibrate_rounds, context_config, load_context
+
+logger = logging.getLogger(__name__)
+
+def available_cores() -> int:
+    '''
+    This function returns the number of cores this process may run on (its CPU affinity, not the machine's).
+    '''
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _percentile(sorted_samples: List[float], p: float) -> Optional[float]:
+    if not sorted_samples:
+        return None
+    return sorted_samples[max(0, math.ceil(p / 100 * len(sorted_samples)) - 1)]
+
+def _hash_in_worker(config: str, password: str) -> Tuple[str, float]:
+    '''
+    This function runs in a pool process: it hashes the password with the
+    policy's scheme and cost and returns the hash with the seconds it took.
+    '''
+    started = time.perf_counter()
+    hashed = load_context(config).hash(password)
+    return hashed, time.perf_counter() - started
+
+def _verify_in_worker(config: str, password: str, hashed: Optional[str]) -> Tuple[Tuple[bool, Optional[str]], float]:
+    '''
+    This function runs in a pool process: it verifies the password and, if the
+    hash is in an outdated scheme or cost, also returns a new hash to store.
+    Without a stored hash a dummy verification runs, so unknown users take as long as known ones.
+    '''
+    started = time.perf_counter()
+    context = load_context(config)
+    if hashed is None:
+        context.dummy_verify()
+        result = (False, None)
+    else:
+        result = context.verify_and_update(password, hashed)
+    return result, time.perf_counter() - started
+
+def _calibrate_in_worker(scheme: str, budget_seconds: float) -> Tuple[int, float]:
+    started = time.perf_counter()
+    rounds = calibrate_rounds(scheme, budget_seconds)
+    return rounds, time.perf_counter() - started
+
+class PasswordHasher:
+    """
+    Password hashing and verification in a pool of worker processes, so a
+    hash (hundreds of milliseconds of CPU) never blocks the event loop.
+
+    At most max_workers hashes run at once and max_queue more wait for a
+    worker; beyond that calls fail fast with ServiceUnavailableException
+    instead of queueing work the client will have given up on.
+
+    New hashes use scheme at rounds. Without rounds, start() benchmarks the
+    scheme in a worker and picks the highest cost that hashes within
+    latency_budget seconds on this hardware.
+
+    Queue wait (submit until a worker picks the hash up, plus the hand-over
+    between processes) and hash time are kept for the latest window hashes.
+    """
+
+    def __init__(
+            self,
+            max_workers: int,
+            max_queue: int,
+            scheme: str = "scrypt",
+            rounds: Optional[int] = None,
+            latency_budget: float = 0.25,
+            window: int = 1000
+        ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.scheme = scheme
+        self.rounds = rounds
+        self.latency_budget = latency_budget
+        self._config: Optional[str] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._queue_waits: Deque[float] = deque(maxlen=window)
+        self._hash_times: Deque[float] = deque(maxlen=window)
+
+        self.hashed = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        # Workers are spawned, not forked, so they do not inherit the event loop or open connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        if self.rounds is None:
+            self.rounds, seconds = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _calibrate_in_worker, self.scheme, self.latency_budget
+            )
+            logger.info(f"Calibrated {self.scheme} to {self.rounds} rounds for {self.latency_budget * 1000:.0f}ms per hash in {seconds:.1f}s")
+        self._config = context_config(self.scheme, self.rounds)
+
+    async def stop(self) -> None:
+        """Waits for running hashes, drops queued ones and stops the workers."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def _run(self, function: Callable[..., Tuple[Any, float]], *args: Any) -> Any:
+        if self._executor is None or self._config is None:
+            raise RuntimeError("Password hasher is not started")
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ServiceUnavailableException("Too many password hashes in progress, try again later")
+
+        self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            result, hash_seconds = await asyncio.get_running_loop().run_in_executor(self._executor, function, self._config, *args)
+        finally:
+            self._in_flight -= 1
+
+        self._hash_times.append(hash_seconds)
+        self._queue_waits.append(max(0.0, time.perf_counter() - submitted - hash_seconds))
+        return result
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(_hash_in_worker, password)
+        self.hashed += 1
+        return hashed
+
+    async def verify(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Returns whether password matches hashed, and a new hash to store when
+        hashed uses an outdated scheme or cost (None otherwise).
+        """
+        valid, new_hash = await self._run(_verify_in_worker, password, hashed)
+        self.verified += 1
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        latencies = {}
+        for name, samples in (("queue_wait_ms", self._queue_waits), ("hash_ms", self._hash_times)):
+            sorted_samples = sorted(samples)
+            latencies[name] = {
+                "samples": len(sorted_samples),
+                **{
+                    f"p{p}": None if value is None else round(value * 1000, 3)
+                    for p, value in ((p, _percentile(sorted_samples, p)) for p in (50, 99))
+                }
+            }
+        return {
+            "scheme": self.scheme,
+            "rounds": self.rounds,
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "hashed": self.hashed,
+            "verified": self.verified,
+            "rehashed": self.rehashed,
+            "rejected": self.rejected,
+            **latencies
+        }
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    """Process-wide password hasher, started and stopped in the lifespan."""
+    settings = get_settings()
+    return PasswordHasher(
+        max_workers=settings.HASH_WORKERS or available_cores(),
+        max_queue=settings.HASH_MAX_QUEUE,
+        scheme=settings.HASH_SCHEME,
+        rounds=settings.HASH_ROUNDS or None,
+        latency_budget=settings.HASH_LATENCY_BUDGET_MS / 1000
+    )
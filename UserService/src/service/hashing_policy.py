@@ -0,0 +1,84 @@
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# Schemes passwords may be stored in. New hashes use HASH_SCHEME; hashes in
+# the others still verify and are replaced on the next successful login.
+# scrypt is memory-hard and runs on hashlib's OpenSSL implementation, so it
+# needs no extra dependency; sha512_crypt is what older hashes use.
+SUPPORTED_SCHEMES = ("scrypt", "sha512_crypt")
+
+# Lowest cost calibrate_rounds tries: linear costs are measured here and
+# scaled up, log2 costs are doubled from here until the budget is reached
+CALIBRATION_START_ROUNDS = {
+    "scrypt": 10,
+    "sha512_crypt": 20000
+}
+
+def _handler(scheme: str):
+    from passlib.registry import get_crypt_handler
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"Unsupported hash scheme: {scheme}")
+    return get_crypt_handler(scheme)
+
+def _time_hash(scheme: str, rounds: int) -> float:
+    handler = _handler(scheme).using(rounds=rounds)
+    started = time.perf_counter()
+    handler.hash("calibration password")
+    return time.perf_counter() - started
+
+def calibrate_rounds(scheme: str, budget_seconds: float) -> int:
+    '''
+    This function returns the highest cost of scheme whose hash takes at most
+    budget_seconds on this machine, but never less than the calibration start.
+    It runs a few hashes, so it is run in a worker process at startup.
+    '''
+    handler = _handler(scheme)
+    rounds = CALIBRATION_START_ROUNDS[scheme]
+
+    if handler.rounds_cost == "log2":
+        # Each step doubles the time: step up while the next one still fits
+        seconds = _time_hash(scheme, rounds)
+        while rounds < handler.max_rounds and seconds * 2 <= budget_seconds:
+            rounds += 1
+            seconds = _time_hash(scheme, rounds)
+            if seconds > budget_seconds:
+                return rounds - 1
+        return rounds
+
+    # Time grows linearly with the rounds: scale the measurement, then check it
+    _time_hash(scheme, rounds)  # The first hash also pays for imports and caches
+    seconds = _time_hash(scheme, rounds)
+    scaled = int(rounds * budget_seconds / seconds) // 1000 * 1000
+    scaled = max(rounds, min(handler.max_rounds, scaled))
+    if _time_hash(scheme, scaled) > budget_seconds * 1.1:
+        scaled = max(rounds, int(scaled * 0.9) // 1000 * 1000)
+    return scaled
+
+def context_config(scheme: str, rounds: int) -> str:
+    '''
+    This function returns the passlib CryptContext configuration for the policy:
+    new hashes use scheme at rounds; hashes in other schemes, or in scheme at
+    fewer rounds, verify but are reported as needing an update.
+    '''
+    _handler(scheme)
+    others = [other for other in SUPPORTED_SCHEMES if other != scheme]
+    lines = [
+        "[passlib]",
+        f"schemes = {', '.join([scheme, *others])}",
+        f"deprecated = {', '.join(others)}",
+        f"{scheme}__default_rounds = {rounds}",
+        f"{scheme}__min_rounds = {rounds}"
+    ]
+    return "\n".join(lines) + "\n"
+
+@lru_cache(maxsize=4)
+def load_context(config: str) -> "CryptContext":
+    '''
+    This function builds (once per worker process) the CryptContext of a configuration.
+    '''
+    from passlib.context import CryptContext
+    return CryptContext.from_string(config)
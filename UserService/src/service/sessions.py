@@ -0,0 +1,152 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import math
+import secrets
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+from src.db.settings import get_settings, DatabaseType
+from src.exceptions import UnauthorizedException
+
+logger = logging.getLogger(__name__)
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+class RevocationCache:
+    """
+    Users whose sessions were revoked (deactivated, or their password reset),
+    with the time it happened: tokens issued before then are rejected.
+
+    A revocation only has to be kept as long as the tokens it applies to are
+    valid, so entries older than ttl_seconds are dropped. The cache therefore
+    holds the users revoked within the last token lifetime and needs no other bound.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._revoked: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def _prune(self, now: float) -> None:
+        # Entries are kept in revocation order, so the expired ones are at the front
+        while self._revoked:
+            email, revoked_at = next(iter(self._revoked.items()))
+            if revoked_at > now - self.ttl_seconds:
+                break
+            del self._revoked[email]
+
+    def revoke(self, email: str, at: Optional[float] = None) -> None:
+        now = time.time()
+        revoked_at = now if at is None else at
+        previous = self._revoked.pop(email, None)
+        if previous is not None:
+            # A late event must not shorten a later revocation
+            revoked_at = max(revoked_at, previous)
+        self._revoked[email] = revoked_at
+        self._prune(now)
+
+    def is_revoked(self, email: str, issued_at: float) -> bool:
+        revoked_at = self._revoked.get(email)
+        return revoked_at is not None and issued_at <= revoked_at
+
+class SessionTokens:
+    """
+    Signed, expiring session tokens that are verified in-process: no Redis or
+    database lookup per request, only an HMAC-SHA256 and a dict lookup.
+
+    A token is base64url(claims).base64url(signature), where claims holds the
+    email (sub), when it was issued (iat) and when it expires (exp), in Unix
+    seconds. Every pod verifying tokens needs the same secret.
+
+    Tokens cannot be withdrawn once issued, so revocations are kept in a
+    RevocationCache for ttl_seconds, fed locally by the service and across
+    pods by the user outbox events.
+    """
+
+    def __init__(self, secret: bytes, ttl_seconds: int):
+        if not secret:
+            raise ValueError("secret must not be empty")
+        self._secret = secret
+        self.ttl_seconds = ttl_seconds
+        self.revocations = RevocationCache(ttl_seconds)
+
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+
+    def _sign(self, claims: str) -> str:
+        return _b64encode(hmac.new(self._secret, claims.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, email: str) -> Tuple[str, float]:
+        """Returns a new token for email and the time it expires."""
+        # Rounded down to milliseconds, so a revocation right after issuing still covers the token
+        issued_at = math.floor(time.time() * 1000) / 1000
+        expires_at = issued_at + self.ttl_seconds
+        claims = _b64encode(json.dumps(
+            {"sub": email, "iat": issued_at, "exp": expires_at},
+            separators=(",", ":")
+        ).encode("utf-8"))
+        self.issued += 1
+        return f"{claims}.{self._sign(claims)}", expires_at
+
+    def verify(self, token: str) -> str:
+        """Returns the email of a valid token; raises UnauthorizedException otherwise."""
+        try:
+            claims, signature = token.split(".")
+            # Compared in constant time, so the signature cannot be guessed byte by byte
+            if not hmac.compare_digest(signature, self._sign(claims)):
+                raise ValueError("bad signature")
+            payload = json.loads(_b64decode(claims))
+            email, issued_at, expires_at = payload["sub"], payload["iat"], payload["exp"]
+        except (ValueError, KeyError, TypeError, UnicodeError):
+            self.rejected += 1
+            raise UnauthorizedException("Invalid session token")
+
+        if expires_at <= time.time():
+            self.rejected += 1
+            raise UnauthorizedException("Session expired")
+        if self.revocations.is_revoked(email, issued_at):
+            self.rejected += 1
+            raise UnauthorizedException("Session revoked")
+
+        self.verified += 1
+        return email
+
+    def revoke(self, email: str, at: Optional[float] = None) -> None:
+        """Rejects every token of email issued until at (Unix seconds), by default now."""
+        self.revocations.revoke(email, at=at)
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "issued": self.issued,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "revoked_users": len(self.revocations)
+        }
+
+@lru_cache()
+def get_session_tokens() -> SessionTokens:
+    """
+    Process-wide session tokens, so revocations reach every request.
+    Called at startup, so a missing SESSION_SECRET stops the service before it takes requests.
+    """
+    settings = get_settings()
+    secret = settings.SESSION_SECRET.encode("utf-8")
+    if not secret:
+        # A random key per process would reject the tokens of every other pod and worker
+        if settings.DATABASE_TYPE != DatabaseType.MEMORY:
+            raise RuntimeError("SESSION_SECRET must be set, to the same value on every pod")
+        logger.warning("SESSION_SECRET is not set: using a random key, so sessions are only valid on this process")
+        secret = secrets.token_bytes(32)
+    return SessionTokens(secret=secret, ttl_seconds=settings.SESSION_TTL_SECONDS)
@@ -1,6 +1,12 @@
-from passlib.hash import sha512_crypt
+from typing import Optional, Tuple
+from .hashing import get_password_hasher
 
 async def saltAndHashedPW(password: str):
     # Generate a random salt and hash the password
-    # passlib handles salt generation internally
-    return sha512_crypt.hash(password)
\ No newline at end of file
+    # passlib handles salt generation internally; the hash runs in a worker process
+    return await get_password_hasher().hash(password)
+
+async def verifyPW(password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    # Returns whether the password matches, and a new hash to store when the
+    # stored one uses an outdated scheme or cost
+    return await get_password_hasher().verify(password, hashed_password)
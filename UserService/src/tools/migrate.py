@@ -0,0 +1,290 @@
+"""
+Online migration of the users table between Postgres and DynamoDB.
+
+Every user is streamed from the source backend into the target backend:
+- Postgres is read with a server-side cursor in primary key order, DynamoDB
+  with a parallel segmented Scan.
+- Batches are written with bounded concurrency: COPY into a temporary table
+  and INSERT ... ON CONFLICT DO UPDATE on Postgres, BatchWriteItem on DynamoDB.
+  Both replace rows that already exist, so rows written again after a resume
+  are harmless and a new pass brings the target to the source's state.
+- Once a batch and every batch read before it are written, the read position
+  is saved to the checkpoint file. Running the same command again continues
+  from there.
+
+No outbox events are written: the migration copies state, it does not change it.
+Users changed in the source while it runs may be copied in either version, so
+writes should be paused for a final pass before switching DATABASE_TYPE. That
+pass needs a fresh checkpoint (remove the file or pass another --checkpoint):
+resuming from a saved position only copies the keys read after it.
+
+Connection settings are the service's own (POSTGRES_DATABASE_URL, AWS_*).
+
+Usage (from the service root):
+    python -m src.tools.migrate --source postgres --target dynamodb
+    python -m src.tools.migrate --source dynamodb --target postgres --concurrency 8 --segments 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from src.db.settings import get_settings, Settings
+from src.schemas import UserSchemas
+
+# The table has the same name and key on both backends
+TABLE_NAME = "users"
+KEY_NAME = "email"
+COLUMNS = ("email", "hashed_password", "is_active")
+
+# A batch read from the source, and the mark that advances the read position past it
+Batch = Tuple[List[UserSchemas.User], Any]
+
+
+class Checkpoint:
+    """The source's read position, saved atomically to a JSON file after every batch."""
+
+    def __init__(self, path: str, source: str, target: str):
+        self.path = path
+        self.state: Dict[str, Any] = {"source": source, "target": target, "rows": 0, "position": None}
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if (saved["source"], saved["target"]) != (source, target):
+                raise ValueError(f"Checkpoint {path} is for {saved['source']} -> {saved['target']}")
+            self.state = saved
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+class PostgresSource:
+    """Reads users in email order from a server-side cursor; the position is the last email read."""
+
+    def __init__(self, engine: Any, batch_size: int):
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def initial_position(self) -> Optional[str]:
+        return None
+
+    def advance(self, position: Optional[str], mark: str) -> str:
+        return mark
+
+    async def read(self, position: Optional[str]) -> AsyncIterator[Batch]:
+        from sqlalchemy import select
+        from src.repository.implementations.PostgreSQL.models.ORM_User import UserORM
+
+        stmt = select(*[getattr(UserORM, column) for column in COLUMNS]).order_by(UserORM.email)
+        if position is not None:
+            stmt = stmt.where(UserORM.email > position)
+
+        async with self.engine.connect() as conn:
+            result = await conn.stream(stmt.execution_options(yield_per=self.batch_size))
+            async for rows in result.partitions():
+                users = [UserSchemas.User(**row._mapping) for row in rows]
+                yield users, users[-1].email
+
+
+class DynamoDBSource:
+    """Reads users with a parallel segmented Scan; the position is the LastEvaluatedKey of every unfinished segment."""
+
+    def __init__(self, client: Any, batch_size: int, total_segments: int):
+        self.client = client
+        self.batch_size = batch_size
+        self.total_segments = total_segments
+
+    def initial_position(self) -> Dict[str, Any]:
+        return {"total_segments": self.total_segments, "segments": {str(segment): None for segment in range(self.total_segments)}}
+
+    def advance(self, position: Dict[str, Any], mark: Tuple[int, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+        segment, last_evaluated_key = mark
+        segments = dict(position["segments"])
+        if last_evaluated_key is None:
+            del segments[str(segment)]  # Finished
+        else:
+            segments[str(segment)] = last_evaluated_key
+        return {**position, "segments": segments}
+
+    async def read(self, position: Dict[str, Any]) -> AsyncIterator[Batch]:
+        from src.repository.implementations.AWS_DynamoDB.utils import parallel_scan_pages, from_dynamodb_item
+
+        async for page in parallel_scan_pages(
+            self.client,
+            TABLE_NAME,
+            total_segments=position["total_segments"],  # A resumed scan keeps its segmentation
+            page_size=self.batch_size,
+            start_keys={int(segment): key for segment, key in position["segments"].items()}
+        ):
+            users = [from_dynamodb_item(UserSchemas.User, item) for item in page.items]
+            # Empty pages are passed on too, they still move the segment forward
+            yield users, (page.segment, page.last_evaluated_key)
+
+
+class PostgresTarget:
+    """Writes a batch with COPY into a temporary table, then inserts them, replacing the users that already exist."""
+
+    def __init__(self, engine: Any):
+        self.engine = engine
+
+    async def write(self, users: List[UserSchemas.User]) -> None:
+        if not users:
+            return
+        columns = ", ".join(COLUMNS)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS if column != KEY_NAME)
+        async with self.engine.connect() as conn:
+            driver_connection = (await conn.get_raw_connection()).driver_connection
+            async with driver_connection.transaction():
+                await driver_connection.execute(f"CREATE TEMP TABLE migrate_batch (LIKE auth.{TABLE_NAME}) ON COMMIT DROP")
+                await driver_connection.copy_records_to_table(
+                    "migrate_batch",
+                    records=[tuple(getattr(user, column) for column in COLUMNS) for user in users],
+                    columns=list(COLUMNS)
+                )
+                await driver_connection.execute(
+                    f"INSERT INTO auth.{TABLE_NAME} ({columns}) SELECT {columns} FROM migrate_batch ON CONFLICT ({KEY_NAME}) DO UPDATE SET {updates}"
+                )
+
+
+class DynamoDBTarget:
+    """Writes a batch with BatchWriteItem; users that already exist are replaced."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def write(self, users: List[UserSchemas.User]) -> None:
+        from src.repository.implementations.AWS_DynamoDB.utils import batch_write_items, to_dynamodb_item
+
+        await batch_write_items(self.client, TABLE_NAME, [to_dynamodb_item(user) for user in users])
+
+
+async def migrate(
+        source: Any,
+        target: Any,
+        checkpoint: Checkpoint,
+        concurrency: int,
+        report_every: float = 5.0
+    ) -> int:
+    """
+    Copies every batch from source to target, up to concurrency batches being
+    written at once, and returns the number of rows written in this run.
+    The checkpoint only moves past a batch once all batches before it are written.
+    """
+    state = checkpoint.state
+    if state["position"] is None:
+        state["position"] = source.initial_position()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    written: Dict[int, Tuple[Any, int]] = {}  # Written batches the checkpoint has not moved past yet
+    next_to_commit = 0
+    rows = 0
+    started = last_report = time.monotonic()
+
+    async def write_batch(sequence: int, users: List[UserSchemas.User], mark: Any) -> None:
+        nonlocal next_to_commit, rows, last_report
+        try:
+            await target.write(users)
+        finally:
+            semaphore.release()
+
+        written[sequence] = (mark, len(users))
+        if next_to_commit not in written:
+            return
+        while next_to_commit in written:
+            mark, count = written.pop(next_to_commit)
+            state["position"] = source.advance(state["position"], mark)
+            state["rows"] += count
+            rows += count
+            next_to_commit += 1
+        checkpoint.save()
+
+        now = time.monotonic()
+        if now - last_report >= report_every:
+            last_report = now
+            print(f"{state['rows']} rows ({rows / (now - started):.0f} rows/s)", file=sys.stderr)
+
+    async with asyncio.TaskGroup() as task_group:
+        sequence = 0
+        async for users, mark in source.read(state["position"]):
+            await semaphore.acquire()
+            task_group.create_task(write_batch(sequence, users, mark))
+            sequence += 1
+
+    return rows
+
+
+async def run(args: argparse.Namespace, settings: Settings) -> None:
+    backends = {args.source, args.target}
+    engine = client = None
+
+    async with AsyncExitStack() as exit_stack:
+        if "postgres" in backends:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            # One connection per batch being written, plus the source cursor
+            engine = create_async_engine(settings.POSTGRES_DATABASE_URL, pool_size=args.concurrency + 1)
+            exit_stack.push_async_callback(engine.dispose)
+
+        if "dynamodb" in backends:
+            import aioboto3
+            from botocore.config import Config
+            session = aioboto3.Session(
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION
+            )
+            client = await exit_stack.enter_async_context(
+                session.client(
+                    'dynamodb',
+                    endpoint_url=settings.AWS_ENDPOINT,
+                    config=Config(
+                        connect_timeout=5.0,
+                        read_timeout=10.0,
+                        retries={'max_attempts': 3},
+                        # Every batch writes up to 8 chunks at once, every segment reads one page
+                        max_pool_connections=args.concurrency * 8 + args.segments
+                    )
+                )
+            )
+
+        source = (
+            PostgresSource(engine, args.batch_size) if args.source == "postgres"
+            else DynamoDBSource(client, args.batch_size, args.segments)
+        )
+        target = PostgresTarget(engine) if args.target == "postgres" else DynamoDBTarget(client)
+        checkpoint = Checkpoint(args.checkpoint, args.source, args.target)
+
+        started = time.monotonic()
+        rows = await migrate(source, target, checkpoint, args.concurrency, args.report_every)
+        elapsed = time.monotonic() - started
+        print(
+            f"Migrated {rows} {TABLE_NAME} from {args.source} to {args.target} in {elapsed:.1f}s "
+            f"({rows / elapsed if elapsed else 0:.0f} rows/s), {checkpoint.state['rows']} in total"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=["postgres", "dynamodb"], required=True)
+    parser.add_argument("--target", choices=["postgres", "dynamodb"], required=True)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows read and written per batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batches written at the same time")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel Scan segments when reading DynamoDB")
+    parser.add_argument("--checkpoint", help=f"Checkpoint file (default: migrate_{TABLE_NAME}_<source>_to_<target>.json)")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between progress reports")
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        parser.error("--source and --target must differ")
+    args.checkpoint = args.checkpoint or f"migrate_{TABLE_NAME}_{args.source}_to_{args.target}.json"
+
+    asyncio.run(run(args, get_settings()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import os
+
+# Session tokens need a secret outside memory mode; set before the settings are first read
+os.environ.setdefault("SESSION_SECRET", "unit-test-secret")
@@ -0,0 +1,186 @@
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def cache():
+    """Create a small TTLCache for testing."""
+    from src.repository.implementations.Caching.cache import TTLCache
+    return TTLCache(max_entries=2, ttl_seconds=60)
+
+@pytest.fixture
+def sample_user():
+    """Create a sample User schema for testing."""
+    from src.schemas import UserSchemas
+    return UserSchemas.User(
+        email="test@example.com",
+        is_active=True,
+        hashed_password="hashed_password_value",
+    )
+
+@pytest.fixture
+def inner_repo(sample_user):
+    """Create a mock UserRepository that the cache wraps."""
+    repo = AsyncMock()
+    repo.get_user.return_value = sample_user
+    return repo
+
+@pytest.fixture
+def caching_repo(inner_repo, cache):
+    """Create a CachingUserRepository around the mock repository."""
+    from src.repository.implementations.Caching.caching_UserRepository import CachingUserRepository
+    return CachingUserRepository(inner_repo, cache=cache)
+
+# Tests for TTLCache
+def test_cache_expires_entries(cache, monkeypatch):
+    """Test that an entry is no longer returned after its TTL."""
+    import src.repository.implementations.Caching.cache as cache_module
+
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    now += 61
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+def test_cache_evicts_least_recently_used(cache):
+    """Test that a full cache evicts the entry that was used least recently."""
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_cache_skips_stale_fill(cache):
+    """Test that a value read before an invalidation is not stored."""
+    token = cache.token()
+    cache.invalidate("key")
+    cache.set("key", "stale", token)
+
+    assert cache.get("key") is None
+
+# Tests for CachingUserRepository
+@pytest.mark.asyncio
+async def test_get_user_served_from_cache(caching_repo, inner_repo, sample_user):
+    """Test that repeated reads hit the wrapped repository only once."""
+    from src.schemas import UserSchemas
+    first = await caching_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+    second = await caching_repo.get_user("test@example.com", fields=["is_active"])
+
+    assert first == sample_user
+    assert second == sample_user
+    inner_repo.get_user.assert_awaited_once_with("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+
+@pytest.mark.asyncio
+async def test_get_user_other_fields_bypass_cache(caching_repo, inner_repo):
+    """Test that reads of fields that are not cached, like the password hash, always go to the repository."""
+    for _ in range(2):
+        await caching_repo.get_user("test@example.com", fields=["hashed_password"])
+        await caching_repo.get_user("test@example.com")
+
+    assert inner_repo.get_user.await_count == 4
+    inner_repo.get_user.assert_awaited_with("test@example.com", fields=None)
+
+@pytest.mark.asyncio
+async def test_get_user_not_found_not_cached(caching_repo, inner_repo):
+    """Test that a missing user is not cached."""
+    from src.exceptions import ResourceNotFoundException
+    inner_repo.get_user.side_effect = ResourceNotFoundException("User not found")
+
+    for _ in range(2):
+        with pytest.raises(ResourceNotFoundException):
+            await caching_repo.get_user("missing@example.com", fields=["email", "is_active"])
+
+    assert inner_repo.get_user.await_count == 2
+
+@pytest.mark.asyncio
+async def test_update_user_invalidates(caching_repo, inner_repo):
+    """Test that an update drops the cached user."""
+    from src.schemas import UserSchemas
+
+    await caching_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+    await caching_repo.update_user(UserSchemas.User(email="test@example.com", is_active=False))
+    await caching_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+
+    assert inner_repo.get_user.await_count == 2
+
+@pytest.mark.asyncio
+async def test_update_user_write_through(inner_repo, cache):
+    """Test that write_through caches the user returned by the update, without its password hash."""
+    from src.repository.implementations.Caching.caching_UserRepository import CachingUserRepository
+    from src.schemas import UserSchemas
+    caching_repo = CachingUserRepository(inner_repo, cache=cache, write_through=True)
+    inner_repo.update_user.return_value = UserSchemas.User(email="test@example.com", hashed_password="hash", is_active=False)
+
+    await caching_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+    updated = await caching_repo.update_user(UserSchemas.User(email="test@example.com", is_active=False))
+    user = await caching_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+
+    assert updated.hashed_password == "hash"
+    assert user == UserSchemas.User(email="test@example.com", is_active=False)
+    inner_repo.get_user.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_invalidation_event_drops_cached_user(monkeypatch, cache):
+    """Test that a user outbox event routed through the Kafka manager invalidates the cache."""
+    from src.consumer import kafka
+    import src.repository.implementations.Caching.caching_UserRepository as caching_module
+    monkeypatch.setattr(caching_module, "get_user_cache", lambda: cache)
+
+    cache.set("test@example.com", "cached")
+    manager = kafka.KafkaEventManager()
+    manager.register_handler("user_*_success", kafka.UserCacheInvalidationHandler())
+    await manager._process_event("user_created_from_new_subscription_success", {"email": "test@example.com"})
+
+    assert cache.get("test@example.com") is None
+
+@pytest.mark.asyncio
+async def test_single_deactivation_invalidates_other_pods(monkeypatch, cache):
+    """Test that deactivating one user writes an event whose handler drops the user from another pod's cache."""
+    from src.consumer import kafka
+    from src.db.settings import Settings
+    from src.repository.implementations.Caching.caching_UserRepository import CachingUserRepository
+    from src.repository.implementations.Memory.memory_UserRepository import UserRepository
+    from src.repository.implementations.Memory.store import MemoryStore
+    from src.schemas import UserSchemas
+    from src.service.UserService import UserService
+    import src.repository.implementations.Caching.caching_UserRepository as caching_module
+
+    # The store stands in for the shared database and its outbox topic; the manager is the other pod's consumer
+    store = MemoryStore()
+    monkeypatch.setattr(caching_module, "get_user_cache", lambda: cache)
+    monkeypatch.setattr(kafka, "get_settings", lambda: Settings(CACHE_ENABLED=True))
+    monkeypatch.setattr(kafka, "invalidation_manager", kafka.KafkaEventManager())
+    await kafka.setup_local_handlers(store)
+
+    await UserRepository(store).create_user(
+        UserSchemas.User(email="test@example.com", hashed_password="hash", is_active=True),
+        UserSchemas.Outbox(aggregatetype="user", aggregateid="test@example.com", eventtype_prefix="user_created", payload={})
+    )
+    other_pod = CachingUserRepository(UserRepository(store), cache=cache)
+    assert (await other_pod.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)).is_active is True
+
+    await UserService(UserRepository(store)).deactivate_user("test@example.com", eventtype_prefix="user_deactivated")
+
+    assert cache.get("test@example.com") is None
+    assert (await other_pod.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)).is_active is False
+
+@pytest.mark.asyncio
+async def test_get_users_fetches_only_misses(caching_repo, inner_repo, sample_user):
+    """Test that a batch read serves cached users and fetches the rest in one call."""
+    from src.schemas import UserSchemas
+    other_user = UserSchemas.User(email="other@example.com", is_active=False)
+    inner_repo.get_users.return_value = [other_user]
+
+    await caching_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+    users = await caching_repo.get_users(["other@example.com", "test@example.com", "missing@example.com"], fields=UserSchemas.USER_RESPONSE_FIELDS)
+
+    assert users == [other_user, sample_user]
+    inner_repo.get_users.assert_awaited_once_with(["other@example.com", "missing@example.com"], fields=UserSchemas.USER_RESPONSE_FIELDS)
+    assert await caching_repo.get_user("other@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS) == other_user
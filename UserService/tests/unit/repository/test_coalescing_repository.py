@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def sample_user():
+    """Create a sample User schema for testing."""
+    from src.schemas import UserSchemas
+    return UserSchemas.User(
+        email="test@example.com",
+        is_active=True
+    )
+
+@pytest.fixture
+def release():
+    """An event the slow mock repository waits for before answering."""
+    return asyncio.Event()
+
+@pytest.fixture
+def inner_repo(sample_user, release):
+    """Create a mock UserRepository whose get_user only returns once released."""
+    async def get_user(email, fields=None):
+        await release.wait()
+        return sample_user
+
+    repo = AsyncMock()
+    repo.get_user.side_effect = get_user
+    return repo
+
+@pytest.fixture
+def coalescing_repo(inner_repo):
+    """Create a CoalescingUserRepository around the mock repository."""
+    from src.repository.implementations.Coalescing.coalescing_UserRepository import CoalescingUserRepository
+    from src.repository.implementations.Coalescing.single_flight import SingleFlight
+    return CoalescingUserRepository(inner_repo, flights=SingleFlight())
+
+async def started(*coroutines):
+    """Start the coroutines as tasks and let them run until they wait."""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    await asyncio.sleep(0)
+    return tasks
+
+# Tests for CoalescingUserRepository
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_call(coalescing_repo, inner_repo, release, sample_user):
+    """Test that concurrent reads of the same user make one backend call and share its result."""
+    tasks = await started(*(coalescing_repo.get_user("test@example.com") for _ in range(10)))
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [sample_user] * 10
+    inner_repo.get_user.assert_called_once_with("test@example.com", fields=None)
+    assert coalescing_repo.flights.stats() == {"in_flight": 0, "calls": 1, "coalesced": 9}
+
+@pytest.mark.asyncio
+async def test_other_keys_and_projections_are_separate(coalescing_repo, inner_repo, release):
+    """Test that other emails and other projections are not coalesced, but reordered fields are."""
+    tasks = await started(
+        coalescing_repo.get_user("test@example.com"),
+        coalescing_repo.get_user("other@example.com"),
+        coalescing_repo.get_user("test@example.com", fields=["email", "is_active"]),
+        coalescing_repo.get_user("test@example.com", fields=["is_active", "email"])
+    )
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert inner_repo.get_user.call_count == 3
+
+@pytest.mark.asyncio
+async def test_errors_are_shared(coalescing_repo, inner_repo):
+    """Test that every waiting caller gets the leader's exception, e.g. not found."""
+    from src.exceptions import ResourceNotFoundException
+
+    async def get_user(email, fields=None):
+        await asyncio.sleep(0)
+        raise ResourceNotFoundException(f"User with email {email} not found")
+    inner_repo.get_user.side_effect = get_user
+
+    results = await asyncio.gather(
+        *(coalescing_repo.get_user("test@example.com") for _ in range(3)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, ResourceNotFoundException) for result in results)
+    inner_repo.get_user.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over(coalescing_repo, inner_repo, release, sample_user):
+    """Test that callers waiting on a cancelled leader retry the read themselves."""
+    leader, follower = await started(
+        coalescing_repo.get_user("test@example.com"),
+        coalescing_repo.get_user("test@example.com")
+    )
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == sample_user
+    assert leader.cancelled()
+    assert inner_repo.get_user.call_count == 2
+
+@pytest.mark.asyncio
+async def test_write_starts_a_new_call(coalescing_repo, inner_repo, release):
+    """Test that reads after a write do not join a call that started before it."""
+    from src.schemas import UserSchemas
+
+    before = await started(coalescing_repo.get_user("test@example.com"))
+    await coalescing_repo.update_user(UserSchemas.User(email="test@example.com", is_active=False))
+    after = await started(coalescing_repo.get_user("test@example.com"))
+    release.set()
+    await asyncio.gather(*before, *after)
+
+    assert inner_repo.get_user.call_count == 2
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+
+
+def make_request(delays, results):
+    """Create a request that answers its n-th call with results[n] after delays[n] seconds."""
+    calls = []
+
+    async def request():
+        n = len(calls)
+        calls.append(n)
+        await asyncio.sleep(delays[n])
+        if isinstance(results[n], Exception):
+            raise results[n]
+        return results[n]
+
+    return request, calls
+
+def make_policy(budget=1.0):
+    """Create a HedgingPolicy that hedges after 10ms from the first sample on."""
+    from src.repository.implementations.AWS_DynamoDB.hedging import HedgingPolicy
+    policy = HedgingPolicy(budget=budget, max_tokens=1.0, min_samples=1)
+    policy.record(0.01)
+    return policy
+
+# Tests for HedgingPolicy
+@pytest.mark.asyncio
+async def test_hedging_waits_for_samples():
+    """Test that nothing is hedged until enough latencies have been seen."""
+    from src.repository.implementations.AWS_DynamoDB.hedging import HedgingPolicy
+    policy = HedgingPolicy(min_samples=100)
+    request, calls = make_request([0.02], ["first"])
+
+    assert await policy.run(request) == "first"
+    assert calls == [0]
+    assert policy.delay is None
+
+@pytest.mark.asyncio
+async def test_hedging_sends_second_request_when_slow():
+    """Test that a request slower than the tracked percentile is sent again and the faster answer wins."""
+    policy = make_policy()
+    request, calls = make_request([1.0, 0.0], ["first", "second"])
+
+    assert await policy.run(request) == "second"
+    assert calls == [0, 1]
+    assert policy.hedges == 1
+    assert policy.hedges_won == 1
+
+@pytest.mark.asyncio
+async def test_hedging_respects_budget():
+    """Test that no second request is sent once the budget is used up."""
+    policy = make_policy(budget=0.0)
+    request, calls = make_request([0.05], ["first"])
+
+    assert await policy.run(request) == "first"
+    assert calls == [0]
+    assert policy.over_budget == 1
+
+@pytest.mark.asyncio
+async def test_hedging_failed_request_does_not_win():
+    """Test that a request failing first does not win while the other one can still succeed."""
+    policy = make_policy()
+    request, calls = make_request([0.03, 0.05], [RuntimeError("first failed"), "second"])
+
+    assert await policy.run(request) == "second"
+
+    request, calls = make_request([0.03, 0.05], [RuntimeError("first failed"), RuntimeError("second failed")])
+    policy = make_policy()
+    with pytest.raises(RuntimeError, match="first failed"):
+        await policy.run(request)
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def metrics():
+    """Create empty CapacityMetrics for testing."""
+    from src.repository.implementations.AWS_DynamoDB.metrics import CapacityMetrics
+    return CapacityMetrics()
+
+# Tests for MeteredClient
+@pytest.mark.asyncio
+async def test_metered_client_records_consumed_capacity(metrics):
+    """Test that calls request ReturnConsumedCapacity and their capacity is recorded under the operation."""
+    from src.repository.implementations.AWS_DynamoDB.metrics import MeteredClient
+    client = AsyncMock()
+    client.get_item.return_value = {
+        "Item": {"email": {"S": "test@example.com"}},
+        "ConsumedCapacity": {"TableName": "users", "CapacityUnits": 0.5},
+        "ResponseMetadata": {"RetryAttempts": 1}
+    }
+    client.put_item.return_value = {
+        "ConsumedCapacity": {"TableName": "users", "CapacityUnits": 1.0, "WriteCapacityUnits": 1.0}
+    }
+
+    metered = MeteredClient(client, metrics, "get_user")
+    await metered.get_item(TableName="users", Key={"email": {"S": "test@example.com"}})
+    await MeteredClient(client, metrics, "create_user").put_item(TableName="users", Item={})
+
+    assert client.get_item.call_args.kwargs["ReturnConsumedCapacity"] == "TOTAL"
+    stats = metrics.stats()["users"]
+    assert stats["get_user"]["calls"] == 1
+    assert stats["get_user"]["read_capacity_units"] == 0.5
+    assert stats["get_user"]["retries"] == 1
+    assert stats["create_user"]["write_capacity_units"] == 1.0
+
+@pytest.mark.asyncio
+async def test_metered_client_records_batch_capacity_per_table(metrics):
+    """Test that the capacity of batch calls is split by table, and unprocessed keys are counted."""
+    from src.repository.implementations.AWS_DynamoDB.metrics import MeteredClient
+    client = AsyncMock()
+    client.batch_get_item.return_value = {
+        "Responses": {"users": []},
+        "UnprocessedKeys": {"users": {"Keys": [{"email": {"S": "a@example.com"}}, {"email": {"S": "b@example.com"}}]}},
+        "ConsumedCapacity": [{"TableName": "users", "CapacityUnits": 3.0}]
+    }
+
+    await MeteredClient(client, metrics, "get_users").batch_get_item(RequestItems={"users": {"Keys": []}})
+
+    stats = metrics.stats()["users"]["get_users"]
+    assert stats["read_capacity_units"] == 3.0
+    assert stats["unprocessed"] == 2
+
+@pytest.mark.asyncio
+async def test_metered_client_classifies_errors(metrics):
+    """Test that throttling, failed conditions and other errors are counted apart, and the error is raised."""
+    from botocore.exceptions import ClientError
+    from src.repository.implementations.AWS_DynamoDB.metrics import MeteredClient
+    client = AsyncMock()
+    client.scan.side_effect = ClientError(
+        {"Error": {"Code": "ProvisionedThroughputExceededException"}, "ResponseMetadata": {"RetryAttempts": 3}}, "Scan"
+    )
+    client.put_item.side_effect = ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem")
+    client.transact_write_items.side_effect = ClientError(
+        {"Error": {"Code": "TransactionCanceledException"}, "CancellationReasons": [{"Code": "None"}, {"Code": "ThrottlingError"}]},
+        "TransactWriteItems"
+    )
+
+    metered = MeteredClient(client, metrics, "deactivate_users")
+    with pytest.raises(ClientError):
+        await metered.scan(TableName="users")
+    with pytest.raises(ClientError):
+        await metered.put_item(TableName="users", Item={})
+    with pytest.raises(ClientError):
+        await metered.transact_write_items(TransactItems=[{"Update": {"TableName": "users"}}])
+
+    stats = metrics.stats()["users"]["deactivate_users"]
+    assert stats["calls"] == 3
+    assert stats["throttles"] == 2
+    assert stats["condition_failures"] == 1
+    assert stats["errors"] == 0
+    assert stats["retries"] == 3
+
+# Tests for the metered UserRepository
+@pytest.mark.asyncio
+async def test_repository_records_calls_per_operation(metrics):
+    """Test that the DynamoDB UserRepository records its calls under the repository operation."""
+    from src.repository.implementations.AWS_DynamoDB.awsdynamodb_UserRepository import UserRepository
+    client = AsyncMock()
+    client.get_item.return_value = {
+        "Item": {"email": {"S": "test@example.com"}, "is_active": {"BOOL": True}},
+        "ConsumedCapacity": {"TableName": "users", "CapacityUnits": 0.5}
+    }
+
+    user = await UserRepository(client, metrics=metrics).get_user("test@example.com")
+
+    assert user.email == "test@example.com"
+    assert metrics.stats() == {"users": {"get_user": {
+        "calls": 1, "read_capacity_units": 0.5, "write_capacity_units": 0,
+        "retries": 0, "throttles": 0, "condition_failures": 0, "errors": 0, "unprocessed": 0
+    }}}
@@ -0,0 +1,157 @@
+import pytest
+from unittest.mock import AsyncMock
+
+# Fixtures
+@pytest.fixture
+def store():
+    """Create an empty MemoryStore for testing."""
+    from src.repository.implementations.Memory.store import MemoryStore
+    return MemoryStore()
+
+@pytest.fixture
+def user_repo(store):
+    """Create an in-memory UserRepository."""
+    from src.repository.implementations.Memory.memory_UserRepository import UserRepository
+    return UserRepository(store)
+
+@pytest.fixture
+def sample_user():
+    """Create a sample User schema for testing."""
+    from src.schemas import UserSchemas
+    return UserSchemas.User(
+        email="test@example.com",
+        is_active=True,
+        hashed_password="hashed_password_value",
+    )
+
+@pytest.fixture
+def sample_outbox():
+    """Create a sample Outbox schema for testing."""
+    from src.schemas import UserSchemas
+    return UserSchemas.Outbox(
+        aggregatetype = "user",
+        aggregateid = "test@example.com",
+        eventtype_prefix = "user_created",
+        payload = {
+            "email": "test@example.com"
+        }
+    )
+
+@pytest.mark.asyncio
+async def test_create_and_get_user(user_repo, store, sample_user, sample_outbox):
+    """Test that a created user can be read back, and without its password hash when projected."""
+    from src.schemas import UserSchemas
+    await user_repo.create_user(sample_user, sample_outbox)
+
+    result = await user_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
+
+    assert result.email == "test@example.com"
+    assert result.is_active is True
+    assert result.hashed_password is None
+    assert (await user_repo.get_user("test@example.com")).hashed_password == sample_user.hashed_password
+    assert store.outbox[-1]["eventtype"] == "user_created_success"
+
+@pytest.mark.asyncio
+async def test_create_user_already_exists(user_repo, store, sample_user, sample_outbox):
+    """Test that a duplicate user raises and records a failed event."""
+    from src.exceptions import ResourceAlreadyExistsException
+    await user_repo.create_user(sample_user, sample_outbox)
+
+    with pytest.raises(ResourceAlreadyExistsException):
+        await user_repo.create_user(sample_user, sample_outbox)
+
+    assert store.outbox[-1]["eventtype"] == "user_created_failed"
+    assert store.outbox[-1]["payload"]["exception"] == "ResourceAlreadyExistsException"
+
+@pytest.mark.asyncio
+async def test_update_user(user_repo, sample_user, sample_outbox):
+    """Test that only the fields that were set are updated."""
+    from src.schemas import UserSchemas
+    await user_repo.create_user(sample_user, sample_outbox)
+
+    await user_repo.update_user(UserSchemas.User(email="test@example.com", is_active=False))
+
+    assert (await user_repo.get_user("test@example.com")).is_active is False
+    assert user_repo.table["test@example.com"]["hashed_password"] == "hashed_password_value"
+
+@pytest.mark.asyncio
+async def test_update_user_with_outbox_event(user_repo, store, sample_user, sample_outbox):
+    """Test that an update with an outbox event records it, and a failed event for a missing user."""
+    from src.exceptions import ResourceNotFoundException
+    from src.schemas import UserSchemas
+    await user_repo.create_user(sample_user, sample_outbox)
+    outbox = UserSchemas.Outbox(
+        aggregatetype="user",
+        aggregateid="test@example.com",
+        eventtype_prefix="user_deactivated",
+        payload={"email": "test@example.com", "is_active": False}
+    )
+
+    await user_repo.update_user(UserSchemas.User(email="test@example.com", is_active=False), outbox)
+    assert store.outbox[-1]["eventtype"] == "user_deactivated_success"
+
+    with pytest.raises(ResourceNotFoundException):
+        await user_repo.update_user(UserSchemas.User(email="missing@example.com", is_active=False), outbox)
+    assert store.outbox[-1]["eventtype"] == "user_deactivated_failed"
+
+@pytest.mark.asyncio
+async def test_update_user_expected_values(user_repo, sample_user, sample_outbox):
+    """Test that a conditional update only applies while the expected fields are unchanged."""
+    from src.exceptions import ConflictException
+    from src.schemas import UserSchemas
+    await user_repo.create_user(sample_user, sample_outbox)
+
+    with pytest.raises(ConflictException):
+        await user_repo.update_user(
+            UserSchemas.User(email="test@example.com", hashed_password="rehashed"),
+            expected={"hashed_password": "outdated_hash"}
+        )
+    assert user_repo.table["test@example.com"]["hashed_password"] == "hashed_password_value"
+
+    await user_repo.update_user(
+        UserSchemas.User(email="test@example.com", hashed_password="rehashed"),
+        expected={"hashed_password": "hashed_password_value"}
+    )
+    assert user_repo.table["test@example.com"]["hashed_password"] == "rehashed"
+
+@pytest.mark.asyncio
+async def test_update_user_not_found(user_repo):
+    """Test that updating a missing user raises ResourceNotFoundException."""
+    from src.exceptions import ResourceNotFoundException
+    from src.schemas import UserSchemas
+
+    with pytest.raises(ResourceNotFoundException):
+        await user_repo.update_user(UserSchemas.User(email="missing@example.com", is_active=False))
+
+@pytest.mark.asyncio
+async def test_outbox_delivered_to_subscribers(user_repo, store, sample_user, sample_outbox):
+    """Test that outbox events are handed to in-process subscribers."""
+    subscriber = AsyncMock()
+    store.subscribe(subscriber)
+
+    await user_repo.create_user(sample_user, sample_outbox)
+
+    subscriber.assert_awaited_once_with("user_created_success", {"email": "test@example.com"})
+
+@pytest.mark.asyncio
+async def test_get_users(user_repo, sample_user, sample_outbox):
+    """Test that a batch read returns existing users once each, in request order."""
+    await user_repo.create_user(sample_user, sample_outbox)
+
+    users = await user_repo.get_users(["missing@example.com", "test@example.com", "test@example.com"])
+
+    assert [user.email for user in users] == ["test@example.com"]
+
+@pytest.mark.asyncio
+async def test_deactivate_users_by_domain(user_repo, store, sample_user, sample_outbox):
+    """Test that bulk deactivation by domain deactivates matching users and records an event each."""
+    from src.schemas import UserSchemas
+    await user_repo.create_user(sample_user, sample_outbox)
+    await user_repo.create_user(UserSchemas.User(email="other@example.org", is_active=True), sample_outbox)
+
+    statuses = await user_repo.deactivate_users(emails=None, email_domain="example.com", eventtype_prefix="user_deactivated")
+
+    assert statuses == {"test@example.com": "deactivated"}
+    assert (await user_repo.get_user("test@example.com")).is_active is False
+    assert (await user_repo.get_user("other@example.org")).is_active is True
+    assert store.outbox[-1]["eventtype"] == "user_deactivated_success"
@@ -62,16 +62,28 @@ async def test_get_user_success(user_repo, mock_db, db_user):
     
     # Setup mock to return a user
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = db_user
+    mock_result.mappings.return_value.one_or_none.return_value = {"email": "test@example.com", "is_active": True}
     mock_db.execute.return_value = mock_result
     
     # Call the method
-    user = await user_repo.get_user("test@example.com")
+    user = await user_repo.get_user("test@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
     
     # Assertions
     assert user.email == "test@example.com"
     assert user.is_active is True
     mock_db.execute.assert_called_once()
+    # Only the projected columns are selected
+    assert "hashed_password" not in str(mock_db.execute.call_args.args[0])
+
+@pytest.mark.asyncio
+async def test_get_user_unknown_field(user_repo, mock_db):
+    """Test that a projection to a field that does not exist is rejected."""
+    from src.exceptions import BaseAppException
+
+    with pytest.raises(BaseAppException):
+        await user_repo.get_user("test@example.com", fields=["password"])
+
+    mock_db.execute.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_get_user_not_found(user_repo, mock_db):
@@ -81,7 +93,7 @@ async def test_get_user_not_found(user_repo, mock_db):
     
     # Setup mock to return None (user not found)
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = None
+    mock_result.mappings.return_value.one_or_none.return_value = None
     mock_db.execute.return_value = mock_result
     
     # Test that the correct exception is raised
@@ -107,17 +119,58 @@ async def test_get_user_database_error(user_repo, mock_db):
     assert "Internal database error" in str(exc_info.value)
     mock_db.execute.assert_called_once()
 
+# Tests for get_users method
+@pytest.mark.asyncio
+async def test_get_users_success(user_repo, mock_db, db_user):
+    """Test batch retrieval returns found users in request order with a single query."""
+    mock_result = MagicMock()
+    mock_result.mappings.return_value = [
+        {"email": "other@example.com", "hashed_password": None, "is_active": False},
+        {"email": "test@example.com", "hashed_password": "hashed_password_value", "is_active": True}
+    ]
+    mock_db.execute.return_value = mock_result
+
+    users = await user_repo.get_users(["test@example.com", "missing@example.com", "other@example.com", "test@example.com"])
+
+    assert [user.email for user in users] == ["test@example.com", "other@example.com"]
+    assert users[1].is_active is False
+    mock_db.execute.assert_called_once()
+    assert "ANY" in str(mock_db.execute.call_args.args[0])
+
+@pytest.mark.asyncio
+async def test_get_users_database_error(user_repo, mock_db):
+    """Test database error handling for batch retrieval."""
+    from src.exceptions import BaseAppException
+
+    mock_db.execute.side_effect = Exception("Database connection error")
+
+    with pytest.raises(BaseAppException):
+        await user_repo.get_users(["test@example.com"])
+
+# Tests for stream_users method
+@pytest.mark.asyncio
+async def test_stream_users_server_side_cursor(user_repo, mock_db, db_user):
+    """Test that users are streamed with yield_per rather than loaded at once."""
+    async def rows():
+        yield db_user
+
+    mock_db.stream.return_value = rows()
+
+    users = [user async for user in user_repo.stream_users(batch_size=500)]
+
+    assert [user.email for user in users] == ["test@example.com"]
+    assert users[0].hashed_password is None
+    stmt = mock_db.stream.call_args[0][0]
+    assert stmt.get_execution_options()["yield_per"] == 500
+    mock_db.execute.assert_not_called()
+
 # Tests for create_user method
 @pytest.mark.asyncio
 async def test_create_user_success(user_repo, mock_db, sample_user, sample_outbox):
     """Test successful user creation."""
-    # Create a mock transaction context
-    transaction_context = AsyncMock()
-    transaction_context.__aenter__.return_value = None
-    transaction_context.__aexit__.return_value = None
-    
-    # Configure mock_db.begin() to return the transaction context
-    mock_db.begin.return_value = transaction_context
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "user_created_success"
+    mock_db.execute.return_value = mock_result
     
     # Call the method
     await user_repo.create_user(sample_user, sample_outbox)
@@ -125,8 +178,28 @@ async def test_create_user_success(user_repo, mock_db, sample_user, sample_outbo
     # Verify that begin() was called for the transaction
     mock_db.begin.assert_called_once()
     
-    # Verify that add() was called twice (user + outbox event)
-    assert mock_db.add.call_count == 2
+    # Verify that the user and its outbox event are one statement
+    mock_db.execute.assert_called_once()
+    mock_db.add.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_create_user_statement(user_repo, mock_db, sample_user, sample_outbox):
+    """Test that creation is a single INSERT ... ON CONFLICT DO NOTHING CTE with the outbox insert."""
+    from sqlalchemy.dialects import postgresql
+
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "user_created_success"
+    mock_db.execute.return_value = mock_result
+
+    await user_repo.create_user(sample_user, sample_outbox)
+
+    compiled = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("WITH inserted AS")
+    assert "ON CONFLICT (email) DO NOTHING RETURNING" in sql
+    assert "INSERT INTO auth.users_outbox" in sql
+    assert "RETURNING auth.users_outbox.eventtype" in sql
+    assert {"exception": "ResourceAlreadyExistsException", **sample_outbox.payload} in compiled.params.values()
 
 @pytest.mark.asyncio
 async def test_create_user_already_exists(user_repo, mock_db, sample_user, sample_outbox):
@@ -134,23 +207,10 @@ async def test_create_user_already_exists(user_repo, mock_db, sample_user, sampl
     # Import inside test function
     from src.exceptions import ResourceAlreadyExistsException
     
-    # Setup mock to raise IntegrityError with UniqueViolationError
-    unique_violation = Exception("UniqueViolationError")
-    integrity_error = IntegrityError("statement", "params", unique_violation)
-    integrity_error.orig = unique_violation
-    
-    # Make the first transaction fail
-    first_context = AsyncMock()
-    first_context.__aenter__.return_value = None
-    first_context.__aexit__.side_effect = integrity_error
-    
-    # Make the second transaction (for failure event) succeed
-    second_context = AsyncMock()
-    second_context.__aenter__.return_value = None
-    second_context.__aexit__.return_value = None
-    
-    # Configure mock_db.begin() to return different context managers on consecutive calls
-    mock_db.begin.side_effect = [first_context, second_context]
+    # The conflict is skipped and the statement writes the _failed event
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "user_created_failed"
+    mock_db.execute.return_value = mock_result
     
     # Test that the correct exception is raised
     with pytest.raises(ResourceAlreadyExistsException) as exc_info:
@@ -158,11 +218,9 @@ async def test_create_user_already_exists(user_repo, mock_db, sample_user, sampl
     
     assert "already exists" in str(exc_info.value)
     
-    # Verify begin() was called twice (initial attempt + failure event)
-    assert mock_db.begin.call_count == 2
-    
-    # Verify add() was called twice (initial user + outbox) and once more for failure event
-    assert mock_db.add.call_count == 3
+    # Verify the failed event was written by the same statement
+    mock_db.begin.assert_called_once()
+    mock_db.execute.assert_called_once()
 
 @pytest.mark.asyncio
 async def test_create_user_other_integrity_error(user_repo, mock_db, sample_user, sample_outbox):
@@ -175,18 +233,8 @@ async def test_create_user_other_integrity_error(user_repo, mock_db, sample_user
     integrity_error = IntegrityError("statement", "params", other_error)
     integrity_error.orig = other_error
     
-    # Make the first transaction fail
-    first_context = AsyncMock()
-    first_context.__aenter__.return_value = None
-    first_context.__aexit__.side_effect = integrity_error
-    
-    # Make the second transaction (for failure event) succeed
-    second_context = AsyncMock()
-    second_context.__aenter__.return_value = None
-    second_context.__aexit__.return_value = None
-    
-    # Configure mock_db.begin() to return different context managers on consecutive calls
-    mock_db.begin.side_effect = [first_context, second_context]
+    # Make the statement fail, then let the failure event succeed
+    mock_db.execute.side_effect = [integrity_error, MagicMock()]
     
     # Test that the correct exception is raised
     with pytest.raises(BaseAppException) as exc_info:
@@ -197,8 +245,10 @@ async def test_create_user_other_integrity_error(user_repo, mock_db, sample_user
     # Verify begin() was called twice (initial attempt + failure event)
     assert mock_db.begin.call_count == 2
     
-    # Verify add() was called twice (initial user + outbox) and once more for failure event
-    assert mock_db.add.call_count == 3
+    # Verify the failure event carries the exception
+    fail_event = mock_db.execute.call_args_list[1][0][0]
+    assert fail_event.compile().params["eventtype"] == "user_created_failed"
+    assert fail_event.compile().params["payload"]["exception"] == "BaseAppException"
 
 @pytest.mark.asyncio
 async def test_create_user_general_exception(user_repo, mock_db, sample_user, sample_outbox):
@@ -206,21 +256,8 @@ async def test_create_user_general_exception(user_repo, mock_db, sample_user, sa
     # Import inside test function
     from src.exceptions import BaseAppException
     
-    # Setup mock to raise a general exception
-    general_error = Exception("Unexpected error")
-    
-    # Make the first transaction fail
-    first_context = AsyncMock()
-    first_context.__aenter__.return_value = None
-    first_context.__aexit__.side_effect = general_error
-    
-    # Make the second transaction (for failure event) succeed
-    second_context = AsyncMock()
-    second_context.__aenter__.return_value = None
-    second_context.__aexit__.return_value = None
-    
-    # Configure mock_db.begin() to return different context managers on consecutive calls
-    mock_db.begin.side_effect = [first_context, second_context]
+    # Make the statement fail, then let the failure event succeed
+    mock_db.execute.side_effect = [Exception("Unexpected error"), MagicMock()]
     
     # Test that the correct exception is raised
     with pytest.raises(BaseAppException) as exc_info:
@@ -230,18 +267,18 @@ async def test_create_user_general_exception(user_repo, mock_db, sample_user, sa
     
     # Verify begin() was called twice (initial attempt + failure event)
     assert mock_db.begin.call_count == 2
-    
-    # Verify add() was called twice (initial user + outbox) and once more for failure event
-    assert mock_db.add.call_count == 3
+    assert mock_db.execute.call_count == 2
 
 # Tests for update_user method
 @pytest.mark.asyncio
 async def test_update_user_success(user_repo, mock_db, db_user):
+    """Test that update_user is one UPDATE ... RETURNING and returns the updated user."""
+    from sqlalchemy.dialects import postgresql
     from src.schemas import UserSchemas
     
-    # Configure the mock with MagicMock instead of AsyncMock
+    db_user.is_active = False
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = db_user
+    mock_result.one_or_none.return_value = db_user
     mock_db.execute.return_value = mock_result
     
     # Create an updated user
@@ -250,13 +287,19 @@ async def test_update_user_success(user_repo, mock_db, db_user):
         is_active=False
     )
     
-    # Patch the model_dump method instead of dict
-    with patch.object(UserSchemas.User, 'model_dump', return_value={"is_active": False}):
-        # Call the method
-        await user_repo.update_user(updated_user)
+    result = await user_repo.update_user(updated_user)
     
     # Verify the user was updated correctly
-    assert db_user.is_active is False
+    assert result.email == "test@example.com"
+    assert result.is_active is False
+    mock_db.execute.assert_called_once()
+    mock_db.commit.assert_called_once()
+    mock_db.refresh.assert_not_called()
+
+    sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE auth.users SET")
+    assert "hashed_password" not in sql
+    assert "RETURNING auth.users.email, auth.users.is_active" in sql
 
 @pytest.mark.asyncio
 async def test_update_user_not_found(user_repo, mock_db, sample_user):
@@ -264,9 +307,9 @@ async def test_update_user_not_found(user_repo, mock_db, sample_user):
     # Import inside test function
     from src.exceptions import ResourceNotFoundException
     
-    # Setup mock to return None (user not found)
+    # Setup mock to return no row (user not found)
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = None
+    mock_result.one_or_none.return_value = None
     mock_db.execute.return_value = mock_result
     
     # Test that the correct exception is raised
@@ -282,20 +325,107 @@ async def test_update_user_database_error(user_repo, mock_db, sample_user, db_us
     """Test database error during user update."""
     # Import inside test function
     from src.exceptions import BaseAppException
-    from src.schemas import UserSchemas
     
-    # Setup mock to return a user but raise an exception on commit
+    # Setup mock to return a row but raise an exception on commit
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = db_user
+    mock_result.one_or_none.return_value = db_user
     mock_db.execute.return_value = mock_result
     mock_db.commit.side_effect = Exception("Database error")
     
-    # Mock the dict method
-    with patch.object(UserSchemas.User, 'dict', return_value={"is_active": False}):
-        # Test that the correct exception is raised
-        with pytest.raises(BaseAppException) as exc_info:
-            await user_repo.update_user(sample_user)
+    # Test that the correct exception is raised
+    with pytest.raises(BaseAppException) as exc_info:
+        await user_repo.update_user(sample_user)
     
     assert "Internal database error" in str(exc_info.value)
     mock_db.execute.assert_called_once()
     mock_db.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_update_user_expected_values(user_repo, mock_db):
+    """Test that expected values become WHERE conditions and a missed condition raises ConflictException."""
+    from sqlalchemy.dialects import postgresql
+    from src.exceptions import ConflictException
+    from src.schemas import UserSchemas
+
+    mock_result = MagicMock()
+    mock_result.one_or_none.return_value = None
+    mock_db.execute.return_value = mock_result
+
+    with pytest.raises(ConflictException):
+        await user_repo.update_user(
+            UserSchemas.User(email="test@example.com", hashed_password="rehashed"),
+            expected={"hashed_password": "outdated_hash"}
+        )
+
+    compiled = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    assert "AND auth.users.hashed_password = " in str(compiled)
+    assert "outdated_hash" in compiled.params.values()
+    mock_db.commit.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_update_user_with_outbox_event(user_repo, mock_db):
+    """Test that update_user with an outbox event is one UPDATE ... RETURNING CTE with the outbox insert."""
+    from sqlalchemy.dialects import postgresql
+    from src.exceptions import ResourceNotFoundException
+    from src.schemas import UserSchemas
+
+    outbox = UserSchemas.Outbox(
+        aggregatetype="user",
+        aggregateid="test@example.com",
+        eventtype_prefix="user_deactivated",
+        payload={"email": "test@example.com", "is_active": False}
+    )
+    mock_result = MagicMock()
+    mock_result.scalar_one.return_value = "user_deactivated_success"
+    mock_db.execute.return_value = mock_result
+
+    result = await user_repo.update_user(UserSchemas.User(email="test@example.com", is_active=False), outbox)
+
+    assert result.is_active is False
+    mock_db.begin.assert_called_once()
+    mock_db.execute.assert_called_once()
+    sql = str(mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH updated AS")
+    assert "UPDATE auth.users SET" in sql and "RETURNING auth.users.email" in sql
+    assert "INSERT INTO auth.users_outbox" in sql
+
+    # A missing user writes the _failed event in the same statement
+    mock_result.scalar_one.return_value = "user_deactivated_failed"
+    with pytest.raises(ResourceNotFoundException):
+        await user_repo.update_user(UserSchemas.User(email="test@example.com", is_active=False), outbox)
+
+# Tests for deactivate_users method
+@pytest.mark.asyncio
+async def test_deactivate_users_set_based(user_repo, mock_db):
+    """Test that bulk deactivation is one UPDATE ... ANY(...) RETURNING with the outbox insert."""
+    from sqlalchemy.dialects import postgresql
+
+    mock_result = MagicMock()
+    mock_result.scalars.return_value = ["a@example.com"]
+    mock_db.execute.return_value = mock_result
+
+    statuses = await user_repo.deactivate_users(
+        emails=["a@example.com", "b@example.com"],
+        email_domain=None,
+        eventtype_prefix="user_deactivated"
+    )
+
+    assert statuses == {"a@example.com": "deactivated", "b@example.com": "not_found"}
+    mock_db.execute.assert_called_once()
+    compiled = mock_db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("WITH deactivated AS")
+    assert "auth.users.email = ANY" in sql
+    assert "gen_random_uuid()" in sql
+    assert "FROM deactivated RETURNING auth.users_outbox.aggregateid" in sql
+    assert compiled.params["emails"] == ["a@example.com", "b@example.com"]
+
+@pytest.mark.asyncio
+async def test_deactivate_users_database_error(user_repo, mock_db):
+    """Test that a failed bulk deactivation raises BaseAppException."""
+    from src.exceptions import BaseAppException
+
+    mock_db.execute.side_effect = Exception("Database connection error")
+
+    with pytest.raises(BaseAppException):
+        await user_repo.deactivate_users(emails=None, email_domain="example.com", eventtype_prefix="user_deactivated")
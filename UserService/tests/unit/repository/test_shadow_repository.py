@@ -0,0 +1,101 @@
+import pytest
+from contextlib import AsyncExitStack
+
+# Fixtures
+@pytest.fixture
+def sample_user():
+    """Create a sample User schema for testing."""
+    from src.schemas import UserSchemas
+    return UserSchemas.User(
+        email="test@example.com",
+        is_active=True,
+        hashed_password="hashed_password_value",
+    )
+
+@pytest.fixture
+def primary_store(sample_user):
+    """Create the primary MemoryStore, holding the sample user."""
+    from src.repository.implementations.Memory.store import MemoryStore
+    store = MemoryStore()
+    store.table("users")[sample_user.email] = sample_user.model_dump()
+    return store
+
+@pytest.fixture
+def shadow_store(monkeypatch):
+    """Create the MemoryStore the shadow backend reads from."""
+    import src.repository.implementations.Memory.store as store_module
+    store = store_module.MemoryStore()
+    monkeypatch.setattr(store_module, "get_memory_store", lambda: store)
+    return store
+
+@pytest.fixture
+async def backend(shadow_store):
+    """Start an in-memory shadow backend."""
+    from src.db.settings import get_settings, DatabaseType
+    from src.repository.implementations.Shadow.backend import ShadowBackend
+    backend = ShadowBackend(DatabaseType.MEMORY, max_in_flight=4)
+    async with AsyncExitStack() as exit_stack:
+        await backend.start(get_settings(), exit_stack)
+        yield backend
+
+def make_shadow_repo(primary_store, backend, sample_rate):
+    from src.repository.implementations.Memory.memory_UserRepository import UserRepository
+    from src.repository.implementations.Shadow.shadow_UserRepository import ShadowUserRepository
+    from src.repository.implementations.Shadow.stats import ShadowStats
+    return ShadowUserRepository(UserRepository(primary_store), backend=backend, stats=ShadowStats(window=100), sample_rate=sample_rate)
+
+# Tests for ShadowStats
+def test_stats_percentiles():
+    """Test that p50 and p99 are the nearest-rank percentiles of the latest samples, in milliseconds."""
+    from src.repository.implementations.Shadow.stats import ShadowStats
+    stats = ShadowStats(window=100)
+    for i in range(1, 101):
+        stats.record("get_user", primary_seconds=i / 1000, shadow_seconds=2 * i / 1000, matched=i != 1)
+
+    result = stats.stats()["get_user"]
+
+    assert result["mirrored"] == 100
+    assert result["mismatches"] == 1
+    assert result["primary_ms"] == {"samples": 100, "p50": 50.0, "p99": 99.0}
+    assert result["shadow_ms"] == {"samples": 100, "p50": 100.0, "p99": 198.0}
+
+# Tests for ShadowUserRepository
+@pytest.mark.asyncio
+async def test_shadow_mirrors_sampled_reads(primary_store, shadow_store, backend, sample_user):
+    """Test that a sampled read is answered by the primary and compared with the shadow in the background."""
+    shadow_store.table("users")[sample_user.email] = sample_user.model_dump()
+    repo = make_shadow_repo(primary_store, backend, sample_rate=1.0)
+
+    user = await repo.get_user(sample_user.email)
+    await backend.stop()
+
+    assert user == sample_user
+    result = repo.stats.stats()["get_user"]
+    assert result["mirrored"] == 1
+    assert result["mismatches"] == 0
+    assert result["shadow_ms"]["samples"] == 1
+
+@pytest.mark.asyncio
+async def test_shadow_counts_mismatches(primary_store, backend, sample_user):
+    """Test that a user missing from the shadow is a mismatch, and a user missing from both is not."""
+    from src.exceptions import ResourceNotFoundException
+    repo = make_shadow_repo(primary_store, backend, sample_rate=1.0)
+
+    await repo.get_user(sample_user.email)
+    with pytest.raises(ResourceNotFoundException):
+        await repo.get_user("missing@example.com")
+    await backend.stop()
+
+    result = repo.stats.stats()["get_user"]
+    assert result["mirrored"] == 2
+    assert result["mismatches"] == 1
+
+@pytest.mark.asyncio
+async def test_shadow_skips_unsampled_reads(primary_store, backend, sample_user):
+    """Test that reads outside the sample are not mirrored."""
+    repo = make_shadow_repo(primary_store, backend, sample_rate=0.0)
+
+    await repo.get_user(sample_user.email)
+    await backend.stop()
+
+    assert repo.stats.stats() == {}
@@ -0,0 +1,57 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+
+@pytest.fixture
+def mock_request():
+    """Create a minimal Request with separate read-write and read-only session factories."""
+    read_write_session = AsyncMock()
+    read_only_session = AsyncMock()
+    app_state = SimpleNamespace(
+        postgres_session=MagicMock(return_value=read_write_session),
+        postgres_read_only_session=MagicMock(return_value=read_only_session)
+    )
+    return SimpleNamespace(
+        app=SimpleNamespace(state=app_state),
+        state=SimpleNamespace()
+    )
+
+@pytest.mark.asyncio
+async def test_lazy_session_unused_opens_nothing(mock_request):
+    """Test that a session that is never used is never created."""
+    from src.db.db_context import LazySession
+
+    session = LazySession(mock_request)
+    await session.close()
+
+    assert session.materialized is False
+    mock_request.app.state.postgres_session.assert_not_called()
+    mock_request.app.state.postgres_read_only_session.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_lazy_session_created_on_first_use(mock_request):
+    """Test that the first repository call creates exactly one read-write session."""
+    from src.db.db_context import LazySession
+
+    session = LazySession(mock_request)
+    await session.execute("SELECT 1")
+    await session.execute("SELECT 2")
+
+    assert session.materialized is True
+    assert session.read_only is False
+    mock_request.app.state.postgres_session.assert_called_once()
+    mock_request.app.state.postgres_read_only_session.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_lazy_session_read_only(mock_request):
+    """Test that a request marked read-only gets the read-only session factory."""
+    from src.db.db_context import LazySession, read_only_transaction
+
+    session = LazySession(mock_request)
+    await read_only_transaction(mock_request)
+    await session.execute("SELECT 1")
+
+    assert session.read_only is True
+    mock_request.app.state.postgres_read_only_session.assert_called_once()
+    mock_request.app.state.postgres_session.assert_not_called()
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+
+
+@pytest.fixture
+async def hasher():
+    """Start a PasswordHasher with one worker process, no queue and a cheap fixed scrypt cost."""
+    from src.service.hashing import PasswordHasher
+    hasher = PasswordHasher(max_workers=1, max_queue=0, scheme="scrypt", rounds=10)
+    await hasher.start()
+    yield hasher
+    await hasher.stop()
+
+# Tests for PasswordHasher
+@pytest.mark.asyncio
+async def test_hash_runs_in_worker(hasher):
+    """Test that passwords are hashed in the pool with the policy's scheme and cost, and the hash time is recorded."""
+    from passlib.hash import scrypt
+
+    hashed = await hasher.hash("new_password")
+
+    assert hashed.startswith("$scrypt$ln=10,")
+    assert scrypt.verify("new_password", hashed)
+    stats = hasher.stats()
+    assert stats["hashed"] == 1
+    assert stats["hash_ms"]["samples"] == 1
+    assert stats["queue_wait_ms"]["samples"] == 1
+
+@pytest.mark.asyncio
+async def test_hash_rejects_when_queue_is_full(hasher):
+    """Test that a hash beyond the workers and the queue fails fast with 503."""
+    from src.exceptions import ServiceUnavailableException
+
+    results = await asyncio.gather(hasher.hash("first"), hasher.hash("second"), return_exceptions=True)
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], ServiceUnavailableException)
+    assert results[1].status_code == 503
+    assert hasher.stats()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_hash_requires_start():
+    """Test that hashing before the lifespan started the pool is an error rather than a blocking hash."""
+    from src.service.hashing import PasswordHasher
+
+    with pytest.raises(RuntimeError):
+        await PasswordHasher(max_workers=1, max_queue=0).hash("password")
+
+@pytest.mark.asyncio
+async def test_verify_rehashes_outdated_hashes(hasher):
+    """Test that a hash in an older scheme or at a lower cost verifies and comes back with a replacement."""
+    from passlib.hash import scrypt, sha512_crypt
+
+    assert await hasher.verify("password", sha512_crypt.using(rounds=1000).hash("wrong")) == (False, None)
+
+    valid, new_hash = await hasher.verify("password", sha512_crypt.using(rounds=1000).hash("password"))
+    assert valid
+    assert new_hash.startswith("$scrypt$ln=10,")
+
+    valid, new_hash = await hasher.verify("password", scrypt.using(rounds=8).hash("password"))
+    assert valid
+    assert new_hash.startswith("$scrypt$ln=10,")
+
+    assert await hasher.verify("password", scrypt.using(rounds=10).hash("password")) == (True, None)
+    assert await hasher.verify("password", None) == (False, None)
+    assert hasher.stats()["rehashed"] == 2
+
+# Tests for the hashing policy
+def test_calibrate_rounds_fits_budget():
+    """Test that calibration picks a cost whose hash fits the latency budget."""
+    import time
+    from passlib.hash import scrypt
+    from src.service.hashing_policy import calibrate_rounds
+
+    rounds = calibrate_rounds("scrypt", budget_seconds=0.05)
+
+    assert rounds >= 10
+    started = time.perf_counter()
+    scrypt.using(rounds=rounds).hash("password")
+    # Generous margin: the machine may be busy with other tests
+    assert time.perf_counter() - started < 0.05 * 3
+
+def test_context_config_rejects_unknown_scheme():
+    """Test that only supported schemes can be configured."""
+    from src.service.hashing_policy import context_config
+
+    with pytest.raises(ValueError):
+        context_config("md5_crypt", 1000)
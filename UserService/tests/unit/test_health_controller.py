@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+from src.main import app
+
+
+@pytest.fixture
+def client():
+    """Create a TestClient that does not run the lifespan, so readiness is controlled by the test."""
+    yield TestClient(app)
+    app.state.ready = False
+
+def test_live(client):
+    """Test that liveness does not depend on startup."""
+    response = client.get("/health/live")
+
+    assert response.status_code == 200
+
+def test_ready_before_startup(client):
+    """Test that readiness fails until startup (and warm-up) has finished."""
+    app.state.ready = False
+
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+
+def test_ready_after_startup(client):
+    """Test that readiness succeeds once the lifespan marks the app ready."""
+    app.state.ready = True
+
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+@pytest.mark.asyncio
+async def test_failed_startup_releases_resources():
+    """Test that when a startup step fails, what earlier steps opened is closed before the error propagates."""
+    from unittest.mock import AsyncMock, MagicMock, patch
+    from src import main
+    from src.db.settings import DatabaseType, Settings
+
+    settings = Settings(DATABASE_TYPE=DatabaseType.MEMORY, SHADOW_ENABLED=True)
+    hasher = AsyncMock()
+    closed = AsyncMock()
+
+    async def failing_start(settings, exit_stack):
+        exit_stack.push_async_callback(closed)
+        raise RuntimeError("shadow backend unavailable")
+    shadow_backend = MagicMock(start=failing_start)
+
+    with patch.object(main, "get_settings", return_value=settings), \
+         patch.object(main, "get_password_hasher", return_value=hasher), \
+         patch("src.repository.implementations.Shadow.shadow_UserRepository.get_shadow_backend", return_value=shadow_backend):
+        with pytest.raises(RuntimeError, match="shadow backend unavailable"):
+            async with main.lifespan(app):
+                pass
+
+    closed.assert_awaited_once()
+    hasher.stop.assert_awaited_once()
+    assert app.state.ready is False
+
+def test_dynamodb_metrics_only_with_dynamodb():
+    """Test that /metrics/dynamodb reports nothing unless DynamoDB is the primary or the shadow backend."""
+    from unittest.mock import patch
+    from src.db.settings import DatabaseType, Settings
+    from src.routes import MetricsController
+
+    responses = {}
+    for name, settings in {
+        "memory": Settings(DATABASE_TYPE=DatabaseType.MEMORY),
+        "postgres": Settings(DATABASE_TYPE=DatabaseType.POSTGRES),
+        "shadow": Settings(DATABASE_TYPE=DatabaseType.POSTGRES, SHADOW_ENABLED=True),
+        "dynamodb": Settings(DATABASE_TYPE=DatabaseType.DYNAMODB)
+    }.items():
+        with patch.object(MetricsController, "get_settings", return_value=settings), TestClient(app) as client:
+            responses[name] = client.get("/metrics/dynamodb").json()
+
+    assert responses["memory"] == responses["postgres"] == {"enabled": False}
+    assert responses["shadow"]["enabled"] is True
+    assert responses["dynamodb"]["enabled"] is True
+    assert "tables" in responses["dynamodb"]
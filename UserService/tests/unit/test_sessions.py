@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+@pytest.fixture
+def session_tokens():
+    """Create SessionTokens with a fixed secret and a one minute lifetime."""
+    from src.service.sessions import SessionTokens
+    return SessionTokens(secret=b"test-secret", ttl_seconds=60)
+
+# Tests for SessionTokens
+def test_issued_token_verifies(session_tokens):
+    """Test that a token verifies to its email until it expires."""
+    session_token, expires_at = session_tokens.issue("test@example.com")
+
+    assert session_tokens.verify(session_token) == "test@example.com"
+    assert session_tokens.stats()["verified"] == 1
+
+    from src.exceptions import UnauthorizedException
+    with patch("src.service.sessions.time.time", return_value=expires_at):
+        with pytest.raises(UnauthorizedException, match="expired"):
+            session_tokens.verify(session_token)
+
+def test_tampered_and_foreign_tokens_are_rejected(session_tokens):
+    """Test that changed claims, another secret and malformed tokens are rejected."""
+    import base64
+    import json
+    from src.exceptions import UnauthorizedException
+    from src.service.sessions import SessionTokens
+
+    session_token, expires_at = session_tokens.issue("test@example.com")
+    claims, signature = session_token.split(".")
+    forged_claims = base64.urlsafe_b64encode(
+        json.dumps({"sub": "admin@example.com", "iat": 0, "exp": expires_at}).encode()
+    ).rstrip(b"=").decode()
+    other_token, _ = SessionTokens(secret=b"other-secret", ttl_seconds=60).issue("test@example.com")
+
+    for token in (f"{forged_claims}.{signature}", other_token, "not-a-token", f"{claims}.", "é.é"):
+        with pytest.raises(UnauthorizedException):
+            session_tokens.verify(token)
+    assert session_tokens.stats()["rejected"] == 5
+
+def test_revocation_rejects_earlier_tokens_only(session_tokens):
+    """Test that a revocation rejects the user's tokens issued before it, not later ones or other users'."""
+    from src.exceptions import UnauthorizedException
+
+    with patch("src.service.sessions.time.time", return_value=1000.0):
+        old_token, _ = session_tokens.issue("test@example.com")
+        other_token, _ = session_tokens.issue("other@example.com")
+    with patch("src.service.sessions.time.time", return_value=1001.0):
+        session_tokens.revoke("test@example.com")
+    with patch("src.service.sessions.time.time", return_value=1002.0):
+        new_token, _ = session_tokens.issue("test@example.com")
+
+        with pytest.raises(UnauthorizedException, match="revoked"):
+            session_tokens.verify(old_token)
+        assert session_tokens.verify(new_token) == "test@example.com"
+        assert session_tokens.verify(other_token) == "other@example.com"
+
+def test_revocations_expire_with_the_tokens():
+    """Test that revocations are dropped once every token they apply to has expired."""
+    from src.service.sessions import RevocationCache
+
+    revocations = RevocationCache(ttl_seconds=60)
+    with patch("src.service.sessions.time.time", return_value=1030.0):
+        revocations.revoke("first@example.com", at=1000.0)
+        revocations.revoke("second@example.com")
+    with patch("src.service.sessions.time.time", return_value=1070.0):
+        revocations.revoke("third@example.com")
+
+    assert len(revocations) == 2
+    assert not revocations.is_revoked("first@example.com", issued_at=999.0)
+    assert revocations.is_revoked("second@example.com", issued_at=1029.0)
+
+def test_session_secret_required_outside_memory_mode():
+    """Test that the process-wide tokens refuse to start without SESSION_SECRET, except in memory mode."""
+    from src.db.settings import DatabaseType, Settings
+    from src.service import sessions
+
+    try:
+        for database_type in (DatabaseType.POSTGRES, DatabaseType.DYNAMODB):
+            sessions.get_session_tokens.cache_clear()
+            with patch.object(sessions, "get_settings", return_value=Settings(DATABASE_TYPE=database_type, SESSION_SECRET="")):
+                with pytest.raises(RuntimeError, match="SESSION_SECRET"):
+                    sessions.get_session_tokens()
+
+        sessions.get_session_tokens.cache_clear()
+        with patch.object(sessions, "get_settings", return_value=Settings(DATABASE_TYPE=DatabaseType.MEMORY, SESSION_SECRET="")):
+            session_token, _ = sessions.get_session_tokens().issue("test@example.com")
+            assert sessions.get_session_tokens().verify(session_token) == "test@example.com"
+    finally:
+        sessions.get_session_tokens.cache_clear()
+
+# Tests for the revocation event handler
+@pytest.mark.asyncio
+async def test_deactivation_and_reset_events_revoke_sessions(monkeypatch, session_tokens):
+    """Test that deactivation and password reset events revoke the user's sessions as of the change."""
+    from src.consumer import kafka
+    from src.exceptions import UnauthorizedException
+    from src.service import sessions
+
+    monkeypatch.setattr(sessions, "get_session_tokens", lambda: session_tokens)
+    monkeypatch.setattr(kafka, "invalidation_manager", kafka.KafkaEventManager())
+    kafka.register_invalidation_handlers()
+    manager = kafka.invalidation_manager
+
+    with patch("src.service.sessions.time.time", return_value=1000.0):
+        old_token, _ = session_tokens.issue("test@example.com")
+    with patch("src.service.sessions.time.time", return_value=1010.0):
+        new_token, _ = session_tokens.issue("test@example.com")
+        other_token, _ = session_tokens.issue("other@example.com")
+
+    with patch("src.service.sessions.time.time", return_value=1020.0):
+        await manager._process_event("user_created_success", {"email": "test@example.com"})
+        assert session_tokens.verify(old_token) == "test@example.com"
+
+        # Delivered after the new token was issued, but the reset happened before it
+        await manager._process_event(
+            "user_password_reset_success",
+            {"email": "test@example.com", "is_active": True, "changed_at": 1005.0}
+        )
+        with pytest.raises(UnauthorizedException):
+            session_tokens.verify(old_token)
+        assert session_tokens.verify(new_token) == "test@example.com"
+
+        await manager._process_event(
+            "user_deactivated_success",
+            {"email": "other@example.com", "is_active": False, "changed_at": 1015.0}
+        )
+        with pytest.raises(UnauthorizedException):
+            session_tokens.verify(other_token)
+
+        # A late event does not shorten a later revocation
+        await manager._process_event(
+            "user_deactivated_success",
+            {"email": "other@example.com", "is_active": False, "changed_at": 1001.0}
+        )
+        with pytest.raises(UnauthorizedException):
+            session_tokens.verify(other_token)
+
+@pytest.mark.asyncio
+async def test_invalidation_consumer_replays_token_lifetime():
+    """Test that a starting pod reads its own outbox from SESSION_TTL_SECONDS ago, so earlier revocations apply."""
+    from unittest.mock import AsyncMock, MagicMock
+    from aiokafka import TopicPartition
+    from src.consumer import kafka
+
+    consumer = MagicMock()
+    consumer.start = AsyncMock()
+    consumer.topics = AsyncMock()
+    consumer.seek_to_end = AsyncMock()
+    consumer.partitions_for_topic.return_value = {0, 1}
+    first, second = TopicPartition("userservice.user", 0), TopicPartition("userservice.user", 1)
+    consumer.offsets_for_times = AsyncMock(return_value={first: MagicMock(offset=42), second: None})
+    manager = kafka.KafkaEventManager()
+
+    with patch("aiokafka.AIOKafkaConsumer", return_value=consumer) as consumer_class, \
+         patch.object(kafka.time, "time", return_value=10000.0), \
+         patch.object(manager, "_consume", AsyncMock()):
+        await manager.start(["userservice.user"], "kafka:29092", group_id=None, workers=1, replay_seconds=900)
+        await asyncio.gather(*manager.tasks)
+
+    assert consumer_class.call_args.args == ()
+    consumer.assign.assert_called_once_with([first, second])
+    consumer.offsets_for_times.assert_awaited_once_with({first: 9100000, second: 9100000})
+    consumer.seek.assert_called_once_with(first, 42)
+    consumer.seek_to_end.assert_awaited_once_with(second)
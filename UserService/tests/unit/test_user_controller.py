@@ -1,4 +1,5 @@
 from src.dependencies import get_user_service
+from src.service.sessions import get_session_tokens
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock
@@ -40,6 +41,11 @@ def sample_reset_password():
         password_repeat="new_password"
     )
 
+def session_headers(email):
+    """Authorization header with a session token issued for email."""
+    session_token, _ = get_session_tokens().issue(email)
+    return {"Authorization": f"Bearer {session_token}"}
+
 # Tests for get_user method
 @pytest.mark.asyncio
 async def test_get_user_success(mock_user_service, sample_user_response_inactive):
@@ -126,6 +132,135 @@ async def test_get_user_database_error(mock_user_service):
     assert "error" in error_data # from our exception handler in /src/main.py
     assert "Error getting user: Internal database error: SOME_ERROR" in error_data["error"]
 
+# Tests for get_users method
+@pytest.mark.asyncio
+async def test_get_users_success(mock_user_service, sample_user_response_inactive):
+    """Test batch retrieval with repeated email query parameters."""
+    mock_user_service.get_users.return_value = [sample_user_response_inactive]
+
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.get("/users/batch", params={"email": ["test@example.com", "missing@example.com"]})
+
+    app.dependency_overrides.clear()
+
+    mock_user_service.get_users.assert_called_once_with(emails=["test@example.com", "missing@example.com"])
+    assert response.status_code == 200
+    assert response.json() == [{"email": "test@example.com", "is_active": False}]
+
+@pytest.mark.asyncio
+async def test_get_users_too_many(mock_user_service):
+    """Test that a batch above the limit is rejected."""
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.get("/users/batch", params={"email": [f"user{i}@example.com" for i in range(101)]})
+
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 422
+    mock_user_service.get_users.assert_not_called()
+
+# Tests for export_users method
+@pytest.mark.asyncio
+async def test_export_users_ndjson(mock_user_service, sample_user_response_active, sample_user_response_inactive):
+    """Test that the export streams one JSON object per line."""
+    import json
+    from unittest.mock import MagicMock
+
+    async def export_users():
+        yield sample_user_response_active
+        yield sample_user_response_inactive
+
+    mock_user_service.export_users = MagicMock(side_effect=export_users)
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.get("/users/export")
+
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"email": "test@example.com", "is_active": True},
+        {"email": "test@example.com", "is_active": False}
+    ]
+
+@pytest.mark.asyncio
+async def test_export_users_gzip(mock_user_service, sample_user_response_active):
+    """Test that gzip=true compresses the stream with Content-Encoding: gzip."""
+    import gzip
+    import httpx
+    from unittest.mock import MagicMock
+
+    async def export_users():
+        for _ in range(1000):
+            yield sample_user_response_active
+
+    mock_user_service.export_users = MagicMock(side_effect=export_users)
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        async with async_client.stream("GET", "/users/export", params={"gzip": "true"}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    app.dependency_overrides.clear()
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(raw) < 1000 * len(sample_user_response_active.model_dump_json())
+    assert len(gzip.decompress(raw).splitlines()) == 1000
+
+# Tests for login method
+@pytest.mark.asyncio
+async def test_login_unauthorized(mock_user_service):
+    """Test that a rejected login returns 401."""
+    from src.schemas import UserSchemas
+    from src.exceptions import UnauthorizedException
+
+    mock_user_service.login.side_effect = UnauthorizedException("Invalid email or password")
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/users/login",
+            json={"email": "test@example.com", "password": "wrong"}
+        )
+
+    app.dependency_overrides.clear()
+
+    mock_user_service.login.assert_called_once_with(
+        login=UserSchemas.Login(email="test@example.com", password="wrong")
+    )
+    assert response.status_code == 401
+    assert "Invalid email or password" in response.json()["error"]
+
+@pytest.mark.asyncio
+async def test_login_success(mock_user_service):
+    """Test that a login returns the session token issued by the service."""
+    from src.schemas import UserSchemas
+
+    mock_user_service.login.return_value = UserSchemas.Session(
+        email="test@example.com",
+        is_active=True,
+        session_token="token",
+        expires_at=1700000000.0
+    )
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/users/login",
+            json={"email": "test@example.com", "password": "new_password"}
+        )
+
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["session_token"] == "token"
+
 # Tests for reset_password method
 @pytest.mark.asyncio
 async def test_reset_password_success(
@@ -145,7 +280,8 @@ async def test_reset_password_success(
         response = client.put(
             "/users/reset-password",
             params={"email": sample_user_response_active.email},
-            json=sample_reset_password.model_dump()
+            json=sample_reset_password.model_dump(),
+            headers=session_headers(sample_user_response_active.email)
         )
     
     # Clean up the override
@@ -154,7 +290,9 @@ async def test_reset_password_success(
     # Verify the service method was called correctly
     mock_user_service.reset_password.assert_called_once_with(
         email=sample_user_response_active.email,
-        reset_password=sample_reset_password
+        reset_password=sample_reset_password,
+        eventtype_prefix="user_password_reset",
+        authenticated=True
     )
     
     # Assertions
@@ -184,7 +322,8 @@ async def test_reset_password_user_not_found(
         response = client.put(
             "/users/reset-password",
             params={"email": "nonexistent@example.com"},
-            json=sample_reset_password.model_dump()
+            json=sample_reset_password.model_dump(),
+            headers=session_headers("nonexistent@example.com")
         )
     
     # Clean up the override
@@ -193,7 +332,9 @@ async def test_reset_password_user_not_found(
     # Verify the service method was called correctly
     mock_user_service.reset_password.assert_called_once_with(
         email="nonexistent@example.com",
-        reset_password=sample_reset_password
+        reset_password=sample_reset_password,
+        eventtype_prefix="user_password_reset",
+        authenticated=True
     )
     
     # Assertions
@@ -225,7 +366,8 @@ async def test_reset_password_database_error(
         response = client.put(
             "/users/reset-password",
             params={"email": sample_user_response_inactive.email},
-            json=sample_reset_password.model_dump()
+            json=sample_reset_password.model_dump(),
+            headers=session_headers(sample_user_response_inactive.email)
         )
     
     # Clean up the override - do this AFTER making the request
@@ -234,7 +376,9 @@ async def test_reset_password_database_error(
     # Verify the service method was called correctly
     mock_user_service.reset_password.assert_called_once_with(
         email=sample_user_response_inactive.email,
-        reset_password=sample_reset_password
+        reset_password=sample_reset_password,
+        eventtype_prefix="user_password_reset",
+        authenticated=True
     )
 
     # Assertions
@@ -243,6 +387,33 @@ async def test_reset_password_database_error(
     assert "error" in error_data # from our exception handler in /src/main.py
     assert "Error updating user: Internal database error: SOME_ERROR" in error_data["error"]
 
+@pytest.mark.asyncio
+async def test_reset_password_without_session(
+    mock_user_service,
+    sample_reset_password,
+    sample_user_response_active
+    ):
+    """Test that without a session token the reset is passed on unauthenticated, for the service to check."""
+    mock_user_service.reset_password.return_value = sample_user_response_active
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.put(
+            "/users/reset-password",
+            params={"email": sample_user_response_active.email},
+            json=sample_reset_password.model_dump()
+        )
+
+    app.dependency_overrides.clear()
+
+    mock_user_service.reset_password.assert_called_once_with(
+        email=sample_user_response_active.email,
+        reset_password=sample_reset_password,
+        eventtype_prefix="user_password_reset",
+        authenticated=False
+    )
+    assert response.status_code == 201
+
 # Tests for deactivate_user method
 @pytest.mark.asyncio
 async def test_deactivate_success(
@@ -268,7 +439,8 @@ async def test_deactivate_success(
     
     # Verify the service method was called correctly
     mock_user_service.deactivate_user.assert_called_once_with(
-        email=sample_user_response_inactive.email
+        email=sample_user_response_inactive.email,
+        eventtype_prefix="user_deactivated"
     )
     
     # Assertions
@@ -304,7 +476,8 @@ async def test_deactivate_user_not_found(
     
     # Verify the service method was called correctly
     mock_user_service.deactivate_user.assert_called_once_with(
-        email="nonexistent@example.com"
+        email="nonexistent@example.com",
+        eventtype_prefix="user_deactivated"
     )
     
     # Assertions
@@ -342,11 +515,77 @@ async def test_deactivate_database_error(
     
     # Verify the service method was called correctly
     mock_user_service.deactivate_user.assert_called_once_with(
-        email=sample_user_response_inactive.email
+        email=sample_user_response_inactive.email,
+        eventtype_prefix="user_deactivated"
     )
 
     # Assertions
     assert response.status_code == 500
     error_data = response.json()
     assert "error" in error_data # from our exception handler in /src/main.py
-    assert "Error updating user: Internal database error: SOME_ERROR" in error_data["error"]
\ No newline at end of file
+    assert "Error updating user: Internal database error: SOME_ERROR" in error_data["error"]
+# Tests for deactivate_users method
+@pytest.mark.asyncio
+async def test_deactivate_users_success(mock_user_service):
+    """Test bulk deactivation returns the status of each email."""
+    from src.schemas import UserSchemas
+    mock_user_service.deactivate_users.return_value = [
+        UserSchemas.BulkDeactivateUserResult(email="a@example.com", status="deactivated"),
+        UserSchemas.BulkDeactivateUserResult(email="b@example.com", status="not_found")
+    ]
+
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.put("/users/deactivate-bulk", json={"emails": ["a@example.com", "b@example.com"]})
+
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 201
+    assert mock_user_service.deactivate_users.call_args.kwargs["BulkDeactivateUsers_instance"].emails == ["a@example.com", "b@example.com"]
+    assert [result["status"] for result in response.json()] == ["deactivated", "not_found"]
+
+@pytest.mark.asyncio
+async def test_deactivate_users_requires_one_selector(mock_user_service):
+    """Test that a request with both emails and email_domain is rejected."""
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+
+    with TestClient(app) as client:
+        response = client.put("/users/deactivate-bulk", json={"emails": ["a@example.com"], "email_domain": "example.com"})
+
+    app.dependency_overrides.clear()
+
+    assert response.status_code == 422
+    mock_user_service.deactivate_users.assert_not_called()
+
+# Tests for the session dependency
+@pytest.mark.asyncio
+async def test_reset_password_rejects_invalid_foreign_and_revoked_sessions(
+    mock_user_service,
+    sample_reset_password
+    ):
+    """Test that a session token sent to reset_password must be valid, unrevoked and of the same user."""
+    app.dependency_overrides[get_user_service] = lambda: mock_user_service
+    revoked_headers = session_headers("revoked@example.com")
+    get_session_tokens().revoke("revoked@example.com")
+
+    with TestClient(app) as client:
+        responses = [
+            client.put(
+                "/users/reset-password",
+                params={"email": email},
+                json=sample_reset_password.model_dump(),
+                headers=headers
+            )
+            for email, headers in (
+                ("test@example.com", {"Authorization": "Bearer not-a-token"}),
+                ("test@example.com", session_headers("other@example.com")),
+                ("revoked@example.com", revoked_headers)
+            )
+        ]
+
+    app.dependency_overrides.clear()
+
+    assert [response.status_code for response in responses] == [401, 401, 401]
+    assert "Session revoked" in responses[2].json()["error"]
+    mock_user_service.reset_password.assert_not_called()
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import ANY, AsyncMock, patch
 
 
 @pytest.fixture
@@ -69,6 +69,7 @@ async def test_get_user_success(
     sample_user_inactive_nopw
     ):
     """Test successful user retrieval."""
+    from src.schemas import UserSchemas
     # Setup mock to return a User
     user_service.user_repository.get_user = AsyncMock(return_value=sample_user_inactive_nopw)
     
@@ -76,7 +77,7 @@ async def test_get_user_success(
     user = await user_service.get_user(sample_user_inactive_nopw.email)
     
     # Verify the repository method was called correctly
-    user_service.user_repository.get_user.assert_called_once_with(sample_user_inactive_nopw.email)
+    user_service.user_repository.get_user.assert_called_once_with(sample_user_inactive_nopw.email, fields=UserSchemas.USER_RESPONSE_FIELDS)
     
     # Assertions
     assert user.email == sample_user_inactive_nopw.email
@@ -85,6 +86,7 @@ async def test_get_user_success(
 @pytest.mark.asyncio
 async def test_get_user_not_found(user_service):
     """Test user not found scenario."""
+    from src.schemas import UserSchemas
     # Import inside test function
     from src.exceptions import ResourceNotFoundException
     
@@ -98,13 +100,14 @@ async def test_get_user_not_found(user_service):
         await user_service.get_user("nonexistent@example.com")
     
     # Verify the repository method was called correctly
-    user_service.user_repository.get_user.assert_called_once_with("nonexistent@example.com")
+    user_service.user_repository.get_user.assert_called_once_with("nonexistent@example.com", fields=UserSchemas.USER_RESPONSE_FIELDS)
     
     assert "not found" in str(exc_info.value)
 
 @pytest.mark.asyncio
 async def test_get_user_database_error(user_service, sample_user_inactive_nopw):
     """Test database error handling."""
+    from src.schemas import UserSchemas
     # Import inside test function
     from src.exceptions import BaseAppException
     
@@ -118,12 +121,26 @@ async def test_get_user_database_error(user_service, sample_user_inactive_nopw):
         await user_service.get_user(sample_user_inactive_nopw.email)
     
     # Verify the repository method was called correctly
-    user_service.user_repository.get_user.assert_called_once_with(sample_user_inactive_nopw.email)
+    user_service.user_repository.get_user.assert_called_once_with(sample_user_inactive_nopw.email, fields=UserSchemas.USER_RESPONSE_FIELDS)
     
     assert "Error getting user:" in str(exc_info.value)
     assert "Internal database error:" in str(exc_info.value)
 
-# # Tests for create_user method
+# # Tests for get_users method
+@pytest.mark.asyncio
+async def test_get_users_success(user_service, sample_user_inactive_nopw):
+    """Test batch retrieval maps users to responses."""
+    from src.schemas import UserSchemas
+    user_service.user_repository.get_users = AsyncMock(return_value=[sample_user_inactive_nopw])
+
+    users = await user_service.get_users(["test@example.com", "missing@example.com"])
+
+    user_service.user_repository.get_users.assert_called_once_with(["test@example.com", "missing@example.com"], fields=UserSchemas.USER_RESPONSE_FIELDS)
+    assert len(users) == 1
+    assert users[0].email == "test@example.com"
+    assert users[0].is_active is False
+
+# Tests for create_user method
 @pytest.mark.asyncio
 async def test_create_user_success(
     user_service,
@@ -278,6 +295,90 @@ async def test_create_user_general_exception(user_service, sample_user_inactive_
     assert "Error creating user:" in str(exc_info.value)
     assert "Internal database error:" in str(exc_info.value)
 
+# Tests for login method
+@pytest.mark.asyncio
+@patch("src.service.UserService.verifyPW")
+async def test_login_success(
+    mock_verifyPW,
+    user_service,
+    sample_user_active_pw
+    ):
+    """Test successful login with an up-to-date hash opens a session."""
+    from src.schemas import UserSchemas
+    from src.service.sessions import get_session_tokens
+    user_service.user_repository.get_user.return_value = sample_user_active_pw
+    mock_verifyPW.return_value = (True, None)
+
+    result = await user_service.login(UserSchemas.Login(email=sample_user_active_pw.email, password="new_password"))
+
+    user_service.user_repository.get_user.assert_called_once_with(sample_user_active_pw.email, fields=UserSchemas.LOGIN_FIELDS)
+    mock_verifyPW.assert_called_once_with("new_password", sample_user_active_pw.hashed_password)
+    user_service.user_repository.update_user.assert_not_called()
+    assert result.email == sample_user_active_pw.email
+    assert result.is_active
+    assert get_session_tokens().verify(result.session_token) == sample_user_active_pw.email
+
+@pytest.mark.asyncio
+@patch("src.service.UserService.verifyPW")
+async def test_login_rehashes_outdated_hash(
+    mock_verifyPW,
+    user_service,
+    sample_user_active_pw
+    ):
+    """Test that a successful login stores the new hash when the old one is outdated."""
+    from src.schemas import UserSchemas
+    user_service.user_repository.get_user.return_value = sample_user_active_pw
+    mock_verifyPW.return_value = (True, "new_hash_value")
+
+    await user_service.login(UserSchemas.Login(email=sample_user_active_pw.email, password="new_password"))
+
+    user_service.user_repository.update_user.assert_called_once_with(
+        UserSchemas.User(email=sample_user_active_pw.email, hashed_password="new_hash_value"),
+        expected={"hashed_password": sample_user_active_pw.hashed_password}
+    )
+
+@pytest.mark.asyncio
+@patch("src.service.UserService.verifyPW")
+async def test_login_skips_rehash_after_concurrent_reset(
+    mock_verifyPW,
+    user_service,
+    sample_user_active_pw
+    ):
+    """Test that a login whose verified hash was replaced meanwhile keeps the new hash and still succeeds."""
+    from src.schemas import UserSchemas
+    from src.exceptions import ConflictException
+    user_service.user_repository.get_user.return_value = sample_user_active_pw
+    user_service.user_repository.update_user.side_effect = ConflictException("User with email test@example.com has changed")
+    mock_verifyPW.return_value = (True, "new_hash_value")
+
+    result = await user_service.login(UserSchemas.Login(email=sample_user_active_pw.email, password="new_password"))
+
+    user_service.user_repository.update_user.assert_called_once()
+    assert result.email == sample_user_active_pw.email
+
+@pytest.mark.asyncio
+@patch("src.service.UserService.verifyPW")
+async def test_login_rejects_wrong_password_and_unknown_email(
+    mock_verifyPW,
+    user_service,
+    sample_user_active_pw
+    ):
+    """Test that a wrong password and an unknown email are both rejected with 401, after a verification."""
+    from src.schemas import UserSchemas
+    from src.exceptions import ResourceNotFoundException, UnauthorizedException
+    mock_verifyPW.return_value = (False, None)
+
+    user_service.user_repository.get_user.return_value = sample_user_active_pw
+    with pytest.raises(UnauthorizedException):
+        await user_service.login(UserSchemas.Login(email=sample_user_active_pw.email, password="wrong"))
+
+    user_service.user_repository.get_user.side_effect = ResourceNotFoundException("not found")
+    with pytest.raises(UnauthorizedException):
+        await user_service.login(UserSchemas.Login(email="unknown@example.com", password="wrong"))
+
+    mock_verifyPW.assert_called_with("wrong", None)
+    user_service.user_repository.update_user.assert_not_called()
+
 # Tests for reset_password method
 @pytest.mark.asyncio
 @patch("src.service.UserService.saltAndHashedPW")
@@ -289,15 +390,26 @@ async def test_password_reset_success(
     sample_user_active_pw
     ):
 
-    """Test successful password update."""
+    """Test successful password update, which ends the user's open sessions."""
+    from src.exceptions import UnauthorizedException
+    from src.service.sessions import get_session_tokens
+    session_token, _ = get_session_tokens().issue(sample_user_active_nopw.email)
+
     # Setup mock for saltAndHashedPW
     mock_saltAndHashedPW.return_value = "hashed_password_value"
     
     # Call the method
-    await user_service.reset_password(sample_user_active_nopw.email, sample_reset_password)
+    await user_service.reset_password(sample_user_active_nopw.email, sample_reset_password, "user_password_reset", authenticated=True)
 
-    # Verify the repository method was called correctly
-    user_service.user_repository.update_user.assert_called_once_with(sample_user_active_pw)
+    # Verify the repository method was called correctly, with the event that revokes sessions on other pods
+    user_service.user_repository.update_user.assert_called_once_with(sample_user_active_pw, Outbox_instance=ANY, expected=None)
+    outbox = user_service.user_repository.update_user.call_args.kwargs["Outbox_instance"]
+    assert outbox.eventtype_prefix == "user_password_reset"
+    assert outbox.payload["email"] == sample_user_active_pw.email
+    assert outbox.payload["changed_at"] <= get_session_tokens().revocations._revoked[sample_user_active_pw.email]
+
+    with pytest.raises(UnauthorizedException):
+        get_session_tokens().verify(session_token)
 
 @pytest.mark.asyncio
 @patch("src.service.UserService.saltAndHashedPW")
@@ -322,7 +434,7 @@ async def test_password_reset_user_not_found(
     
     # Test that the correct exception is raised
     with pytest.raises(ResourceNotFoundException) as exc_info:
-        await user_service.reset_password("nonexistent@example.com", sample_reset_password)
+        await user_service.reset_password("nonexistent@example.com", sample_reset_password, "user_password_reset", authenticated=True)
     
     # Verify the repository method was called correctly
     user_service.user_repository.update_user.assert_called_once_with(
@@ -330,7 +442,9 @@ async def test_password_reset_user_not_found(
             email="nonexistent@example.com",
             hashed_password="hashed_password_value",
             is_active=True
-        )
+        ),
+        Outbox_instance=ANY,
+        expected=None
     )
     
     assert "not found" in str(exc_info.value)
@@ -357,14 +471,83 @@ async def test_password_reset_database_error(
     
     # Test that the correct exception is raised
     with pytest.raises(BaseAppException) as exc_info:
-        await user_service.reset_password(sample_user_active_pw.email, sample_reset_password)
+        await user_service.reset_password(sample_user_active_pw.email, sample_reset_password, "user_password_reset", authenticated=True)
     
     # Verify the repository method was called correctly
-    user_service.user_repository.update_user.assert_called_once_with(sample_user_active_pw)
+    user_service.user_repository.update_user.assert_called_once_with(sample_user_active_pw, Outbox_instance=ANY, expected=None)
     
     assert "Error updating user:" in str(exc_info.value)
     assert "Internal database error:" in str(exc_info.value)
 
+@pytest.mark.asyncio
+@patch("src.service.UserService.saltAndHashedPW")
+async def test_first_password_without_session(
+    mock_saltAndHashedPW,
+    user_service,
+    sample_user_active_nopw,
+    sample_reset_password,
+    sample_user_active_pw
+    ):
+    """Test that a user without a password (e.g. created from a subscription event) sets the first one without a session, once."""
+    mock_saltAndHashedPW.return_value = "hashed_password_value"
+    user_service.user_repository.get_user = AsyncMock(return_value=sample_user_active_nopw)
+
+    await user_service.reset_password(sample_user_active_nopw.email, sample_reset_password, "user_password_reset")
+
+    user_service.user_repository.update_user.assert_called_once_with(
+        sample_user_active_pw,
+        Outbox_instance=ANY,
+        expected={"hashed_password": None}
+    )
+
+@pytest.mark.asyncio
+@patch("src.service.UserService.verifyPW")
+@patch("src.service.UserService.saltAndHashedPW")
+async def test_password_reset_with_current_password(
+    mock_saltAndHashedPW,
+    mock_verifyPW,
+    user_service,
+    sample_user_active_pw
+    ):
+    """Test that without a session the current password authorizes the reset, e.g. to reactivate a deactivated user."""
+    from src.schemas import UserSchemas
+    mock_saltAndHashedPW.return_value = "new_hashed_password_value"
+    mock_verifyPW.return_value = (True, None)
+    deactivated = UserSchemas.User(email=sample_user_active_pw.email, hashed_password="hashed_password_value", is_active=False)
+    user_service.user_repository.get_user = AsyncMock(return_value=deactivated)
+    reset = UserSchemas.ResetPassword(password="new_password", password_repeat="new_password", current_password="old_password")
+
+    await user_service.reset_password(deactivated.email, reset, "user_password_reset")
+
+    mock_verifyPW.assert_called_once_with("old_password", "hashed_password_value")
+    user_service.user_repository.update_user.assert_called_once_with(
+        UserSchemas.User(email=deactivated.email, hashed_password="new_hashed_password_value", is_active=True),
+        Outbox_instance=ANY,
+        expected={"hashed_password": "hashed_password_value"}
+    )
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("current_password, valid", [(None, None), ("wrong", False)])
+@patch("src.service.UserService.verifyPW")
+async def test_password_reset_without_session_rejected(
+    mock_verifyPW,
+    current_password,
+    valid,
+    user_service,
+    sample_user_active_pw
+    ):
+    """Test that a user with a password needs a session or the right current password."""
+    from src.schemas import UserSchemas
+    from src.exceptions import UnauthorizedException
+    mock_verifyPW.return_value = (valid, None)
+    user_service.user_repository.get_user = AsyncMock(return_value=sample_user_active_pw)
+    reset = UserSchemas.ResetPassword(password="new_password", password_repeat="new_password", current_password=current_password)
+
+    with pytest.raises(UnauthorizedException):
+        await user_service.reset_password(sample_user_active_pw.email, reset, "user_password_reset")
+
+    user_service.user_repository.update_user.assert_not_called()
+
 # Tests for deactivate_user method
 @pytest.mark.asyncio
 async def test_deactivate_success(
@@ -377,10 +560,13 @@ async def test_deactivate_success(
     user_service.user_repository.update_user = AsyncMock(return_value=sample_user_inactive_nopw)
     
     # Call the method - return UserResponse
-    user = await user_service.deactivate_user(sample_user_active_nopw.email)
+    user = await user_service.deactivate_user(sample_user_active_nopw.email, "user_deactivated")
 
-    # Verify the repository method was called correctly
-    user_service.user_repository.update_user.assert_called_once_with(sample_user_inactive_nopw)
+    # Verify the repository method was called correctly, with the event that revokes sessions on other pods
+    user_service.user_repository.update_user.assert_called_once_with(sample_user_inactive_nopw, Outbox_instance=ANY)
+    outbox = user_service.user_repository.update_user.call_args.kwargs["Outbox_instance"]
+    assert outbox.eventtype_prefix == "user_deactivated"
+    assert outbox.payload == {"email": sample_user_inactive_nopw.email, "is_active": False, "changed_at": ANY}
     
     # Assertions
     assert user.email == sample_user_inactive_nopw.email
@@ -402,14 +588,15 @@ async def test_deactivate_user_not_found(
     
     # Test that the correct exception is raised
     with pytest.raises(ResourceNotFoundException) as exc_info:
-        await user_service.deactivate_user("nonexistent@example.com")
+        await user_service.deactivate_user("nonexistent@example.com", "user_deactivated")
     
     # Verify the repository method was called correctly
     user_service.user_repository.update_user.assert_called_once_with(
         UserSchemas.User(
             email="nonexistent@example.com",
             is_active=False
-        )
+        ),
+        Outbox_instance=ANY
     )
     
     assert "not found" in str(exc_info.value)
@@ -430,10 +617,10 @@ async def test_deactivate_database_error(
     
     # Test that the correct exception is raised
     with pytest.raises(BaseAppException) as exc_info:
-        await user_service.deactivate_user(sample_user_inactive_nopw.email)
+        await user_service.deactivate_user(sample_user_inactive_nopw.email, "user_deactivated")
     
     # Verify the repository method was called correctly
-    user_service.user_repository.update_user.assert_called_once_with(sample_user_inactive_nopw)
+    user_service.user_repository.update_user.assert_called_once_with(sample_user_inactive_nopw, Outbox_instance=ANY)
     
     assert "Error deactivating user:" in str(exc_info.value)
     assert "Internal database error:" in str(exc_info.value)
\ No newline at end of file
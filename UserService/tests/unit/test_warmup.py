@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+
+@pytest.fixture
+def settings():
+    """Create Settings with warm-up enabled."""
+    from src.db.settings import Settings
+    return Settings(WARMUP_ENABLED=True, WARMUP_CONNECTIONS=3, POSTGRES_POOL_SIZE=5, WARMUP_TIMEOUT_SECONDS=1.0)
+
+@pytest.fixture
+def mock_repository(monkeypatch):
+    """Replace the repository factory used by the warm-up with a mock repository."""
+    from src.exceptions import ResourceNotFoundException
+    import src.db.warmup as warmup
+    repository = AsyncMock()
+    repository.get_user.side_effect = ResourceNotFoundException("User not found")
+    monkeypatch.setattr(warmup, "create_user_repository", MagicMock(return_value=repository))
+    return repository
+
+@pytest.mark.asyncio
+async def test_warm_up_postgres_opens_distinct_connections(settings, mock_repository):
+    """Test that every warm-up query runs while all configured connections are checked out."""
+    from src.db.warmup import warm_up_postgres, WARMUP_KEY
+    from src.schemas import UserSchemas
+    open_connections = 0
+    max_open_connections = 0
+
+    @asynccontextmanager
+    async def connect():
+        nonlocal open_connections, max_open_connections
+        open_connections += 1
+        max_open_connections = max(max_open_connections, open_connections)
+        await asyncio.sleep(0)
+        yield MagicMock()
+        open_connections -= 1
+
+    engine = MagicMock()
+    engine.connect = connect
+
+    await warm_up_postgres(engine, settings)
+
+    assert max_open_connections == 3
+    assert mock_repository.get_user.await_count == 3
+    mock_repository.get_user.assert_awaited_with(WARMUP_KEY, fields=UserSchemas.USER_RESPONSE_FIELDS)
+
+@pytest.mark.asyncio
+async def test_warm_up_dynamodb(settings, mock_repository):
+    """Test that the DynamoDB warm-up sends one hot query per connection."""
+    from src.db.warmup import warm_up_dynamodb
+
+    await warm_up_dynamodb(AsyncMock(), settings)
+
+    assert mock_repository.get_user.await_count == 3
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_does_not_fail_startup(settings, mock_repository):
+    """Test that an error during warm-up is logged instead of raised."""
+    from src.db.warmup import warm_up_postgres
+
+    @asynccontextmanager
+    async def connect():
+        raise ConnectionRefusedError("database is down")
+        yield
+
+    engine = MagicMock()
+    engine.connect = connect
+
+    await warm_up_postgres(engine, settings)
+
+    mock_repository.get_user.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_warm_up_postgres_without_connections(mock_repository):
+    """Test that WARMUP_CONNECTIONS=0 skips the warm-up instead of failing startup."""
+    from src.db.settings import Settings
+    from src.db.warmup import warm_up_postgres
+    engine = MagicMock()
+
+    await warm_up_postgres(engine, Settings(WARMUP_ENABLED=True, WARMUP_CONNECTIONS=0))
+
+    engine.connect.assert_not_called()
+    mock_repository.get_user.assert_not_awaited()